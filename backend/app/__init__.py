@@ -1,11 +1,20 @@
+import logging
 from flask import Flask
 from flask_cors import CORS
 from app.config import Config
-from app.core import db
+from app.core import db, results_cache, results_broadcaster, admission_controller
+from app.core.compression import init_compression
+from app.core.database import init_database
+from app.core.metrics import init_metrics
+from app.repositories import init_repository
 
 def create_app():
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(Config)
+    logging.basicConfig(
+        level=app.config["LOG_LEVEL"],
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s"
+    )
 
     CORS(
         app,
@@ -14,12 +23,31 @@ def create_app():
         allow_headers=["Content-Type", "Authorization"],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     )
-    db.init_app(app)
+    init_metrics(app)
+    if app.config["STORAGE_BACKEND"] == "postgres":
+        init_database(app)
+    init_repository(app)
+    init_compression(app)
+    results_cache.init_app(app)
+    results_broadcaster.init_app(app)
+    admission_controller.init_app(app)
+    results_cache.add_invalidation_callback(results_broadcaster.mark_dirty)
 
+    from app.routes.health import bp as health_bp
+    app.register_blueprint(health_bp)
     from app.routes.tournaments import bp as tournaments_bp
     app.register_blueprint(tournaments_bp, url_prefix="/api/tournaments")
+    from app.routes.evaluation_sets import bp as evaluation_sets_bp
+    app.register_blueprint(evaluation_sets_bp, url_prefix="/api/evaluation-sets")
+    if app.config["STORAGE_BACKEND"] == "postgres":
+        from app.routes.exports import bp as exports_bp
+        app.register_blueprint(exports_bp, url_prefix="/api/exports")
 
-    with app.app_context():
-        db.create_all()
+    from app.cli import evaluation_cli, export_cli, init_db_command, judge_cli, maintenance_cli
+    app.cli.add_command(evaluation_cli)
+    app.cli.add_command(export_cli)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(judge_cli)
+    app.cli.add_command(maintenance_cli)
 
-    return app
\ No newline at end of file
+    return app
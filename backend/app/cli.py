@@ -0,0 +1,184 @@
+import sys
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from app import db
+from app.core import admission_controller
+from app.core.admission import AdmissionRejected
+from app.schemas import CreateEvaluationSetRequest
+from app.services.archival import ArchivalService
+from app.services.batch import BatchEvaluation
+from app.services.evaluation_sets import EvaluationSetService
+from app.services.exports import ExportService
+from app.services.judging import JudgeService
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create missing tables and indexes; run once per deploy, not on every boot"""
+    db.create_all()
+    click.echo("Database schema is up to date", err=True)
+
+export_cli = AppGroup('export', help="Bulk export of tournament data")
+
+@export_cli.command('dataset')
+@click.argument('dataset', type=click.Choice(ExportService.DATASETS))
+@click.option('--format', 'export_format', type=click.Choice(ExportService.FORMATS + ('parquet',)),
+              default='ndjson', show_default=True)
+@click.option('--tournament-id', type=int, help="Only export this tournament")
+@click.option('--since', type=click.DateTime(), help="Inclusive lower bound on the row timestamp")
+@click.option('--until', type=click.DateTime(), help="Exclusive upper bound on the row timestamp")
+@click.option('--batch-size', type=int, default=ExportService.BATCH_SIZE, show_default=True,
+              help="Rows fetched per server-side cursor round trip")
+@click.option('--output', '-o', default='-', help="Output file, '-' for stdout")
+def export_dataset(dataset, export_format, tournament_id, since, until, batch_size, output):
+    """Stream votes, user tournaments or rankings to a file"""
+    filters = dict(tournament_id=tournament_id, since=since, until=until, batch_size=batch_size)
+
+    if export_format == 'parquet':
+        if output == '-':
+            raise click.UsageError("Parquet export needs --output")
+        try:
+            rows = ExportService.write_parquet(dataset, output, **filters)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Wrote {rows} rows to {output}", err=True)
+        return
+
+    stream = sys.stdout.buffer if output == '-' else open(output, 'wb')
+    try:
+        for chunk in ExportService.stream(dataset, export_format, **filters):
+            stream.write(chunk)
+    finally:
+        if stream is not sys.stdout.buffer:
+            stream.close()
+
+maintenance_cli = AppGroup('maintenance', help="Vote partitioning and archival jobs")
+
+@maintenance_cli.command('partitions')
+@click.option('--ahead', type=int, help="Empty partitions to keep past the newest bracket [default: VOTE_PARTITIONS_AHEAD]")
+def create_partitions(ahead):
+    """Create upcoming vote partitions; run daily and after init-db"""
+    config = current_app.config
+    ahead = config['VOTE_PARTITIONS_AHEAD'] if ahead is None else ahead
+    created = ArchivalService.ensure_vote_partitions(config['VOTE_PARTITION_SIZE'], ahead)
+    click.echo(f"Created {len(created)} vote partitions: {', '.join(created) or '-'}", err=True)
+
+@maintenance_cli.command('migrate-votes')
+@click.option('--ahead', type=int, help="Empty partitions to keep past the newest bracket [default: VOTE_PARTITIONS_AHEAD]")
+def migrate_votes(ahead):
+    """Convert a database created before vote partitioning; run once, before init-db, when upgrading"""
+    config = current_app.config
+    ahead = config['VOTE_PARTITIONS_AHEAD'] if ahead is None else ahead
+    moved = ArchivalService.migrate_legacy_votes(config['VOTE_PARTITION_SIZE'], ahead)
+    if moved is None:
+        click.echo("Votes are already partitioned; added any missing user_tournament columns", err=True)
+    else:
+        click.echo(f"Moved {moved} votes into the partitioned vote table", err=True)
+
+@maintenance_cli.command('archive')
+@click.option('--older-than-days', type=int, help="Age before data is archived [default: ARCHIVE_AFTER_DAYS]")
+def archive(older_than_days):
+    """Compact old completed brackets and move idle vote partitions to cold storage"""
+    config = current_app.config
+    days = config['ARCHIVE_AFTER_DAYS'] if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    compacted = ArchivalService.compact_completed_brackets(cutoff)
+    archived = ArchivalService.archive_vote_partitions(cutoff, config['ARCHIVE_TABLESPACE'] or None)
+    click.echo(f"Compacted {compacted} brackets, archived {len(archived)} vote partitions", err=True)
+
+@maintenance_cli.command('prune-admission')
+def prune_admission():
+    """Drop token buckets that have refilled completely; run hourly"""
+    pruned = admission_controller.prune()
+    click.echo(f"Pruned {pruned} admission buckets", err=True)
+
+judge_cli = AppGroup('judge', help="Automated voting with LLM judges")
+
+@judge_cli.command('run')
+@click.argument('tournament_id', type=int)
+@click.option('--model', 'models', multiple=True, help="Judge model, repeat for a panel [default: JUDGE_MODELS]")
+@click.option('--batch-size', type=int, help="Matches judged per batch [default: JUDGE_BATCH_SIZE]")
+@click.option('--concurrency', type=int, help="Judge completions in flight [default: JUDGE_CONCURRENCY]")
+def judge_run(tournament_id, models, batch_size, concurrency):
+    """Vote through a tournament with LLM judges as a synthetic judge user; rerun to resume"""
+    models = list(models) or current_app.config['JUDGE_MODELS']
+    progress = None
+    try:
+        for progress in JudgeService.judge_tournament(tournament_id, models, batch_size, concurrency):
+            click.echo(
+                f"{progress.matches} matches in {progress.elapsed:.1f}s ({progress.matches_per_second:.1f}/s): "
+                f"{progress.calls} judge calls, {progress.cached} cached, "
+                f"{progress.invalid} invalid, {progress.split} split", err=True
+            )
+    except (ValueError, RuntimeError, AdmissionRejected) as e:
+        raise click.ClickException(str(e))
+
+    user_id = JudgeService.judge_user_id(models)
+    if progress is None:
+        click.echo(f"{user_id} has already judged tournament {tournament_id}", err=True)
+    elif progress.completed:
+        click.echo(f"{user_id} completed tournament {tournament_id}, winner prompt {progress.winner}", err=True)
+
+@judge_cli.command('batch')
+@click.argument('input_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', required=True, help="Results JSONL, appended to; <output>.checkpoint sits beside it")
+@click.option('--model', 'models', multiple=True, help="Judge model, repeat for a panel [default: JUDGE_MODELS]")
+@click.option('--workers', type=int, default=4, show_default=True, help="Worker processes, 0 to run in this process")
+@click.option('--batch-size', type=int, help="Matches judged per batch [default: JUDGE_BATCH_SIZE]")
+@click.option('--concurrency', type=int, help="Completions in flight per worker [default: JUDGE_CONCURRENCY]")
+def judge_batch(input_path, output, models, workers, batch_size, concurrency):
+    """Create and judge every tournament in a JSONL file; rerun with the same output to resume"""
+    models = list(models) or current_app.config['JUDGE_MODELS']
+
+    def report(row, summary):
+        done = summary.skipped + summary.completed + summary.failed
+        status = f"error: {row['error']}" if 'error' in row else f"winner prompt {row['winner_prompt_index']}"
+        click.echo(f"[{done}/{summary.items}] {row['id']}: {status}", err=True)
+
+    try:
+        summary = BatchEvaluation(input_path, output, models, workers, batch_size, concurrency).run(report)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    usage = summary.usage
+    click.echo(
+        f"{summary.completed} tournaments judged, {summary.failed} failed, {summary.skipped} already done, "
+        f"in {summary.elapsed:.1f}s ({summary.tournaments_per_second:.2f} tournaments/s, "
+        f"{summary.matches_per_second:.1f} matches/s)\n"
+        f"{usage.calls} completions ({summary.judge_calls} judge calls, {summary.cached} cached verdicts), "
+        f"{usage.prompt_tokens} prompt and {usage.completion_tokens} completion tokens, cost {usage.cost:.4f}",
+        err=True
+    )
+    if summary.failed:
+        sys.exit(1)
+
+evaluation_cli = AppGroup('evaluation', help="The same prompts evaluated across a set of questions")
+
+@evaluation_cli.command('create')
+@click.argument('path', type=click.File('rb'))
+@click.option('--concurrency', type=int, help="Completions in flight across all questions [default: EVALUATION_CONCURRENCY]")
+def create_evaluation_set(path, concurrency):
+    """Generate every prompt's response to every question in a JSON evaluation set, one tournament per question"""
+    try:
+        request = CreateEvaluationSetRequest.model_validate_json(path.read())
+        progress = None
+        for progress in EvaluationSetService.create_evaluation_set(
+            request.name, request.questions, [prompt.model_dump() for prompt in request.prompts],
+            request.format, concurrency
+        ):
+            status = f"tournament {progress.tournament_id}" if progress.tournament_id else "failed"
+            click.echo(
+                f"[{progress.created + progress.failed}/{progress.questions}] {progress.question[:60]}: {status} "
+                f"({progress.completions} completions, {progress.completions_per_second:.1f}/s)", err=True
+            )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"Evaluation set {progress.evaluation_set_id}: {progress.created} tournaments created, "
+        f"{progress.failed} questions failed", err=True
+    )
+    if progress.failed:
+        sys.exit(1)
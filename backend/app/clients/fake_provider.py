@@ -0,0 +1,89 @@
+"""An OpenAI-compatible chat completions endpoint for local runs and tests, no network or key needed.
+
+Completions echo the model and the prompt. Judge requests, recognized by their
+``[Response A]`` and ``[Response B]`` sections, prefer the longer response
+whichever position it is in, so verdicts are deterministic and free of position
+bias. Run from ``backend/``:
+
+    python -m app.clients.fake_provider --port 8089 --latency 0.2
+
+and set ``OPENROUTER_BASE_URL=http://127.0.0.1:8089/api/v1``.
+"""
+import argparse
+import asyncio
+import random
+import re
+import threading
+from typing import Callable, Tuple
+from aiohttp import web
+
+JUDGE_SECTIONS = re.compile(r"\[Response A\]\n(.*)\n\n\[Response B\]\n(.*)", re.DOTALL)
+
+def _reply(model: str, system_prompt: str, user_prompt: str) -> str:
+    sections = JUDGE_SECTIONS.search(user_prompt)
+    if sections:
+        response_a, response_b = sections.groups()
+        return "A" if len(response_a.strip()) >= len(response_b.strip()) else "B"
+    return f"Fake {model} response to: {system_prompt[:200]}"
+
+def create_fake_app(latency: float = 0.0, error_rate: float = 0.0,
+                    slow_rate: float = 0.0, slow_latency: float = 0.0) -> web.Application:
+    """The fake provider, sleeping latency seconds per completion and failing error_rate of them with a 500.
+
+    slow_rate of the completions take slow_latency seconds instead, a tail for hedging to cut.
+    """
+
+    async def chat_completions(request):
+        payload = await request.json()
+        await asyncio.sleep(slow_latency if random.random() < slow_rate else latency)
+        if random.random() < error_rate:
+            raise web.HTTPInternalServerError(text="Simulated upstream failure")
+        messages = {message['role']: message['content'] for message in payload['messages']}
+        content = _reply(payload['model'], messages.get('system', ''), messages.get('user', ''))
+        # Words stand in for tokens
+        prompt_tokens = sum(len(text.split()) for text in messages.values())
+        completion_tokens = len(content.split())
+        return web.json_response({
+            'model': payload['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens, 'cost': 0.0}
+        })
+
+    app = web.Application()
+    app.router.add_post('/api/v1/chat/completions', chat_completions)
+    return app
+
+def serve_in_thread(latency: float = 0.0, error_rate: float = 0.0, slow_rate: float = 0.0, slow_latency: float = 0.0,
+                    host: str = '127.0.0.1', port: int = 0) -> Tuple[str, Callable[[], None]]:
+    """Start the fake provider on a background event loop; returns its base URL and a function stopping it"""
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(create_fake_app(latency, error_rate, slow_rate, slow_latency))
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, host, port).start())
+    bound_port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, name="fake-provider", daemon=True)
+    thread.start()
+
+    def stop():
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+    return f"http://{host}:{bound_port}/api/v1", stop
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds per completion")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of completions failing with a 500")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="Fraction of completions taking --slow-latency")
+    parser.add_argument('--slow-latency', type=float, default=0.0, help="Seconds per slow completion")
+    args = parser.parse_args()
+    web.run_app(create_fake_app(args.latency, args.error_rate, args.slow_rate, args.slow_latency),
+                host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+class HedgePolicy:
+    """When to send a second copy of a slow completion, and how much extra load that may add.
+
+    A model's hedge delay is a percentile of its recent successful latencies, never
+    less than min_delay, and there is none until min_samples have been seen. Hedges
+    spend from a budget that every first request tops up by max_ratio, up to burst,
+    so however slow the upstream gets, hedging adds at most that fraction of requests.
+    """
+
+    def __init__(self, percentile: float = 95, min_delay: float = 1.0, min_samples: int = 20, window: int = 200,
+                 max_ratio: float = 0.1, burst: float = 10, fallbacks: Optional[Dict[str, str]] = None):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self.fallbacks = fallbacks or {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._budget = burst
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'HedgePolicy':
+        return cls(
+            percentile=config.HEDGE_PERCENTILE,
+            min_delay=config.HEDGE_MIN_DELAY,
+            min_samples=config.HEDGE_MIN_SAMPLES,
+            max_ratio=config.HEDGE_MAX_RATIO,
+            burst=config.HEDGE_BURST,
+            fallbacks=config.HEDGE_FALLBACK_MODELS
+        )
+
+    def record(self, model: str, seconds: float):
+        """Add a successful request's latency to the model's window"""
+        with self._lock:
+            latencies = self._latencies.get(model)
+            if latencies is None:
+                latencies = self._latencies[model] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def delay(self, model: str) -> Optional[float]:
+        """Seconds to wait for a first request before hedging it, or None while too few latencies are known.
+
+        Also tops up the hedge budget, so call it once per first request.
+        """
+        with self._lock:
+            self._budget = min(self.burst, self._budget + self.max_ratio)
+            latencies = self._latencies.get(model)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            ordered = sorted(latencies)
+        rank = min(len(ordered) - 1, math.ceil(len(ordered) * self.percentile / 100) - 1)
+        return max(self.min_delay, ordered[rank])
+
+    def try_hedge(self) -> bool:
+        """Take one hedge from the budget, False when it is spent"""
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            return True
+
+    def hedge_model(self, model: str) -> str:
+        """The model a hedge is sent to: the configured fallback, or the same model"""
+        return self.fallbacks.get(model, model)
@@ -1,14 +1,40 @@
 import asyncio
+import logging
+import queue
+import time
+import threading
 import aiohttp
-from typing import List, Dict
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from app.config import Config
+from app.clients.hedging import HedgePolicy
+from app.core.deadlines import Deadline, DeadlineExceeded
+from app.core.metrics import LLM_HEDGES, record_llm_call
 from app.schemas import OpenRouterRequest, OpenRouterMessage, PromptData
 from pydantic import ValidationError
 
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Usage:
+    """Upstream completions made and what they were billed, as reported by the provider"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+    def __add__(self, other: 'Usage') -> 'Usage':
+        return Usage(*(getattr(self, f.name) + getattr(other, f.name) for f in fields(self)))
+
+    def __sub__(self, other: 'Usage') -> 'Usage':
+        return Usage(*(getattr(self, f.name) - getattr(other, f.name) for f in fields(self)))
+
 class OpenRouterClient:
     """OpenRouter API client with models"""
     
-    BASE_URL = "https://openrouter.ai/api/v1"
+    # Seconds between checks of a deadline's client for a hang-up
+    DEADLINE_POLL_INTERVAL = 0.5
     
     MODELS = {
         # Meta Llama Models
@@ -37,7 +63,12 @@ class OpenRouterClient:
     
     def __init__(self, timeout: int = 60):
         self.api_key = Config.OPENROUTER_API_KEY
+        # Any OpenAI-compatible endpoint, such as the local fake provider
+        self.base_url = Config.OPENROUTER_BASE_URL.rstrip("/")
         self.timeout = timeout
+        self._usage = Usage()
+        self._usage_lock = threading.Lock()
+        self.hedging = HedgePolicy.from_config(Config) if Config.HEDGE_ENABLED else None
         
         if not self.api_key:
             raise ValueError("OpenRouter API key is required")
@@ -49,6 +80,19 @@ class OpenRouterClient:
             "X-Title": "LLM Prompt Arena"
         }
     
+    def usage(self) -> Usage:
+        """Totals over every completion this client made in this process; diff two readings for a job's share"""
+        with self._usage_lock:
+            return self._usage + Usage()
+    
+    def _record_usage(self, usage: Optional[Dict[str, Any]]):
+        usage = usage or {}
+        with self._usage_lock:
+            self._usage.calls += 1
+            self._usage.prompt_tokens += usage.get("prompt_tokens") or 0
+            self._usage.completion_tokens += usage.get("completion_tokens") or 0
+            self._usage.cost += usage.get("cost") or 0.0
+    
     def get_available_models(self) -> Dict[str, str]:
         """Get curated list of models"""
         return self.MODELS.copy()
@@ -67,7 +111,8 @@ class OpenRouterClient:
         
         return validated_prompts
     
-    def create_openrouter_request(self, model: str, system_prompt: str, user_prompt: str) -> OpenRouterRequest:
+    def create_openrouter_request(self, model: str, system_prompt: str, user_prompt: str,
+                                  temperature: float = 0.7, max_tokens: int = 1000) -> OpenRouterRequest:
         """Create validated OpenRouter request"""
         try:
             messages = [
@@ -78,54 +123,136 @@ class OpenRouterClient:
             return OpenRouterRequest(
                 model=model,
                 messages=messages,
-                temperature=0.7,
-                max_tokens=1000
+                temperature=temperature,
+                max_tokens=max_tokens
             )
         except ValidationError as e:
             raise ValueError(f"Invalid request data for model {model}: {str(e)}")
     
-    async def generate_completion(self, session, model, system_prompt, user_prompt, semaphore):
-        """Generate single completion with validation"""
+    async def generate_completion(self, session, model, system_prompt, user_prompt, semaphore,
+                                  deadline: Optional[Deadline] = None, **options):
+        """Generate single completion with validation; options are temperature and max_tokens.
+
+        With a deadline, the call is timed out at whatever the deadline leaves, and
+        raises DeadlineExceeded instead of returning an error when that is what ran out.
+        """
         async with semaphore:
+            start = time.perf_counter()
+            outcome = "error"
             try:
+                timeout = self.timeout
+                if deadline is not None:
+                    # Time spent queueing on the semaphore comes out of the deadline
+                    deadline.check()
+                    # aiohttp reads a timeout of 0 as no timeout at all
+                    timeout = min(timeout, max(deadline.remaining(), 0.001))
+                
                 # Validate request data
-                request_data = self.create_openrouter_request(model, system_prompt, user_prompt)
+                request_data = self.create_openrouter_request(model, system_prompt, user_prompt, **options)
                 
                 request_json = request_data.model_dump()
                 
-                async with session.post(
-                    f"{self.BASE_URL}/chat/completions",
-                    headers=self.get_headers(),
-                    json=request_json,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    
-                    # Extract content with validation
-                    try:
-                        content = result["choices"][0]["message"]["content"].strip()
-                        if not content:
-                            raise ValueError("Empty response from API")
-                        return content
-                    except (KeyError, IndexError) as e:
-                        raise ValueError(f"Invalid response format: {e}")
+                if self.hedging is None:
+                    content = await self._post(session, request_json, timeout)
+                else:
+                    content = await self._hedged_post(session, request_json, timeout)
+                outcome = "success"
+                return content
                         
             except ValidationError as e:
-                print(f"Validation error for model {model}: {e}")
+                logger.warning("Validation error for model %s: %s", model, e)
                 return f"[Error: Invalid request data for {model}]"
             except aiohttp.ClientError as e:
-                print(f"HTTP error for model {model}: {e}")
+                logger.warning("HTTP error for model %s: %s", model, e)
                 return f"[Error: {model} HTTP error - {str(e)[:100]}]"
+            except DeadlineExceeded:
+                outcome = "cancelled"
+                raise
             except asyncio.TimeoutError:
-                print(f"Timeout error for model {model}")
+                outcome = "timeout"
+                if deadline is not None and deadline.remaining() <= 0:
+                    raise DeadlineExceeded('timeout')
+                logger.warning("Timeout error for model %s", model)
                 return f"[Error: {model} timed out]"
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
             except Exception as e:
-                print(f"Unexpected error for model {model}: {e}")
+                logger.exception("Unexpected error for model %s", model)
                 return f"[Error: {model} failed - {str(e)[:100]}]"
+            finally:
+                record_llm_call(model, outcome, time.perf_counter() - start)
     
-    def generate_completions(self, prompts_data: List[Dict[str, str]], question: str) -> List[str]:
-        """Generate completions for all prompts with validation"""
+    async def _post(self, session, request_json: Dict[str, Any], timeout: float) -> str:
+        """Send one request and return the completion's content"""
+        start = time.perf_counter()
+        usage = None
+        try:
+            async with session.post(
+                f"{self.base_url}/chat/completions",
+                headers=self.get_headers(),
+                json=request_json,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                response.raise_for_status()
+                result = await response.json()
+                usage = result.get("usage")
+                
+                # Extract content with validation
+                try:
+                    content = result["choices"][0]["message"]["content"].strip()
+                except (KeyError, IndexError) as e:
+                    raise ValueError(f"Invalid response format: {e}")
+                if not content:
+                    raise ValueError("Empty response from API")
+        finally:
+            self._record_usage(usage)
+        if self.hedging is not None:
+            self.hedging.record(request_json["model"], time.perf_counter() - start)
+        return content
+    
+    async def _hedged_post(self, session, request_json: Dict[str, Any], timeout: float) -> str:
+        """_post, plus a second copy once the first outlives the model's hedge delay; the first success wins.
+
+        Hedges skip the caller's semaphore, so the hedge budget alone bounds the extra load.
+        """
+        model = request_json["model"]
+        delay = self.hedging.delay(model)
+        if delay is None:
+            return await self._post(session, request_json, timeout)
+        
+        tasks = [asyncio.ensure_future(self._post(session, request_json, timeout))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if self.hedging.try_hedge():
+                    hedge_json = {**request_json, "model": self.hedging.hedge_model(model)}
+                    tasks.append(asyncio.ensure_future(self._post(session, hedge_json, timeout)))
+                else:
+                    LLM_HEDGES.labels(model, "throttled").inc()
+            
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if len(tasks) > 1:
+                            LLM_HEDGES.labels(model, "won" if task is tasks[1] else "lost").inc()
+                        return task.result()
+                if not pending:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Wait out the cancellations so the loser's connection is released, and its failure retrieved
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def generate_completions(self, prompts_data: List[Dict[str, str]], question: str,
+                             deadline: Optional[Deadline] = None) -> List[str]:
+        """Generate completions for all prompts with validation.
+
+        With a deadline, raise DeadlineExceeded once it passes, cancelling the completions still queued or running.
+        """
         # Validate all prompts first
         validated_prompts = self.validate_prompts_data(prompts_data)
         
@@ -133,32 +260,100 @@ class OpenRouterClient:
         if not question or not question.strip():
             raise ValueError("Question cannot be empty")
         
-        return asyncio.run(self._generate_completions_async(validated_prompts, question.strip()))
+        return asyncio.run(self._generate_completions_async(validated_prompts, question.strip(), deadline))
     
-    async def _generate_completions_async(self, validated_prompts: List[PromptData], question: str) -> List[str]:
+    async def _generate_completions_async(self, validated_prompts: List[PromptData], question: str,
+                                          deadline: Optional[Deadline] = None) -> List[str]:
         """Async completion generation with validated data"""
-        semaphore = asyncio.Semaphore(10)  
+        calls = [(prompt.model, prompt.text, question) for prompt in validated_prompts]
+        return await self._complete_all_async(calls, 10, {}, deadline)
+    
+    def complete_all(self, calls: List[Tuple[str, str, str]], concurrency: int = 10, **options) -> List[str]:
+        """Run (model, system_prompt, user_prompt) completions concurrently, results in call order.
+
+        Failures come back as "[Error: ...]" strings, like generate_completions.
+        """
+        return asyncio.run(self._complete_all_async(calls, concurrency, options))
+    
+    def complete_iter(self, calls: List[Tuple[str, str, str]], concurrency: int = 10,
+                      **options) -> Iterator[Tuple[int, str]]:
+        """Like complete_all, but yield (call index, content) as each completion finishes.
+
+        Calls start in list order under one semaphore, so earlier calls tend to finish
+        first. The event loop runs on its own thread, leaving the caller free to do
+        blocking work, such as storing results, between completions.
+        """
+        results = queue.Queue()
+        
+        def run():
+            try:
+                asyncio.run(self._complete_each_async(calls, concurrency, options, results.put))
+            except Exception as e:
+                results.put(e)
+        
+        thread = threading.Thread(target=run, name="openrouter-completions", daemon=True)
+        thread.start()
+        for _ in calls:
+            result = results.get()
+            if isinstance(result, Exception):
+                raise result
+            yield result
+        thread.join()
+    
+    async def _complete_each_async(self, calls, concurrency, options, on_result):
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def complete(index, model, system_prompt, user_prompt, session):
+            try:
+                content = await self.generate_completion(session, model, system_prompt, user_prompt, semaphore, **options)
+            except Exception as e:
+                content = f"[Error: {model} failed - {str(e)[:100]}]"
+            on_result((index, content))
+        
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(complete(i, *call, session) for i, call in enumerate(calls)))
+    
+    async def _complete_all_async(self, calls: List[Tuple[str, str, str]], concurrency: int,
+                                  options: Dict[str, Any], deadline: Optional[Deadline] = None) -> List[str]:
+        semaphore = asyncio.Semaphore(concurrency)
         
         async with aiohttp.ClientSession() as session:
             tasks = [
-                self.generate_completion(
-                    session, 
-                    prompt.model,
-                    prompt.text,
-                    question,
-                    semaphore
+                asyncio.ensure_future(
+                    self.generate_completion(session, model, system_prompt, user_prompt, semaphore, deadline, **options)
                 )
-                for prompt in validated_prompts
+                for model, system_prompt, user_prompt in calls
             ]
             
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                if deadline is not None:
+                    await self._wait_within(tasks, deadline)
+                responses = await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                # Nothing outlives the call: on a deadline, queued and in-flight completions are cancelled
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
             
             final_responses = []
-            for i, response in enumerate(responses):
+            for (model, _, _), response in zip(calls, responses):
+                if isinstance(response, DeadlineExceeded):
+                    raise response
                 if isinstance(response, Exception):
-                    model = validated_prompts[i].model
                     final_responses.append(f"[Error: {model} failed - {str(response)[:100]}]")
                 else:
                     final_responses.append(response)
             
-            return final_responses
\ No newline at end of file
+            return final_responses
+    
+    async def _wait_within(self, tasks, deadline: Deadline):
+        """Wait for every task, polling the deadline; raise DeadlineExceeded once it passes or its client hangs up"""
+        pending = set(tasks)
+        while pending:
+            deadline.check()
+            _, pending = await asyncio.wait(pending, timeout=min(self.DEADLINE_POLL_INTERVAL, deadline.remaining()))
+
+@lru_cache(maxsize=None)
+def get_openrouter_client() -> OpenRouterClient:
+    """Shared client, created on first use instead of at import time"""
+    return OpenRouterClient()
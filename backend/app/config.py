@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 
 from dotenv import load_dotenv
@@ -5,10 +6,106 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
-    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL") or \
-        (_raise := (_ for _ in ()).throw(RuntimeError("DATABASE_URL not set")))
+    # postgres, or memory for tests and single-process embedded deployments without a database
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "postgres").lower()
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL") or (None if STORAGE_BACKEND == "memory" else
+        (_raise := (_ for _ in ()).throw(RuntimeError("DATABASE_URL not set"))))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Session-level connection for LISTEN, needed when DATABASE_URL points at a transaction-pooling PgBouncer
+    DATABASE_DIRECT_URL = os.getenv("DATABASE_DIRECT_URL") or SQLALCHEMY_DATABASE_URI
+    # Comma-separated read replicas for read-only service methods
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    # How long a user's reads stay on the primary after they write
+    READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY") or \
         (_raise := (_ for _ in ()).throw(RuntimeError("OPENROUTER_API_KEY not set")))
+    # Any OpenAI-compatible endpoint; point it at the fake provider (python -m app.clients.fake_provider) for testing
+    OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
     SECRET_KEY = os.getenv("SECRET_KEY") or \
         (_raise := (_ for _ in ()).throw(RuntimeError("SECRET_KEY is not set")))
+
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+    COMPRESSED_CACHE_MAX_BYTES = int(os.getenv("COMPRESSED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    RESULTS_CACHE_TTL = float(os.getenv("RESULTS_CACHE_TTL", "30"))
+    RESULTS_CACHE_STALE_TTL = float(os.getenv("RESULTS_CACHE_STALE_TTL", "300"))
+    RESULTS_CACHE_MAX_ENTRIES = int(os.getenv("RESULTS_CACHE_MAX_ENTRIES", "10000"))
+    RESULTS_CACHE_LISTEN = os.getenv("RESULTS_CACHE_LISTEN", "true").lower() == "true"
+
+    RESULTS_PUSH_INTERVAL = float(os.getenv("RESULTS_PUSH_INTERVAL", "2"))
+    RESULTS_STREAM_KEEPALIVE = float(os.getenv("RESULTS_STREAM_KEEPALIVE", "15"))
+
+    # Token buckets for tournament creation, one token per upstream completion
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    LLM_BUDGET_PER_MINUTE = float(os.getenv("LLM_BUDGET_PER_MINUTE", "120"))
+    LLM_BUDGET_BURST = float(os.getenv("LLM_BUDGET_BURST", "64"))
+    USER_LLM_BUDGET_PER_MINUTE = float(os.getenv("USER_LLM_BUDGET_PER_MINUTE", "32"))
+    USER_LLM_BUDGET_BURST = float(os.getenv("USER_LLM_BUDGET_BURST", "32"))
+    # Longest a creation waits for budget, and how many may wait per worker, before 429
+    ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "10"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "4"))
+
+    # Tournaments with more prompts are large brackets: stored compactly, responses generated in waves
+    EAGER_RESPONSE_LIMIT = int(os.getenv("EAGER_RESPONSE_LIMIT", "16"))
+    RESPONSE_WAVE_SIZE = int(os.getenv("RESPONSE_WAVE_SIZE", "16"))
+    # Upcoming matches of a large bracket materialized and shown to the user
+    MATCH_LOOKAHEAD = int(os.getenv("MATCH_LOOKAHEAD", "4"))
+
+    # How often each worker persists the adaptive format's pairwise results and folds in other workers'
+    ADAPTIVE_SYNC_INTERVAL = float(os.getenv("ADAPTIVE_SYNC_INTERVAL", "5"))
+
+    # Comma-separated judge models for flask judge run, each judging every match in both orders
+    JUDGE_MODELS = [model.strip() for model in os.getenv("JUDGE_MODELS", "meta-llama/llama-3.1-8b-instruct:free").split(",") if model.strip()]
+    # Matches judged per batch, and judge completions in flight at once
+    JUDGE_BATCH_SIZE = int(os.getenv("JUDGE_BATCH_SIZE", "16"))
+    JUDGE_CONCURRENCY = int(os.getenv("JUDGE_CONCURRENCY", "10"))
+
+    # Completions in flight across all questions of an evaluation set
+    EVALUATION_CONCURRENCY = int(os.getenv("EVALUATION_CONCURRENCY", "20"))
+
+    # Hedging sends a second copy of a completion still running after the model's HEDGE_PERCENTILE latency
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "1.0"))
+    # Latencies seen before a model is hedged at all
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    # Extra requests hedging may add, as a fraction of all requests, and how many may be saved up
+    HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+    HEDGE_BURST = float(os.getenv("HEDGE_BURST", "10"))
+    # Comma-separated model=fallback pairs; a hedge goes to the fallback instead of the same model
+    HEDGE_FALLBACK_MODELS = dict(
+        (model.strip(), fallback.strip()) for model, _, fallback in
+        (pair.partition("=") for pair in os.getenv("HEDGE_FALLBACK_MODELS", "").split(",") if "=" in pair)
+    )
+
+    SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", "8"))
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "120"))
+    SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+    # Seconds a tournament creation may take end to end, admission wait included; keep it under SERVER_TIMEOUT
+    CREATE_DEADLINE = float(os.getenv("CREATE_DEADLINE", "90"))
+    # Seconds a request may spend on a large bracket's next response wave, waiting for another request's included
+    WAVE_DEADLINE = float(os.getenv("WAVE_DEADLINE", "30"))
+    # Each open results stream holds a thread, so leave most threads to votes and creation
+    RESULTS_STREAM_MAX_PER_WORKER = int(os.getenv("RESULTS_STREAM_MAX_PER_WORKER", str(max(1, SERVER_THREADS // 2))))
+
+    # Per worker process; size the pool to cover every thread so requests do not queue for connections
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(SERVER_THREADS)))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "4"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+    # User tournaments per vote partition; fixed once partitions exist
+    VOTE_PARTITION_SIZE = int(os.getenv("VOTE_PARTITION_SIZE", "100000"))
+    VOTE_PARTITIONS_AHEAD = int(os.getenv("VOTE_PARTITIONS_AHEAD", "2"))
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+    ARCHIVE_TABLESPACE = os.getenv("ARCHIVE_TABLESPACE", "")
+
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
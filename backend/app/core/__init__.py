@@ -1,3 +1,6 @@
 from .database import db
+from .results_cache import results_cache
+from .broadcaster import results_broadcaster
+from .admission import admission_controller
 
-__all__=["db"]
\ No newline at end of file
+__all__=["db", "results_cache", "results_broadcaster", "admission_controller"]
\ No newline at end of file
@@ -0,0 +1,205 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import text
+from app.core.database import db
+from app.core.deadlines import Deadline
+from app.core.metrics import ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, ADMISSION_WAIT
+
+class Bucket(NamedTuple):
+    key: str
+    scope: str
+    capacity: float
+    rate: float  # tokens per second
+
+class AdmissionRejected(Exception):
+    """The LLM budget cannot cover a request within the allowed wait"""
+
+    def __init__(self, scope: str, retry_after: int):
+        super().__init__(f"LLM budget exhausted ({scope}), retry in {retry_after}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+class PostgresBucketStore:
+    """Token buckets in the admission_bucket table, shared by every worker process.
+
+    Refill and take happen in one upsert on the row, so concurrent takers serialize
+    on its lock. A request's buckets are taken in one transaction, all or nothing.
+    """
+
+    REFILLED = "LEAST(:capacity, admission_bucket.tokens + EXTRACT(EPOCH FROM now() - admission_bucket.updated_at) * :rate)"
+    TAKE = text(f"""
+        INSERT INTO admission_bucket (key, tokens, updated_at)
+        SELECT :key, :capacity - :cost, now() WHERE :capacity >= :cost
+        ON CONFLICT (key) DO UPDATE SET tokens = {REFILLED} - :cost, updated_at = now()
+        WHERE {REFILLED} >= :cost
+        RETURNING tokens
+    """)
+    AVAILABLE = text(f"SELECT {REFILLED} FROM admission_bucket WHERE key = :key")
+
+    def __init__(self, get_engine: Callable):
+        self._get_engine = get_engine
+
+    def take(self, buckets: List[Bucket], cost: float) -> Optional[Tuple[Bucket, float]]:
+        """Take cost from every bucket, or return the first short bucket and seconds until it refills"""
+        with self._get_engine().connect() as conn:
+            with conn.begin() as transaction:
+                for bucket in buckets:
+                    params = {'key': bucket.key, 'capacity': bucket.capacity, 'rate': bucket.rate, 'cost': cost}
+                    if conn.execute(self.TAKE, params).first() is None:
+                        available = conn.execute(self.AVAILABLE, params).scalar()
+                        if available is None:
+                            available = bucket.capacity
+                        transaction.rollback()
+                        return bucket, (cost - available) / bucket.rate
+        return None
+
+    def prune(self, idle_seconds: float) -> int:
+        """Delete buckets idle long enough to be full again, they behave like new ones"""
+        with self._get_engine().begin() as conn:
+            return conn.execute(text(
+                "DELETE FROM admission_bucket WHERE updated_at < now() - make_interval(secs => :idle)"
+            ), {'idle': idle_seconds}).rowcount
+
+class MemoryBucketStore:
+    """Process-local token buckets for the in-memory storage backend"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, buckets: List[Bucket], cost: float) -> Optional[Tuple[Bucket, float]]:
+        with self._lock:
+            now = self._clock()
+            levels = []
+            for bucket in buckets:
+                tokens, updated_at = self._buckets.get(bucket.key, (bucket.capacity, now))
+                tokens = min(bucket.capacity, tokens + (now - updated_at) * bucket.rate)
+                if tokens < cost:
+                    return bucket, (cost - tokens) / bucket.rate
+                levels.append(tokens)
+            for bucket, tokens in zip(buckets, levels):
+                self._buckets[bucket.key] = (tokens - cost, now)
+        return None
+
+    def prune(self, idle_seconds: float) -> int:
+        with self._lock:
+            cutoff = self._clock() - idle_seconds
+            idle = [key for key, (_, updated_at) in self._buckets.items() if updated_at < cutoff]
+            for key in idle:
+                del self._buckets[key]
+        return len(idle)
+
+class AdmissionController:
+    """Admits LLM-heavy requests against a global and a per-user token bucket.
+
+    One token is one upstream completion. A request that does not fit waits for the
+    buckets to refill when that takes at most max_wait seconds and fewer than
+    max_queue requests are already waiting in this process; otherwise it is rejected.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.store = None
+        self.global_bucket = None
+        self.user_capacity = 0.0
+        self.user_rate = 0.0
+        self.max_wait = 0.0
+        self.max_queue = 0
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config["ADMISSION_ENABLED"]
+        self.global_bucket = Bucket(
+            'global', 'global', config["LLM_BUDGET_BURST"], config["LLM_BUDGET_PER_MINUTE"] / 60
+        )
+        self.user_capacity = config["USER_LLM_BUDGET_BURST"]
+        self.user_rate = config["USER_LLM_BUDGET_PER_MINUTE"] / 60
+        self.max_wait = config["ADMISSION_MAX_WAIT"]
+        self.max_queue = config["ADMISSION_MAX_QUEUE"]
+        if config["STORAGE_BACKEND"] == "postgres":
+            self.store = PostgresBucketStore(lambda: db.engine)
+        else:
+            self.store = MemoryBucketStore()
+        app.extensions["admission"] = self
+
+    def buckets(self, user_id: Optional[str]) -> List[Bucket]:
+        """The global bucket, then the user's unless user_id is None"""
+        # Always in this order, so concurrent transactions lock rows the same way
+        if user_id is None:
+            return [self.global_bucket]
+        return [self.global_bucket, Bucket(f'user:{user_id}', 'user', self.user_capacity, self.user_rate)]
+
+    def acquire(self, user_id: Optional[str], cost: int, deadline: Optional[Deadline] = None):
+        """Block until cost tokens are taken from the user's and the global bucket, or raise AdmissionRejected.
+
+        With a deadline, the wait is also limited to the time the deadline leaves.
+        """
+        if not self.enabled:
+            return
+        buckets = self.buckets(user_id)
+        if cost > min(bucket.capacity for bucket in buckets):
+            raise ValueError(f"A request needing {cost} LLM calls exceeds the admission burst size")
+
+        start = time.monotonic()
+        wait_until = start + self.max_wait
+        if deadline is not None:
+            wait_until = min(wait_until, start + deadline.remaining())
+        queued = False
+        try:
+            while True:
+                denied = self.store.take(buckets, cost)
+                if denied is None:
+                    ADMISSION_WAIT.observe(time.monotonic() - start)
+                    return
+                bucket, wait = denied
+                retry_after = math.ceil(wait)
+                if time.monotonic() + wait > wait_until:
+                    ADMISSION_REJECTIONS.labels(bucket.scope).inc()
+                    raise AdmissionRejected(bucket.scope, retry_after)
+                if not queued:
+                    with self._lock:
+                        if self._waiting >= self.max_queue:
+                            ADMISSION_REJECTIONS.labels('queue').inc()
+                            raise AdmissionRejected('queue', retry_after)
+                        self._waiting += 1
+                    queued = True
+                    ADMISSION_QUEUE_DEPTH.inc()
+                time.sleep(wait)
+        finally:
+            if queued:
+                with self._lock:
+                    self._waiting -= 1
+                ADMISSION_QUEUE_DEPTH.dec()
+
+    def acquire_waiting(self, user_id: Optional[str], cost: int):
+        """Like acquire, but retry rejections until admitted, for batch jobs that should wait rather than fail.
+
+        Costs above the burst size are taken a burst at a time.
+        """
+        if not self.enabled:
+            return
+        burst = int(min(bucket.capacity for bucket in self.buckets(user_id)))
+        while cost > 0:
+            take = min(cost, burst)
+            while True:
+                try:
+                    self.acquire(user_id, take)
+                    break
+                except AdmissionRejected as e:
+                    time.sleep(e.retry_after)
+            cost -= take
+
+    def prune(self) -> int:
+        """Forget per-user buckets that have refilled completely"""
+        return self.store.prune(max(self.user_capacity / self.user_rate, self.global_bucket.capacity / self.global_bucket.rate))
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+admission_controller = AdmissionController()
@@ -0,0 +1,147 @@
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+from app.core.metrics import RESULTS_STREAMS
+
+logger = logging.getLogger(__name__)
+
+class SubscriberLimitReached(Exception):
+    """This process already holds as many push subscriptions as it allows"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many open results streams, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class _Channel:
+    __slots__ = ("subscribers", "compute", "encode", "dirty", "last_payload")
+
+    def __init__(self, compute, encode):
+        self.subscribers: Set[queue.Queue] = set()
+        self.compute = compute
+        self.encode = encode
+        self.dirty = False
+        self.last_payload: Optional[bytes] = None
+
+class ResultsBroadcaster:
+    """Fans tournament results out to push subscribers.
+
+    Invalidations only mark a tournament dirty; a single ticker thread per process
+    recomputes each dirty tournament at most once per interval and hands the same
+    encoded payload to every subscriber.
+
+    Each subscriber holds a server thread for as long as it listens, so at most
+    max_subscribers are allowed per process; the rest of the threads stay free for
+    votes and creation.
+    """
+
+    def __init__(self, interval: float = 2.0, queue_size: int = 8, max_subscribers: int = 4):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._app = None
+        self._channels: Dict[int, _Channel] = {}
+        self._subscribers = 0
+        self._lock = threading.Lock()
+        self._ticker_pid = None
+
+    def init_app(self, app):
+        self.interval = app.config["RESULTS_PUSH_INTERVAL"]
+        self.max_subscribers = app.config["RESULTS_STREAM_MAX_PER_WORKER"]
+        self._app = app
+        app.extensions["results_broadcaster"] = self
+
+    def subscribe(self, tournament_id: int, compute: Callable[[], Any],
+                  encode: Callable[[Any], bytes]) -> queue.Queue:
+        """Register a subscriber queue receiving encoded payloads for a tournament, or raise SubscriberLimitReached"""
+        self._ensure_ticker()
+        subscription = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if self._subscribers >= self.max_subscribers:
+                raise SubscriberLimitReached(math.ceil(self.interval * 5))
+            self._subscribers += 1
+            channel = self._channels.get(tournament_id)
+            if channel is None:
+                channel = self._channels[tournament_id] = _Channel(compute, encode)
+            channel.subscribers.add(subscription)
+        RESULTS_STREAMS.inc()
+        return subscription
+
+    def unsubscribe(self, tournament_id: int, subscription: queue.Queue):
+        with self._lock:
+            channel = self._channels.get(tournament_id)
+            if channel is None or subscription not in channel.subscribers:
+                return
+            channel.subscribers.discard(subscription)
+            self._subscribers -= 1
+            if not channel.subscribers:
+                del self._channels[tournament_id]
+        RESULTS_STREAMS.dec()
+
+    def mark_dirty(self, tournament_id: int):
+        """Schedule a broadcast for the next tick if anyone is subscribed"""
+        with self._lock:
+            channel = self._channels.get(tournament_id)
+            if channel is not None:
+                channel.dirty = True
+
+    def subscriber_count(self, tournament_id: int) -> int:
+        with self._lock:
+            channel = self._channels.get(tournament_id)
+            return len(channel.subscribers) if channel else 0
+
+    def tick(self):
+        """Recompute every dirty tournament once and publish to its subscribers"""
+        with self._lock:
+            dirty = [(tournament_id, channel) for tournament_id, channel in self._channels.items() if channel.dirty]
+            for _, channel in dirty:
+                channel.dirty = False
+
+        for tournament_id, channel in dirty:
+            try:
+                with self._app.app_context():
+                    payload = channel.encode(channel.compute())
+            except Exception:
+                logger.exception("Failed to compute results broadcast for tournament %s", tournament_id)
+                continue
+
+            with self._lock:
+                if payload == channel.last_payload:
+                    continue
+                channel.last_payload = payload
+                subscribers = list(channel.subscribers)
+
+            for subscription in subscribers:
+                self._offer(subscription, payload)
+
+    @staticmethod
+    def _offer(subscription: queue.Queue, payload: bytes):
+        # Slow consumers only need the latest state, so drop the oldest update
+        while True:
+            try:
+                subscription.put_nowait(payload)
+                return
+            except queue.Full:
+                try:
+                    subscription.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _ensure_ticker(self):
+        if self._ticker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._ticker_pid == os.getpid():
+                return
+            self._ticker_pid = os.getpid()
+        threading.Thread(target=self._run, name="results-broadcaster", daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.tick()
+
+results_broadcaster = ResultsBroadcaster()
@@ -0,0 +1,173 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html"}
+
+# Per-request compression favours speed, precompressed payloads are encoded once so they use the best ratio
+DYNAMIC_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+STATIC_LEVELS = {"zstd": 19, "br": 11, "gzip": 9}
+
+def _compress_gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def _compress_brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+def _compress_zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+# Ordered by preference when the client weighs several encodings equally
+ENCODERS: Dict[str, Callable[[bytes, int], bytes]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = _compress_zstd
+if brotli is not None:
+    ENCODERS["br"] = _compress_brotli
+ENCODERS["gzip"] = _compress_gzip
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in ENCODERS:
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress data with a supported content coding"""
+    if level is None:
+        level = DYNAMIC_LEVELS[encoding]
+    return ENCODERS[encoding](data, level)
+
+class CompressedPayloadCache:
+    """Byte-bounded LRU of encoded payloads keyed by (key, encoding)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            payload = self._entries.get((key, encoding))
+            if payload is not None:
+                self._entries.move_to_end((key, encoding))
+            return payload
+
+    def put(self, key: str, encoding: str, payload: bytes):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((key, encoding), None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[(key, encoding)] = payload
+            self._size += len(payload)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == key]:
+                self._size -= len(self._entries.pop(cache_key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+payload_cache = CompressedPayloadCache(max_bytes=64 * 1024 * 1024)
+
+def cached_payload_response(cache_key: str, build_payload: Callable[[], bytes],
+                            mimetype: str = "application/json") -> Response:
+    """Serve an immutable payload, compressing each encoding at most once per process"""
+    identity = payload_cache.get(cache_key, "identity")
+    if identity is None:
+        identity = build_payload()
+        payload_cache.put(cache_key, "identity", identity)
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    # A strong validator names one representation, so each content coding gets its own
+    etag = f"{hashlib.sha1(identity).hexdigest()}-{encoding or 'identity'}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        if encoding is None:
+            response = Response(identity, mimetype=mimetype)
+        else:
+            payload = payload_cache.get(cache_key, encoding)
+            if payload is None:
+                payload = compress(identity, encoding, STATIC_LEVELS[encoding])
+                payload_cache.put(cache_key, encoding, payload)
+            response = Response(payload, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "public, max-age=86400, immutable"
+    response.vary.add("Accept-Encoding")
+    return response
+
+def _compress_response(response: Response) -> Response:
+    """Compress eligible responses according to the request's Accept-Encoding"""
+    if (response.direct_passthrough or response.is_streamed or
+            "Content-Encoding" in response.headers or
+            response.mimetype not in COMPRESSIBLE_MIMETYPES or
+            not 200 <= response.status_code < 300):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < current_app.config["COMPRESSION_MIN_SIZE"]:
+        return response
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+def init_compression(app):
+    """Register response compression and size the payload cache from config"""
+    payload_cache.max_bytes = app.config["COMPRESSED_CACHE_MAX_BYTES"]
+    if app.config["COMPRESSION_ENABLED"]:
+        app.after_request(_compress_response)
@@ -1,3 +1,54 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from app.core.replicas import RoutingSession, replica_router
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+def engine_options(config) -> dict:
+    """Build SQLAlchemy engine options from the DB_* settings"""
+    options = {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+    timeout = config["DB_STATEMENT_TIMEOUT_MS"]
+    # PgBouncer in transaction mode rejects startup options, the timeout is set per transaction instead
+    if timeout and not config["DB_PGBOUNCER"]:
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+def set_statement_timeout_per_transaction(engine, timeout_ms: int):
+    """Apply statement_timeout with SET LOCAL at the start of every transaction.
+
+    Session-level settings leak between clients behind a transaction-pooling
+    PgBouncer, while SET LOCAL ends with the transaction that issued it.
+    """
+    @event.listens_for(engine, "begin")
+    def _set_local_timeout(conn):
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+        finally:
+            cursor.close()
+
+def init_database(app):
+    """Configure the engine and pool from config and bind the extension to the app"""
+    options = engine_options(app.config)
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+    db.init_app(app)
+    replica_router.init_app(app, options)
+
+    timeout = app.config["DB_STATEMENT_TIMEOUT_MS"]
+    if timeout and app.config["DB_PGBOUNCER"]:
+        with app.app_context():
+            for engine in [db.engine, *replica_router.engines]:
+                set_statement_timeout_per_transaction(engine, timeout)
+
+def reset_pool_after_fork(app):
+    """Drop pooled connections inherited from the parent without closing them for the parent"""
+    with app.app_context():
+        db.engine.dispose(close=False)
+    replica_router.dispose(close=False)
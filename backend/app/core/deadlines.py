@@ -0,0 +1,69 @@
+import select
+import socket
+import time
+from typing import Callable, Optional
+
+class DeadlineExceeded(Exception):
+    """A request's work outlived its deadline, or its client hung up first"""
+
+    def __init__(self, reason: str):
+        super().__init__("Client disconnected" if reason == 'disconnect' else "Request deadline exceeded")
+        self.reason = reason
+
+class Deadline:
+    """The time by which everything done for one request must finish.
+
+    Passed down from the route, so admission waits, queueing for upstream slots and
+    each upstream call spend from the same budget. cancelled is polled alongside the
+    clock, so a client that hangs up ends the work early too.
+    """
+
+    def __init__(self, expires_at: float, cancelled: Optional[Callable[[], bool]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.expires_at = expires_at
+        self.cancelled = cancelled or (lambda: False)
+        self.clock = clock
+
+    @classmethod
+    def after(cls, seconds: float, cancelled: Optional[Callable[[], bool]] = None,
+              clock: Callable[[], float] = time.monotonic) -> 'Deadline':
+        return cls(clock() + seconds, cancelled, clock)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self.clock())
+
+    def reason(self) -> Optional[str]:
+        """'timeout' or 'disconnect' once the work should stop, else None"""
+        if self.remaining() <= 0:
+            return 'timeout'
+        if self.cancelled():
+            return 'disconnect'
+        return None
+
+    def check(self):
+        """Raise DeadlineExceeded once the work should stop"""
+        reason = self.reason()
+        if reason is not None:
+            raise DeadlineExceeded(reason)
+
+def client_disconnected(environ) -> Callable[[], bool]:
+    """A check for whether the client of a WSGI request has closed its connection.
+
+    Peeks at the socket gunicorn or the development server exposes; the request body
+    has been read by then, so a readable socket with no data means the peer closed
+    it. Always False when the server does not expose its socket.
+    """
+    sock = environ.get("gunicorn.socket") or environ.get("werkzeug.socket")
+    if sock is None:
+        return lambda: False
+
+    def check() -> bool:
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b""
+        except ValueError:
+            # TLS sockets do not support peeking
+            return False
+        except OSError:
+            return True
+    return check
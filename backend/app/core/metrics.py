@@ -0,0 +1,185 @@
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', "Request latency by endpoint",
+    ['method', 'endpoint', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    'http_request_db_statements', "SQL statements executed per request",
+    ['endpoint'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_duration_seconds', "Time spent in SQL per request",
+    ['endpoint'], buckets=LATENCY_BUCKETS
+)
+DB_STATEMENTS = Counter('db_statements_total', "SQL statements executed")
+DB_STATEMENT_TIME = Histogram(
+    'db_statement_duration_seconds', "SQL statement execution time", buckets=FAST_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', "Time spent waiting for a pooled connection", buckets=FAST_BUCKETS
+)
+DB_POOL_TIMEOUTS = Counter('db_pool_timeouts_total', "Checkouts that gave up after DB_POOL_TIMEOUT")
+# livesum adds up the live worker processes under Gunicorn
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out_connections', "Connections currently checked out of the pool", multiprocess_mode='livesum'
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_open_connections', "Connections currently open by the pool", multiprocess_mode='livesum'
+)
+LLM_LATENCY = Histogram(
+    'llm_request_duration_seconds', "Upstream LLM completion latency",
+    ['model', 'outcome'], buckets=LATENCY_BUCKETS
+)
+SECTION_TIME = Histogram(
+    'app_section_duration_seconds', "Time spent in named application sections",
+    ['section'], buckets=FAST_BUCKETS
+)
+RESULTS_STREAMS = Gauge(
+    'results_streams_open', "Open results event streams, each holding a server thread", multiprocess_mode='livesum'
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    'admission_queue_depth', "Requests waiting for LLM budget", multiprocess_mode='livesum'
+)
+ADMISSION_REJECTIONS = Counter(
+    'admission_rejections_total', "Requests rejected for lack of LLM budget", ['scope']
+)
+ADMISSION_WAIT = Histogram(
+    'admission_wait_seconds', "Time admitted requests waited for LLM budget", buckets=LATENCY_BUCKETS
+)
+LLM_HEDGES = Counter(
+    'llm_hedges_total', "Hedged LLM completions by outcome: won, lost or throttled", ['model', 'outcome']
+)
+DEADLINES_EXCEEDED = Counter(
+    'deadlines_exceeded_total', "Requests abandoned by reason: timeout or disconnect", ['endpoint', 'reason']
+)
+JUDGE_VERDICTS = Counter(
+    'judge_verdicts_total', "LLM judge verdicts by source: llm, cache or invalid", ['model', 'source']
+)
+
+def _add_timing(name: str, seconds: float):
+    """Accumulate a duration into the current request's Server-Timing entries"""
+    if not has_request_context():
+        return
+    timings = g.setdefault('server_timings', {})
+    total, count = timings.get(name, (0.0, 0))
+    timings[name] = (total + seconds, count + 1)
+
+@contextmanager
+def timed(section: str):
+    """Time a block, recording it as a metric and in the Server-Timing header"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SECTION_TIME.labels(section).observe(elapsed)
+        _add_timing(section, elapsed)
+
+def record_llm_call(model: str, outcome: str, seconds: float):
+    LLM_LATENCY.labels(model, outcome).observe(seconds)
+    _add_timing('llm', seconds)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_POOL_WAIT.observe(elapsed)
+            _add_timing('db-pool', elapsed)
+
+@event.listens_for(Pool, 'connect')
+def _pool_connect(dbapi_connection, connection_record):
+    DB_POOL_CONNECTIONS.inc()
+
+@event.listens_for(Pool, 'close')
+def _pool_close(dbapi_connection, connection_record):
+    DB_POOL_CONNECTIONS.dec()
+
+@event.listens_for(Pool, 'close_detached')
+def _pool_close_detached(dbapi_connection):
+    DB_POOL_CONNECTIONS.dec()
+
+@event.listens_for(Pool, 'checkout')
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+@event.listens_for(Pool, 'checkin')
+def _pool_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('statement_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['statement_start'].pop()
+    DB_STATEMENTS.inc()
+    DB_STATEMENT_TIME.observe(elapsed)
+    _add_timing('db', elapsed)
+
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+def _record_request(response: Response) -> Response:
+    if 'request_start' not in g:
+        return response
+
+    elapsed = time.perf_counter() - g.request_start
+    endpoint = request.endpoint or 'unmatched'
+    if endpoint == 'metrics':
+        return response
+
+    timings = g.get('server_timings', {})
+    REQUEST_LATENCY.labels(request.method, endpoint, response.status_code).observe(elapsed)
+    db_time, db_statements = timings.get('db', (0.0, 0))
+    REQUEST_DB_STATEMENTS.labels(endpoint).observe(db_statements)
+    REQUEST_DB_TIME.labels(endpoint).observe(db_time)
+
+    entries = [
+        f'{name};dur={total * 1000:.2f};desc="{count}x"'
+        for name, (total, count) in timings.items()
+    ]
+    entries.append(f'total;dur={elapsed * 1000:.2f}')
+    response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+def _metrics_view():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Under Gunicorn every worker writes its own files, aggregate them at scrape time
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+def init_metrics(app):
+    """Time requests, expose /metrics and instrument the connection pool; call before db.init_app"""
+    if not app.config['METRICS_ENABLED']:
+        return
+    engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    engine_options.setdefault('poolclass', InstrumentedQueuePool)
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', _metrics_view)
@@ -0,0 +1,85 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import List
+from flask import has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+PRIMARY_UNTIL_KEY = "read_primary_until"
+
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+_force_primary: ContextVar[bool] = ContextVar("force_primary", default=False)
+
+class ReplicaRouter:
+    """Routes reads marked read-only to replica engines and everything else to the primary"""
+
+    def __init__(self):
+        self.engines: List[Engine] = []
+        self.sticky_seconds = 0.0
+
+    def init_app(self, app, engine_options: dict):
+        self.dispose()
+        self.engines = [create_engine(url, **engine_options) for url in app.config["DATABASE_REPLICA_URLS"]]
+        self.sticky_seconds = app.config["READ_YOUR_WRITES_SECONDS"]
+        app.extensions["replica_router"] = self
+
+    def choose(self) -> Engine:
+        return random.choice(self.engines)
+
+    def should_use_replica(self) -> bool:
+        if not self.engines or not _use_replica.get() or _force_primary.get():
+            return False
+        # A user who just wrote reads from the primary until replicas have caught up
+        if has_request_context() and session.get(PRIMARY_UNTIL_KEY, 0) > time.time():
+            return False
+        return True
+
+    def stick_to_primary(self):
+        """Send the current user's reads to the primary for READ_YOUR_WRITES_SECONDS"""
+        if self.engines and has_request_context():
+            session[PRIMARY_UNTIL_KEY] = time.time() + self.sticky_seconds
+
+    def dispose(self, close: bool = True):
+        for engine in self.engines:
+            engine.dispose(close=close)
+
+replica_router = ReplicaRouter()
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends read-only work to a replica when one is configured"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and self.bind is None and not self._flushing
+                and replica_router.should_use_replica()):
+            return replica_router.choose()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@contextmanager
+def replica_reads():
+    """Allow queries inside the block to be served by a replica"""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+@contextmanager
+def primary_reads():
+    """Force queries inside the block to the primary, overriding replica_reads"""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+def read_only(f):
+    """Mark a service method as safe to serve from a replica"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with replica_reads():
+            return f(*args, **kwargs)
+    return decorated_function
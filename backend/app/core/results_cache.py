@@ -0,0 +1,234 @@
+import logging
+import os
+import select
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+import psycopg2
+import psycopg2.extensions
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from app.core.replicas import primary_reads
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "tournament_results"
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "invalidated", "refreshing")
+
+    def __init__(self, value, fresh_until, stale_until):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.invalidated = False
+        self.refreshing = False
+
+class ResultsCache:
+    """Per-tournament results cache with TTL, stale-while-revalidate and
+    invalidation shared across worker processes through Postgres LISTEN/NOTIFY.
+
+    At most max_entries tournaments are kept, least recently read first out, and
+    entries past their stale TTL are swept out once per TTL.
+    """
+
+    def __init__(self, ttl: float = 30, stale_ttl: float = 300, max_entries: int = 10000):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.listen = False
+        self._dsn = None
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        # Bumped by invalidations, and only tracked while a tournament is cached or being computed
+        self._generations: Dict[int, int] = {}
+        self._computing: Dict[int, int] = {}
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._listener_pid = None
+        self._invalidation_callbacks: List[Callable[[int], None]] = []
+
+    def init_app(self, app):
+        self.ttl = app.config["RESULTS_CACHE_TTL"]
+        self.stale_ttl = app.config["RESULTS_CACHE_STALE_TTL"]
+        self.max_entries = app.config["RESULTS_CACHE_MAX_ENTRIES"]
+        # Without Postgres there is a single process and nothing to listen to
+        self.listen = app.config["RESULTS_CACHE_LISTEN"] and app.config["STORAGE_BACKEND"] == "postgres"
+        if self.listen:
+            self._dsn = make_url(app.config["DATABASE_DIRECT_URL"]).set(
+                drivername="postgresql").render_as_string(hide_password=False)
+        app.extensions["results_cache"] = self
+
+    def get(self, tournament_id: int, compute: Callable[[], Any]) -> Any:
+        """Return cached results for a tournament.
+
+        Values past their TTL are served while a background refresh runs. After an
+        explicit invalidation the next caller recomputes synchronously against the
+        primary, so a voter sees their own completion, while concurrent callers keep
+        the previous value.
+        """
+        self._ensure_listener()
+        now = time.monotonic()
+        invalidated = False
+        with self._lock:
+            entry = self._entries.get(tournament_id)
+            if entry is not None:
+                self._entries.move_to_end(tournament_id)
+                invalidated = entry.invalidated
+                if now < entry.fresh_until or entry.refreshing:
+                    return entry.value
+                entry.refreshing = True
+                self._computing[tournament_id] = self._computing.get(tournament_id, 0) + 1
+                if now < entry.stale_until and not entry.invalidated:
+                    threading.Thread(
+                        target=self._refresh,
+                        args=(current_app._get_current_object(), tournament_id, compute),
+                        daemon=True
+                    ).start()
+                    return entry.value
+            else:
+                self._computing[tournament_id] = self._computing.get(tournament_id, 0) + 1
+            generation = self._generations.get(tournament_id, 0)
+
+        try:
+            # A replica may not have the write behind the invalidation yet
+            with primary_reads() if invalidated else nullcontext():
+                value = compute()
+        except Exception:
+            self._release(tournament_id)
+            raise
+        self._store(tournament_id, value, generation)
+        return value
+
+    def invalidate(self, tournament_id: int):
+        """Mark a tournament's results stale in this process"""
+        with self._lock:
+            entry = self._entries.get(tournament_id)
+            if entry is not None or tournament_id in self._computing:
+                self._generations[tournament_id] = self._generations.get(tournament_id, 0) + 1
+            if entry is not None:
+                entry.fresh_until = 0
+                entry.invalidated = True
+        for callback in self._invalidation_callbacks:
+            callback(tournament_id)
+
+    def invalidate_all(self):
+        with self._lock:
+            tournament_ids = list(self._entries)
+        for tournament_id in tournament_ids:
+            self.invalidate(tournament_id)
+
+    def notify(self, session, tournament_id: int):
+        """Queue a cross-process invalidation, delivered when the session's transaction commits"""
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": NOTIFY_CHANNEL, "payload": str(tournament_id)}
+        )
+
+    def add_invalidation_callback(self, callback: Callable[[int], None]):
+        if callback not in self._invalidation_callbacks:
+            self._invalidation_callbacks.append(callback)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._computing.clear()
+
+    def _store(self, tournament_id: int, value: Any, generation: int):
+        now = time.monotonic()
+        with self._lock:
+            # An invalidation that raced with the computation leaves the value usable but stale
+            current_generation = self._generations.get(tournament_id, 0)
+            fresh_until = now + self.ttl if generation == current_generation else 0
+            self._entries[tournament_id] = _Entry(value, fresh_until, now + self.ttl + self.stale_ttl)
+            self._entries.move_to_end(tournament_id)
+            self._done_computing(tournament_id)
+            self._evict(now)
+
+    def _refresh(self, app, tournament_id: int, compute: Callable[[], Any]):
+        with self._lock:
+            generation = self._generations.get(tournament_id, 0)
+        try:
+            with app.app_context():
+                value = compute()
+            self._store(tournament_id, value, generation)
+        except Exception:
+            logger.exception("Background results refresh failed for tournament %s", tournament_id)
+            self._release(tournament_id)
+
+    def _release(self, tournament_id: int):
+        with self._lock:
+            entry = self._entries.get(tournament_id)
+            if entry is not None:
+                entry.refreshing = False
+            self._done_computing(tournament_id)
+            if entry is None:
+                self._forget(tournament_id)
+
+    def _done_computing(self, tournament_id: int):
+        count = self._computing.pop(tournament_id, 1) - 1
+        if count:
+            self._computing[tournament_id] = count
+
+    def _forget(self, tournament_id: int):
+        """Drop a tournament's entry, and its generation unless a computation still needs it"""
+        self._entries.pop(tournament_id, None)
+        if tournament_id not in self._computing:
+            self._generations.pop(tournament_id, None)
+
+    def _evict(self, now: float):
+        """Drop entries past their stale TTL once per TTL, then the least recently read beyond max_entries"""
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.ttl
+            for tournament_id in [key for key, entry in self._entries.items()
+                                  if entry.stale_until <= now and not entry.refreshing]:
+                self._forget(tournament_id)
+        while len(self._entries) > self.max_entries:
+            self._forget(next(iter(self._entries)))
+
+    def _ensure_listener(self):
+        # Threads do not survive fork, so every worker process starts its own listener
+        if not self.listen or self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        threading.Thread(target=self._listen_forever, name="results-cache-listener", daemon=True).start()
+
+    def _listen_forever(self):
+        backoff = 1
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(self._dsn)
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                connection.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                # Notifications may have been missed while disconnected
+                self.invalidate_all()
+                backoff = 1
+                while True:
+                    if select.select([connection], [], [], 5) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        self._handle_notification(notification.payload)
+            except Exception as e:
+                logger.warning("Results cache listener disconnected: %s", e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def _handle_notification(self, payload: Optional[str]):
+        try:
+            self.invalidate(int(payload))
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed results notification: %r", payload)
+
+results_cache = ResultsCache()
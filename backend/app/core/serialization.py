@@ -0,0 +1,22 @@
+import json
+from typing import Any
+from flask import Response
+from pydantic import BaseModel
+from app.core.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+def dumps(obj: Any) -> bytes:
+    """Encode plain Python data to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+def json_response(model: BaseModel, status: int = 200) -> Response:
+    """Build a JSON response straight from a pydantic model without a dict round trip"""
+    with timed("serialize"):
+        body = model.model_dump_json()
+    return Response(body, status=status, mimetype="application/json")
@@ -0,0 +1,15 @@
+from app.formats.adaptive import Adaptive
+from app.formats.base import TournamentFormat
+from app.formats.double_elimination import DoubleElimination
+from app.formats.round_robin import RoundRobin
+from app.formats.single_elimination import SingleElimination
+from app.formats.swiss import Swiss
+
+DEFAULT_FORMAT = SingleElimination.name
+FORMATS = {fmt.name: fmt for fmt in (SingleElimination(), DoubleElimination(), RoundRobin(), Swiss(), Adaptive())}
+
+def get_format(name: str) -> TournamentFormat:
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(f"Unknown tournament format: {name}")
@@ -0,0 +1,42 @@
+import random
+from app.formats.base import TournamentFormat, decode_matches, encode_matches, round_decided, standings
+
+class Adaptive(TournamentFormat):
+    """n - 1 single-match rounds whose pairs the match scheduler picks as the voter goes.
+
+    The template only holds open slots; the service fills the next one through
+    schedule once the previous match is decided, so every vote lands on the pair
+    that is most informative given everyone's votes so far. The champion is the
+    voter's own top prompt by standings.
+    """
+
+    name = 'adaptive'
+    scheduled = True
+
+    def seed(self, num_prompts):
+        seeding = list(range(num_prompts))
+        random.shuffle(seeding)
+        return seeding
+
+    def build(self, seeding):
+        return [[{'participant1': None, 'participant2': None, 'winner': None}] for _ in range(len(seeding) - 1)]
+
+    def schedule(self, bracket, pair):
+        """Fill the first open slot with a pair"""
+        match = next(round_matches[0] for round_matches in bracket if round_matches[0]['participant1'] is None)
+        match['participant1'], match['participant2'] = pair
+
+    def record_result(self, bracket, round_number, match_number, winner_index):
+        bracket[round_number][match_number]['winner'] = winner_index
+
+    def champion(self, bracket):
+        if not round_decided(bracket[-1]):
+            return None
+        return standings(bracket)[0]
+
+    def encode(self, bracket):
+        """Pairs are chosen per voter, so store (participant1, participant2, winner) per match"""
+        return encode_matches(bracket)
+
+    def decode(self, template, encoded):
+        return decode_matches(encoded, 1)
@@ -0,0 +1,124 @@
+import struct
+from itertools import chain
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from app.utils import UNDECIDED, encode_bracket_winners
+
+Bracket = List[List[Dict]]
+
+@dataclass
+class Record:
+    wins: int = 0
+    byes: int = 0
+    opponents: Set[int] = field(default_factory=set)
+    beaten: List[int] = field(default_factory=list)
+
+def tally(bracket: Bracket) -> Dict[int, Record]:
+    """Wins, byes and opponents per participant over the decided matches; a bye counts as a win"""
+    records = {}
+    for round_matches in bracket:
+        for match in round_matches:
+            p1, p2, winner = match['participant1'], match['participant2'], match['winner']
+            for participant in (p1, p2):
+                if participant is not None and participant != -1:
+                    records.setdefault(participant, Record())
+            if winner is None or winner == -1:
+                continue
+            records[winner].wins += 1
+            if -1 in (p1, p2):
+                records[winner].byes += 1
+                continue
+            loser = p2 if winner == p1 else p1
+            records[winner].beaten.append(loser)
+            records[p1].opponents.add(p2)
+            records[p2].opponents.add(p1)
+    return records
+
+def standings(bracket: Bracket) -> List[int]:
+    """Participants by wins, then the wins of the opponents they beat, then first-round slot"""
+    records = tally(bracket)
+    slots = first_round_slots(bracket)
+    return sorted(records, key=lambda p: (
+        -records[p].wins, -sum(records[q].wins for q in records[p].beaten), slots.get(p, len(slots))
+    ))
+
+def first_round_slots(bracket: Bracket) -> Dict[int, int]:
+    participants = [p for match in bracket[0] for p in (match['participant1'], match['participant2'])]
+    return {p: slot for slot, p in enumerate(participants) if p is not None and p != -1}
+
+def round_decided(round_matches: List[Dict]) -> bool:
+    return all(match['winner'] is not None for match in round_matches)
+
+def encode_matches(bracket: Bracket) -> bytes:
+    """(participant1, participant2, winner) int16 triplets per match, UNDECIDED for None"""
+    values = [UNDECIDED if value is None else value for value in chain.from_iterable(
+        (match['participant1'], match['participant2'], match['winner'])
+        for round_matches in bracket for match in round_matches
+    )]
+    return struct.pack(f'<{len(values)}h', *values)
+
+def decode_matches(encoded: bytes, per_round: int) -> Bracket:
+    values = [None if value == UNDECIDED else value for value in struct.unpack(f'<{len(encoded) // 2}h', encoded)]
+    matches = [
+        {'participant1': values[i], 'participant2': values[i + 1], 'winner': values[i + 2]}
+        for i in range(0, len(values), 3)
+    ]
+    return [matches[i:i + per_round] for i in range(0, len(matches), per_round)]
+
+class TournamentFormat(ABC):
+    """How a tournament pairs prompts into matches and decides its overall winner.
+
+    Brackets are lists of rounds of match dicts (participant1, participant2, winner)
+    with -1 for a bye and None for a participant not known yet. Formats may append
+    rounds as results come in; the template is whatever is known before any vote.
+    """
+
+    name = None
+    max_prompts = None
+    # Scheduled formats leave pairs open in the template for the match scheduler to fill, see schedule
+    scheduled = False
+
+    def check_size(self, num_prompts: int):
+        if num_prompts < 2:
+            raise ValueError("At least 2 prompts required")
+        if self.max_prompts is not None and num_prompts > self.max_prompts:
+            raise ValueError(f"The {self.name} format supports at most {self.max_prompts} prompts")
+
+    @abstractmethod
+    def seed(self, num_prompts: int) -> List[int]:
+        """Randomized first-round slots, -1 for a bye"""
+
+    @abstractmethod
+    def build(self, seeding: List[int]) -> Bracket:
+        """Bracket template for a seeding"""
+
+    @abstractmethod
+    def record_result(self, bracket: Bracket, round_number: int, match_number: int, winner_index: int):
+        """Decide a match and advance the bracket in place"""
+
+    @abstractmethod
+    def champion(self, bracket: Bracket) -> Optional[int]:
+        """Overall winner once the bracket is decided, otherwise None"""
+
+    def create(self, num_prompts: int) -> Bracket:
+        return self.build(self.seed(num_prompts))
+
+    def encode(self, bracket: Bracket) -> bytes:
+        """Compact bracket state for storage, see decode"""
+        return encode_bracket_winners(bracket, partial=True)
+
+    def decode(self, template: Bracket, encoded: bytes) -> Bracket:
+        """Replay encoded winners onto the template in (round, match) order"""
+        winners = struct.unpack(f'<{len(encoded) // 2}h', encoded)
+        bracket = [[dict(match) for match in round_matches] for round_matches in template]
+        position = 0
+        round_number = 0
+        while round_number < len(bracket) and position < len(winners):
+            for match_number, match in enumerate(bracket[round_number]):
+                winner = winners[position]
+                position += 1
+                if winner != UNDECIDED and match['winner'] is None:
+                    self.record_result(bracket, round_number, match_number, winner)
+            round_number += 1
+        return bracket
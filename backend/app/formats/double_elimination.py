@@ -0,0 +1,75 @@
+from app.formats.base import TournamentFormat
+from app.utils import create_seeding
+
+def _empty_match():
+    return {'participant1': None, 'participant2': None, 'winner': None}
+
+class DoubleElimination(TournamentFormat):
+    """Winners and losers brackets and a grand final; a prompt is out after its second loss.
+
+    Rounds are laid out as the k winners-bracket rounds, then the 2(k - 1)
+    losers-bracket rounds, then the grand final, for a bracket of 2^k slots. Losers
+    round 2m takes the winners of the round before it pairwise (the losers of
+    winners round 0 for m = 0), and round 2m + 1 sets those winners against the
+    losers of winners round m + 1, in reverse order to put off rematches. Every
+    destination is arithmetic on (round, match), so a vote is O(1) apart from walking
+    prompts past byes. There is no bracket reset: the grand final decides.
+    """
+
+    name = 'double_elimination'
+
+    def seed(self, num_prompts):
+        return create_seeding(num_prompts)
+
+    def build(self, seeding):
+        depth = len(seeding).bit_length() - 1
+        winners = [[_empty_match() for _ in range(len(seeding) >> (r + 1))] for r in range(depth)]
+        losers = [[_empty_match() for _ in range(len(seeding) >> (j // 2 + 2))] for j in range(2 * (depth - 1))]
+        bracket = winners + losers + [[_empty_match()]]
+        for slot, participant in enumerate(seeding):
+            self._place(bracket, 0, slot // 2, slot % 2, participant)
+        return bracket
+
+    @staticmethod
+    def _depth(bracket):
+        return (2 * len(bracket[0])).bit_length() - 1
+
+    def _place(self, bracket, round_number, match_number, slot, participant):
+        """Put a participant in a match slot, walking it through if its opponent is a bye"""
+        match = bracket[round_number][match_number]
+        match['participant1' if slot == 0 else 'participant2'] = participant
+        p1, p2 = match['participant1'], match['participant2']
+        if p1 is not None and p2 is not None and match['winner'] is None and -1 in (p1, p2):
+            self.record_result(bracket, round_number, match_number, p2 if p1 == -1 else p1)
+
+    def record_result(self, bracket, round_number, match_number, winner_index):
+        match = bracket[round_number][match_number]
+        match['winner'] = winner_index
+        loser = match['participant2'] if winner_index == match['participant1'] else match['participant1']
+        depth = self._depth(bracket)
+        grand_final = len(bracket) - 1
+
+        if round_number == grand_final:
+            return
+        if round_number < depth:
+            if round_number + 1 < depth:
+                self._place(bracket, round_number + 1, match_number // 2, match_number % 2, winner_index)
+            else:
+                self._place(bracket, grand_final, 0, 0, winner_index)
+
+            if depth == 1:
+                self._place(bracket, grand_final, 0, 1, loser)
+            elif round_number == 0:
+                self._place(bracket, depth, match_number // 2, match_number % 2, loser)
+            else:
+                target = depth + 2 * round_number - 1
+                self._place(bracket, target, len(bracket[target]) - 1 - match_number, 1, loser)
+        elif round_number + 1 == grand_final:
+            self._place(bracket, grand_final, 0, 1, winner_index)
+        elif (round_number - depth) % 2 == 0:
+            self._place(bracket, round_number + 1, match_number, 0, winner_index)
+        else:
+            self._place(bracket, round_number + 1, match_number // 2, match_number % 2, winner_index)
+
+    def champion(self, bracket):
+        return bracket[-1][0]['winner']
@@ -0,0 +1,34 @@
+import random
+from app.formats.base import TournamentFormat, round_decided, standings
+
+class RoundRobin(TournamentFormat):
+    """Every prompt meets every other once, ranked by wins; only practical for small fields"""
+
+    name = 'round_robin'
+    max_prompts = 16
+
+    def seed(self, num_prompts):
+        seeding = list(range(num_prompts))
+        random.shuffle(seeding)
+        return seeding
+
+    def build(self, seeding):
+        """Circle method: fix the first slot and rotate the rest, dropping pairings with the odd one out"""
+        slots = list(seeding) + ([-1] if len(seeding) % 2 else [])
+        size = len(slots)
+        bracket = []
+        for _ in range(size - 1):
+            bracket.append([
+                {'participant1': slots[i], 'participant2': slots[size - 1 - i], 'winner': None}
+                for i in range(size // 2) if -1 not in (slots[i], slots[size - 1 - i])
+            ])
+            slots = [slots[0], slots[-1]] + slots[1:-1]
+        return bracket
+
+    def record_result(self, bracket, round_number, match_number, winner_index):
+        bracket[round_number][match_number]['winner'] = winner_index
+
+    def champion(self, bracket):
+        if not all(round_decided(round_matches) for round_matches in bracket):
+            return None
+        return standings(bracket)[0]
@@ -0,0 +1,38 @@
+from app.formats.base import TournamentFormat
+from app.utils import bracket_from_seeding, create_seeding, decode_bracket_winners
+
+class SingleElimination(TournamentFormat):
+    """Knockout bracket, winners advance until one is left"""
+
+    name = 'single_elimination'
+
+    def seed(self, num_prompts):
+        return create_seeding(num_prompts)
+
+    def build(self, seeding):
+        return bracket_from_seeding(seeding)
+
+    def record_result(self, bracket, round_number, match_number, winner_index):
+        bracket[round_number][match_number]['winner'] = winner_index
+        self.advance_winner(bracket, round_number, match_number, winner_index)
+
+    @staticmethod
+    def advance_winner(bracket, round_number, match_number, winner_index):
+        """Advance winner to next round in bracket"""
+        if round_number >= len(bracket) - 1:
+            return
+        
+        next_round = round_number + 1
+        next_match = match_number // 2
+        
+        if next_round < len(bracket) and next_match < len(bracket[next_round]):
+            if match_number % 2 == 0:
+                bracket[next_round][next_match]['participant1'] = winner_index
+            else:
+                bracket[next_round][next_match]['participant2'] = winner_index
+
+    def champion(self, bracket):
+        return bracket[-1][0]['winner']
+
+    def decode(self, template, encoded):
+        return decode_bracket_winners(template, encoded)
@@ -0,0 +1,95 @@
+import math
+import random
+from app.formats.base import (
+    TournamentFormat, decode_matches, encode_matches, first_round_slots, round_decided, standings, tally
+)
+
+class Swiss(TournamentFormat):
+    """ceil(log2 n) rounds pairing prompts with equal scores, without eliminating anyone.
+
+    Each round is paired once the previous one is decided: sort by score, give the
+    lowest-ranked prompt without a bye the bye, then pair down the list skipping
+    rematches, swapping with a nearby pair when the tail is left with one. Sorting
+    dominates, O(n log n) per round.
+    """
+
+    name = 'swiss'
+
+    def seed(self, num_prompts):
+        seeding = list(range(num_prompts))
+        random.shuffle(seeding)
+        return seeding + ([-1] if num_prompts % 2 else [])
+
+    def build(self, seeding):
+        return [[self._match(seeding[i], seeding[i + 1]) for i in range(0, len(seeding), 2)]]
+
+    @staticmethod
+    def _match(p1, p2):
+        return {'participant1': p1, 'participant2': p2, 'winner': p1 if p2 == -1 else None}
+
+    @staticmethod
+    def rounds(bracket):
+        participants = len(first_round_slots(bracket))
+        return max(1, math.ceil(math.log2(participants)))
+
+    def record_result(self, bracket, round_number, match_number, winner_index):
+        bracket[round_number][match_number]['winner'] = winner_index
+        # Only the newest round takes votes, and pairing it needs every result
+        if len(bracket) < self.rounds(bracket) and round_decided(bracket[-1]):
+            bracket.append(self._pair(bracket))
+
+    def _pair(self, bracket):
+        records = tally(bracket)
+        slots = first_round_slots(bracket)
+        ranked = sorted(records, key=lambda p: (-records[p].wins, slots[p]))
+
+        bye = None
+        if len(ranked) % 2:
+            bye = next((p for p in reversed(ranked) if records[p].byes == 0), ranked[-1])
+            ranked.remove(bye)
+
+        # Reversed so the best unpaired prompt pops off the end; a partner is at most
+        # one place per earlier opponent away, so each pairing costs O(log n)
+        pending = ranked[::-1]
+        pairs = []
+        while pending:
+            p = pending.pop()
+            opponents = records[p].opponents
+            j = next((j for j in range(len(pending) - 1, -1, -1) if pending[j] not in opponents), len(pending) - 1)
+            pairs.append((p, pending.pop(j)))
+        self._resolve_rematches(pairs, records)
+
+        matches = [self._match(p1, p2) for p1, p2 in pairs]
+        if bye is not None:
+            matches.append(self._match(bye, -1))
+        return matches
+
+    @staticmethod
+    def _resolve_rematches(pairs, records):
+        """Swap partners with the nearest earlier pair where the greedy pass was left with a rematch"""
+        def fresh(a, b):
+            return b not in records[a].opponents
+
+        for i, (a, b) in enumerate(pairs):
+            if fresh(a, b):
+                continue
+            for k in range(i - 1, -1, -1):
+                c, d = pairs[k]
+                if fresh(c, a) and fresh(d, b):
+                    pairs[k], pairs[i] = (c, a), (d, b)
+                    break
+                if fresh(c, b) and fresh(d, a):
+                    pairs[k], pairs[i] = (c, b), (d, a)
+                    break
+
+    def champion(self, bracket):
+        if len(bracket) < self.rounds(bracket) or not round_decided(bracket[-1]):
+            return None
+        return standings(bracket)[0]
+
+    def encode(self, bracket):
+        """Pairings depend on earlier results, so store (participant1, participant2, winner) per match"""
+        return encode_matches(bracket)
+
+    def decode(self, template, encoded):
+        return decode_matches(encoded, len(template[0]))
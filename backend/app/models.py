@@ -1,21 +1,48 @@
-import copy
 from datetime import datetime
 from app import db
-from sqlalchemy import UniqueConstraint, Index, text
-from sqlalchemy.dialects.postgresql import JSONB, SMALLINT
+from app.formats import DEFAULT_FORMAT, get_format
+from app.utils import decode_seeding, find_next_votable_match
+from sqlalchemy import DDL, UniqueConstraint, Index, event, text
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.dialects.postgresql import JSONB, SMALLINT, TSVECTOR
+
+class EvaluationSet(db.Model):
+    """The same prompts run across several questions, one tournament per question"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.Text, nullable=False)
+    format = db.Column(db.String(32), nullable=False, default=DEFAULT_FORMAT)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    tournaments = db.relationship('Tournament', backref='evaluation_set', lazy=True, order_by='Tournament.id')
 
 class Tournament(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     question = db.Column(db.Text, nullable=False)
+    format = db.Column(db.String(32), nullable=False, default=DEFAULT_FORMAT, server_default=DEFAULT_FORMAT)
     bracket_template = db.Column(JSONB)
+    # Large brackets store only their first-round slots, see encode_seeding, and leave bracket_template null
+    seeding = db.Column(db.LargeBinary)
+    evaluation_set_id = db.Column(db.Integer, db.ForeignKey('evaluation_set.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    search_vector = db.Column(
+        TSVECTOR,
+        db.Computed("setweight(to_tsvector('english', question), 'A')", persisted=True)
+    )
     
     user_tournaments = db.relationship('UserTournament', backref='tournament', lazy=True, cascade='all, delete-orphan')
     prompts = db.relationship('TournamentPrompt', backref='tournament', lazy=True, cascade='all, delete-orphan', order_by='TournamentPrompt.position')
     
     __table_args__ = (
         Index('ix_tournament_created_at', 'created_at'),
+        Index('ix_tournament_search', 'search_vector', postgresql_using='gin'),
+        Index('ix_tournament_evaluation_set', 'evaluation_set_id', postgresql_where=text('evaluation_set_id IS NOT NULL')),
     )
+    
+    def get_template(self):
+        """Bracket template, rebuilt from the seeding for large brackets"""
+        if self.bracket_template is not None:
+            return self.bracket_template
+        return get_format(self.format).build(decode_seeding(self.seeding))
 
 class TournamentPrompt(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -25,11 +52,20 @@ class TournamentPrompt(db.Model):
     model = db.Column(db.String(100), nullable=False)
     response = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    search_vector = db.Column(
+        TSVECTOR,
+        db.Computed(
+            "setweight(to_tsvector('english', text), 'A') || "
+            "setweight(to_tsvector('english', coalesce(response, '')), 'B')",
+            persisted=True
+        )
+    )
     
     __table_args__ = (
         UniqueConstraint('tournament_id', 'position', name='uq_tournament_prompt_position'),
         Index('ix_tournament_prompt_position', 'tournament_id', 'position'),
         Index('ix_tournament_prompt_results', 'tournament_id', 'position', 'text', 'model'),
+        Index('ix_tournament_prompt_search', 'search_vector', postgresql_using='gin'),
     )
 
 class UserTournament(db.Model):
@@ -38,6 +74,8 @@ class UserTournament(db.Model):
     user_id = db.Column(db.String(255), nullable=False)
     
     current_bracket = db.Column(JSONB)
+    # Large brackets and archived completed brackets keep only their results, see TournamentFormat.encode
+    compact_winners = db.Column(db.LargeBinary)
     
     completed = db.Column(db.Boolean, default=False)
     winner_prompt_index = db.Column(SMALLINT)
@@ -46,38 +84,68 @@ class UserTournament(db.Model):
     
     votes = db.relationship('Vote', backref='user_tournament', lazy=True, cascade='all, delete-orphan')
     
+    def get_bracket(self):
+        """Current bracket state, expanding the compact encoding of archived brackets"""
+        if self.current_bracket:
+            return self.current_bracket
+        if self.compact_winners is not None:
+            return get_format(self.tournament.format).decode(self.tournament.get_template(), self.compact_winners)
+        return None
+    
+    def set_bracket(self, bracket):
+        """Store bracket state, compactly for large brackets"""
+        if self.tournament.bracket_template is None:
+            self.compact_winners = get_format(self.tournament.format).encode(bracket)
+        else:
+            self.current_bracket = bracket
+            flag_modified(self, 'current_bracket')
+    
     def get_next_votable_match(self):
         """Get next votable match from current bracket state"""
-        if not self.current_bracket:
-            bracket = copy.deepcopy(self.tournament.bracket_template)
-            self.current_bracket = bracket
+        bracket = self.get_bracket()
+        if bracket is None:
+            bracket = self.tournament.get_template()
         
-        bracket = self.current_bracket
-        
-        for round_num, round_matches in enumerate(bracket):
-            for match_num, match in enumerate(round_matches):
-                p1 = match.get('participant1')
-                p2 = match.get('participant2')
-                
-                if (p1 is not None and p1 != -1 and 
-                    p2 is not None and p2 != -1 and
-                    match.get('winner') is None):
-                    return round_num, match_num
-        
-        return None
+        return find_next_votable_match(bracket)
         
+    # uq_tournament_user serves (tournament_id, user_id) lookups and ix_user_tournament_results
+    # serves (tournament_id, completed) prefixes, so neither needs a separate index
     __table_args__ = (
         UniqueConstraint('tournament_id', 'user_id', name='uq_tournament_user'),
-        Index('ix_user_tournament_lookup', 'tournament_id', 'user_id'),
-        Index('ix_user_tournament_stats', 'tournament_id', 'completed'),
         Index('ix_user_tournament_results', 'tournament_id', 'completed', 'winner_prompt_index'),
     )
 
+class PairwiseResult(db.Model):
+    """How often one prompt beat another across every voter, summed by MatchScheduler"""
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament.id'), primary_key=True, autoincrement=False)
+    winner_index = db.Column(SMALLINT, primary_key=True, autoincrement=False)
+    loser_index = db.Column(SMALLINT, primary_key=True, autoincrement=False)
+    wins = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    
+    # Workers pull the totals changed since their last sync
+    __table_args__ = (
+        Index('ix_pairwise_result_updated', 'tournament_id', 'updated_at'),
+    )
+
+class JudgeVerdict(db.Model):
+    """Cached LLM judge verdicts, keyed by a hash of the judge model, question and ordered response pair"""
+    key = db.Column(db.String(64), primary_key=True)
+    # 'A' or 'B', the winning position as the judge saw it
+    verdict = db.Column(db.String(1), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class AdmissionBucket(db.Model):
+    """Token bucket state shared by every worker, see app.core.admission"""
+    key = db.Column(db.String(255), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
 class Vote(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_tournament_id = db.Column(db.Integer, db.ForeignKey('user_tournament.id'), nullable=False)
-    round_number = db.Column(SMALLINT, nullable=False)
-    match_number = db.Column(SMALLINT, nullable=False)
+    # The natural key doubles as the duplicate-vote check, so no surrogate id or extra unique index
+    user_tournament_id = db.Column(db.Integer, db.ForeignKey('user_tournament.id'), primary_key=True, autoincrement=False)
+    round_number = db.Column(SMALLINT, primary_key=True, autoincrement=False)
+    match_number = db.Column(SMALLINT, primary_key=True, autoincrement=False)
     winner_index = db.Column(SMALLINT, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -89,9 +157,29 @@ class Vote(db.Model):
     def user_id(self):
         return self.user_tournament.user_id
     
+    # Range partitions by user tournament id keep recent brackets in small, hot tables;
+    # see ArchivalService for creating partitions ahead and retiring old ones
     __table_args__ = (
-        UniqueConstraint('user_tournament_id', 'round_number', 'match_number', name='uq_vote_match'),
-        Index('ix_vote_user_tournament_id', 'user_tournament_id'),
-        Index('ix_vote_duplicate_check', 'user_tournament_id', 'round_number', 'match_number'),
         Index('ix_vote_timeline', 'user_tournament_id', 'created_at'),
-    )
\ No newline at end of file
+        {'postgresql_partition_by': 'RANGE (user_tournament_id)'},
+    )
+
+class ArchivedVote(db.Model):
+    """Cold storage for vote partitions retired by ArchivalService, primary key only"""
+    __tablename__ = 'vote_archive'
+    
+    user_tournament_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    round_number = db.Column(SMALLINT, primary_key=True, autoincrement=False)
+    match_number = db.Column(SMALLINT, primary_key=True, autoincrement=False)
+    winner_index = db.Column(SMALLINT, nullable=False)
+    created_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        {'postgresql_partition_by': 'RANGE (user_tournament_id)'},
+    )
+
+# Rows outside every range partition land here until ArchivalService.ensure_vote_partitions moves them
+event.listen(
+    Vote.__table__, 'after_create',
+    DDL("CREATE TABLE IF NOT EXISTS vote_default PARTITION OF vote DEFAULT")
+)
\ No newline at end of file
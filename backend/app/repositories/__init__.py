@@ -0,0 +1,17 @@
+from flask import current_app
+from app.repositories.base import EvaluationQuestion, PairwiseCount, PromptWinCount, TournamentRepository, TournamentSummary
+
+def create_repository(backend: str) -> TournamentRepository:
+    if backend == 'postgres':
+        from app.repositories.postgres import PostgresRepository
+        return PostgresRepository()
+    if backend == 'memory':
+        from app.repositories.memory import InMemoryRepository
+        return InMemoryRepository()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+def init_repository(app):
+    app.extensions["repository"] = create_repository(app.config["STORAGE_BACKEND"])
+
+def get_repository() -> TournamentRepository:
+    return current_app.extensions["repository"]
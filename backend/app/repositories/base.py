@@ -0,0 +1,141 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, ContextManager, Dict, List, NamedTuple, Optional, Set, Tuple
+from app.formats import DEFAULT_FORMAT
+
+class PromptWinCount(NamedTuple):
+    position: int
+    text: str
+    model: str
+    completed_participants: int
+    win_count: int
+
+class PairwiseCount(NamedTuple):
+    winner_index: int
+    loser_index: int
+    wins: int
+
+class EvaluationQuestion(NamedTuple):
+    tournament_id: int
+    question: str
+
+class TournamentSummary(NamedTuple):
+    id: int
+    question: str
+    created_at: datetime
+    total_participants: int
+    completed_participants: int
+    num_prompts: int
+
+class TournamentRepository(ABC):
+    """Storage beneath TournamentService.
+
+    Tournaments expose id, question, format, bracket_template, seeding, created_at,
+    get_template() and prompts (position, text, model, response). User tournaments
+    expose id, tournament_id, user_id, current_bracket, completed,
+    winner_prompt_index, get_bracket(), set_bracket() and get_next_votable_match().
+    Evaluation sets expose id, name, format and created_at. Nothing a method returns
+    is persisted until add_tournament, add_evaluation_set, save_responses, save_vote,
+    save_votes, add_pairwise_results or save_judge_verdicts.
+    """
+
+    name = None
+
+    @abstractmethod
+    def add_tournament(self, question: str, bracket_template: Optional[List[List[Dict]]], prompts: List[Dict],
+                       seeding: Optional[bytes] = None, tournament_format: str = DEFAULT_FORMAT,
+                       evaluation_set_id: Optional[int] = None) -> Any:
+        """Store a tournament and its prompts (position, text, model, response) and return it.
+
+        Large brackets pass seeding instead of bracket_template and may leave responses None.
+        """
+
+    @abstractmethod
+    def add_evaluation_set(self, name: str, tournament_format: str) -> Any:
+        """Store an empty evaluation set; its tournaments are added with its id as they are generated"""
+
+    @abstractmethod
+    def get_evaluation_set(self, evaluation_set_id: int) -> Optional[Any]:
+        """Evaluation set, or None"""
+
+    @abstractmethod
+    def evaluation_set_questions(self, evaluation_set_id: int) -> List[EvaluationQuestion]:
+        """The set's tournaments in the order they were added"""
+
+    @abstractmethod
+    def save_responses(self, tournament: Any, responses: Dict[int, str]) -> None:
+        """Store lazily generated responses by prompt position, keeping any already stored"""
+
+    @abstractmethod
+    def wave_lock(self, tournament: Any, timeout: Optional[float] = None) -> ContextManager[bool]:
+        """Hold the tournament's response wave lock, across workers where storage is shared.
+
+        Yields False when it was not acquired within timeout seconds; None waits as long as it takes.
+        """
+
+    @abstractmethod
+    def refresh_responses(self, tournament: Any) -> Set[int]:
+        """Reload the tournament's responses as stored now and return the positions still missing"""
+
+    @abstractmethod
+    def get_tournament(self, tournament_id: int) -> Optional[Any]:
+        """Tournament with its prompts in position order, or None"""
+
+    @abstractmethod
+    def get_user_tournament(self, tournament_id: int, user_id: str) -> Optional[Any]:
+        """A user's bracket for a tournament, or None"""
+
+    @abstractmethod
+    def new_user_tournament(self, tournament: Any, user_id: str) -> Any:
+        """A user tournament starting from the template, saved with its first vote"""
+
+    @abstractmethod
+    def has_vote(self, user_tournament: Any, round_number: int, match_number: int) -> bool:
+        """Whether the user already voted on this match"""
+
+    @abstractmethod
+    def save_vote(self, user_tournament: Any, round_number: int, match_number: int, winner_index: int,
+                  bracket: List[List[Dict]], champion: Optional[int], results_changed: bool) -> None:
+        """Atomically record a vote together with the updated bracket; a champion completes the bracket.
+
+        Raises ValueError when the match already has a vote.
+        """
+
+    @abstractmethod
+    def save_votes(self, user_tournament: Any, votes: List[Tuple[int, int, int]],
+                   bracket: List[List[Dict]], champion: Optional[int], results_changed: bool) -> None:
+        """save_vote for several (round_number, match_number, winner_index) votes in one transaction"""
+
+    @abstractmethod
+    def add_pairwise_results(self, tournament_id: int, results: Dict[Tuple[int, int], int]) -> None:
+        """Add (winner, loser) result counts to a tournament's running totals"""
+
+    @abstractmethod
+    def pairwise_results(self, tournament_id: int,
+                         since: Optional[datetime]) -> Tuple[List[PairwiseCount], datetime]:
+        """Running totals changed at or after since, all of them without since, and the storage's current time"""
+
+    @abstractmethod
+    def judge_verdicts(self, keys: List[str]) -> Dict[str, str]:
+        """Cached judge verdicts, 'A' or 'B', for the keys that have one"""
+
+    @abstractmethod
+    def save_judge_verdicts(self, verdicts: Dict[str, str]) -> None:
+        """Cache judge verdicts by key, keeping any already stored"""
+
+    @abstractmethod
+    def prompt_win_counts(self, tournament_id: int) -> List[PromptWinCount]:
+        """Completed brackets and wins per prompt, in position order"""
+
+    @abstractmethod
+    def participation_counts(self, tournament_id: int) -> Tuple[int, int]:
+        """(total, completed) user tournaments"""
+
+    @abstractmethod
+    def tournament_summaries(self) -> List[TournamentSummary]:
+        """Every tournament with participation counts, newest first"""
+
+    @abstractmethod
+    def search_tournaments(self, query: str, page: int, per_page: int,
+                           matches_per_tournament: int) -> Dict[str, Any]:
+        """Ranked, paginated search results in the TournamentSearchResponse shape"""
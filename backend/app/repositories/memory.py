@@ -0,0 +1,254 @@
+import itertools
+from contextlib import contextmanager
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from app.repositories.base import EvaluationQuestion, PairwiseCount, PromptWinCount, TournamentRepository, TournamentSummary
+from app.formats import DEFAULT_FORMAT, get_format
+from app.utils import decode_seeding, find_next_votable_match
+
+@dataclass
+class PromptRecord:
+    position: int
+    text: str
+    model: str
+    response: Optional[str] = None
+
+@dataclass
+class TournamentRecord:
+    id: int
+    question: str
+    bracket_template: Optional[List[List[Dict]]]
+    prompts: List[PromptRecord]
+    format: str = DEFAULT_FORMAT
+    seeding: Optional[bytes] = None
+    evaluation_set_id: Optional[int] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def get_template(self):
+        if self.bracket_template is not None:
+            return self.bracket_template
+        return get_format(self.format).build(decode_seeding(self.seeding))
+
+@dataclass
+class EvaluationSetRecord:
+    id: int
+    name: str
+    format: str = DEFAULT_FORMAT
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+@dataclass
+class UserTournamentRecord:
+    id: int
+    tournament: TournamentRecord
+    user_id: str
+    current_bracket: Optional[List[List[Dict]]] = None
+    completed: bool = False
+    winner_prompt_index: Optional[int] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+
+    @property
+    def tournament_id(self):
+        return self.tournament.id
+
+    def get_bracket(self):
+        return self.current_bracket
+
+    def set_bracket(self, bracket):
+        self.current_bracket = bracket
+
+    def get_next_votable_match(self):
+        """Get next votable match from current bracket state"""
+        return find_next_votable_match(self.current_bracket or self.tournament.get_template())
+
+class InMemoryRepository(TournamentRepository):
+    """Process-local storage for tests and single-process embedded deployments.
+
+    Nothing survives a restart, and every Gunicorn worker would hold its own copy,
+    so run it with one worker.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._tournaments: Dict[int, TournamentRecord] = {}
+        self._user_tournaments: Dict[Tuple[int, str], UserTournamentRecord] = {}
+        self._votes: Dict[Tuple[int, int, int], int] = {}
+        self._pairwise: Dict[int, Dict[Tuple[int, int], Tuple[int, datetime]]] = {}
+        self._verdicts: Dict[str, str] = {}
+        self._evaluation_sets: Dict[int, EvaluationSetRecord] = {}
+        self._wave_locks: Dict[int, threading.Lock] = {}
+
+    def add_tournament(self, question, bracket_template, prompts, seeding=None, tournament_format=DEFAULT_FORMAT,
+                       evaluation_set_id=None):
+        with self._lock:
+            tournament = TournamentRecord(
+                id=next(self._ids),
+                question=question,
+                bracket_template=bracket_template,
+                prompts=sorted((PromptRecord(**prompt) for prompt in prompts), key=lambda p: p.position),
+                format=tournament_format,
+                seeding=seeding,
+                evaluation_set_id=evaluation_set_id
+            )
+            self._tournaments[tournament.id] = tournament
+        return tournament
+
+    def add_evaluation_set(self, name, tournament_format):
+        with self._lock:
+            evaluation_set = EvaluationSetRecord(id=next(self._ids), name=name, format=tournament_format)
+            self._evaluation_sets[evaluation_set.id] = evaluation_set
+        return evaluation_set
+
+    def get_evaluation_set(self, evaluation_set_id):
+        return self._evaluation_sets.get(evaluation_set_id)
+
+    def evaluation_set_questions(self, evaluation_set_id):
+        return [
+            EvaluationQuestion(t.id, t.question) for t in list(self._tournaments.values())
+            if t.evaluation_set_id == evaluation_set_id
+        ]
+
+    def save_responses(self, tournament, responses):
+        with self._lock:
+            for position, response in responses.items():
+                prompt = tournament.prompts[position]
+                if prompt.response is None:
+                    prompt.response = response
+
+    @contextmanager
+    def wave_lock(self, tournament, timeout=None):
+        with self._lock:
+            lock = self._wave_locks.setdefault(tournament.id, threading.Lock())
+        acquired = lock.acquire(timeout=-1 if timeout is None else timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+
+    def refresh_responses(self, tournament):
+        # Records are shared, so they are always current
+        return {prompt.position for prompt in tournament.prompts if prompt.response is None}
+
+    def get_tournament(self, tournament_id):
+        return self._tournaments.get(tournament_id)
+
+    def get_user_tournament(self, tournament_id, user_id):
+        return self._user_tournaments.get((tournament_id, user_id))
+
+    def new_user_tournament(self, tournament, user_id):
+        with self._lock:
+            return UserTournamentRecord(id=next(self._ids), tournament=tournament, user_id=user_id)
+
+    def has_vote(self, user_tournament, round_number, match_number):
+        return (user_tournament.id, round_number, match_number) in self._votes
+
+    def save_vote(self, user_tournament, round_number, match_number, winner_index, bracket, champion, results_changed):
+        self.save_votes(user_tournament, [(round_number, match_number, winner_index)], bracket, champion, results_changed)
+
+    def save_votes(self, user_tournament, votes, bracket, champion, results_changed):
+        keys = [(user_tournament.id, round_number, match_number) for round_number, match_number, _ in votes]
+        with self._lock:
+            if any(key in self._votes for key in keys) or len(set(keys)) < len(keys):
+                raise ValueError("User has already voted for this match")
+            for key, (_, _, winner_index) in zip(keys, votes):
+                self._votes[key] = winner_index
+            user_tournament.set_bracket(bracket)
+            if champion is not None:
+                user_tournament.completed = True
+                user_tournament.completed_at = datetime.utcnow()
+                user_tournament.winner_prompt_index = champion
+            self._user_tournaments.setdefault((user_tournament.tournament_id, user_tournament.user_id), user_tournament)
+
+    def add_pairwise_results(self, tournament_id, results):
+        now = datetime.utcnow()
+        with self._lock:
+            totals = self._pairwise.setdefault(tournament_id, {})
+            for pair, wins in results.items():
+                totals[pair] = (totals.get(pair, (0, now))[0] + wins, now)
+
+    def pairwise_results(self, tournament_id, since):
+        now = datetime.utcnow()
+        with self._lock:
+            totals = list(self._pairwise.get(tournament_id, {}).items())
+        return [
+            PairwiseCount(winner, loser, wins) for (winner, loser), (wins, updated_at) in totals
+            if since is None or updated_at >= since
+        ], now
+
+    def judge_verdicts(self, keys):
+        return {key: self._verdicts[key] for key in keys if key in self._verdicts}
+
+    def save_judge_verdicts(self, verdicts):
+        with self._lock:
+            for key, verdict in verdicts.items():
+                self._verdicts.setdefault(key, verdict)
+
+    def _participants(self, tournament_id):
+        return [ut for (tid, _), ut in list(self._user_tournaments.items()) if tid == tournament_id]
+
+    def prompt_win_counts(self, tournament_id):
+        tournament = self._tournaments.get(tournament_id)
+        if tournament is None:
+            return []
+        winners = [ut.winner_prompt_index for ut in self._participants(tournament_id) if ut.completed]
+        return [
+            PromptWinCount(p.position, p.text, p.model, len(winners), winners.count(p.position))
+            for p in tournament.prompts
+        ]
+
+    def participation_counts(self, tournament_id):
+        participants = self._participants(tournament_id)
+        return len(participants), sum(1 for ut in participants if ut.completed)
+
+    def tournament_summaries(self):
+        counts = {}
+        for (tournament_id, _), ut in list(self._user_tournaments.items()):
+            total, completed = counts.get(tournament_id, (0, 0))
+            counts[tournament_id] = (total + 1, completed + ut.completed)
+        summaries = [
+            TournamentSummary(t.id, t.question, t.created_at, *counts.get(t.id, (0, 0)), len(t.prompts))
+            for t in list(self._tournaments.values())
+        ]
+        return sorted(summaries, key=lambda s: (s.created_at, s.id), reverse=True)
+
+    def search_tournaments(self, query, page, per_page, matches_per_tournament):
+        """Case-insensitive term matching without stemming, weighted like the Postgres search:
+        question hits count double and response hits half"""
+        terms = [term.lower() for term in re.findall(r'\w+', query)]
+
+        def hits(value):
+            value = (value or '').lower()
+            return sum(value.count(term) for term in terms)
+
+        ranked = []
+        for tournament in list(self._tournaments.values()):
+            prompt_hits = [(hits(p.text) + hits(p.response) / 2, p) for p in tournament.prompts]
+            prompt_hits = [(count, p) for count, p in prompt_hits if count]
+            rank = 2 * hits(tournament.question) + max((count for count, _ in prompt_hits), default=0)
+            if terms and rank:
+                prompt_hits.sort(key=lambda hit: hit[0], reverse=True)
+                ranked.append((rank, tournament, [p for _, p in prompt_hits[:matches_per_tournament]]))
+        ranked.sort(key=lambda item: (item[0], item[1].created_at), reverse=True)
+
+        page_items = ranked[(page - 1) * per_page:page * per_page]
+        results = [{
+            'id': tournament.id,
+            'question': tournament.question,
+            'question_highlight': tournament.question,
+            'created_at': tournament.created_at.isoformat(),
+            'rank': float(rank),
+            'matches': [{
+                'prompt_index': p.position,
+                'model': p.model,
+                'text': p.text,
+                'response': p.response or ''
+            } for p in matches]
+        } for rank, tournament, matches in page_items]
+        return {'results': results, 'total': len(ranked), 'page': page, 'per_page': per_page}
@@ -0,0 +1,308 @@
+from contextlib import contextmanager
+from datetime import datetime
+from app import db
+from app.core import results_cache
+from app.formats import DEFAULT_FORMAT
+from app.models import EvaluationSet, JudgeVerdict, PairwiseResult, Tournament, TournamentPrompt, UserTournament, Vote
+from app.repositories.base import EvaluationQuestion, PairwiseCount, PromptWinCount, TournamentRepository, TournamentSummary
+from sqlalchemy import and_, bindparam, case, func, literal, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import selectinload
+
+class PostgresRepository(TournamentRepository):
+    """The SQLAlchemy models on Postgres; writes commit through the request's db.session"""
+
+    name = 'postgres'
+    SEARCH_CONFIG = 'english'
+    SEARCH_HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2'
+
+    def add_tournament(self, question, bracket_template, prompts, seeding=None, tournament_format=DEFAULT_FORMAT,
+                       evaluation_set_id=None):
+        tournament = Tournament(
+            question=question,
+            format=tournament_format,
+            bracket_template=bracket_template,
+            seeding=seeding,
+            evaluation_set_id=evaluation_set_id
+        )
+        db.session.add(tournament)
+        db.session.flush()
+        
+        db.session.bulk_save_objects([
+            TournamentPrompt(tournament_id=tournament.id, **prompt) for prompt in prompts
+        ])
+        db.session.commit()
+        
+        return Tournament.query.options(selectinload(Tournament.prompts)).get(tournament.id)
+
+    def add_evaluation_set(self, name, tournament_format):
+        evaluation_set = EvaluationSet(name=name, format=tournament_format)
+        db.session.add(evaluation_set)
+        db.session.commit()
+        return evaluation_set
+
+    def get_evaluation_set(self, evaluation_set_id):
+        return db.session.get(EvaluationSet, evaluation_set_id)
+
+    def evaluation_set_questions(self, evaluation_set_id):
+        rows = db.session.query(Tournament.id, Tournament.question).filter(
+            Tournament.evaluation_set_id == evaluation_set_id
+        ).order_by(Tournament.id).all()
+        return [EvaluationQuestion(*row) for row in rows]
+
+    def save_responses(self, tournament, responses):
+        # A concurrent request may have generated the same wave, the first one stored wins
+        db.session.execute(
+            update(TournamentPrompt.__table__).where(
+                TournamentPrompt.tournament_id == tournament.id,
+                TournamentPrompt.position == bindparam('b_position'),
+                TournamentPrompt.response.is_(None)
+            ).values(response=bindparam('b_response')),
+            [{'b_position': position, 'b_response': response} for position, response in responses.items()]
+        )
+        db.session.commit()
+
+    @contextmanager
+    def wave_lock(self, tournament, timeout=None):
+        # On its own connection, so the request's commits do not release it; lock_timeout 0 waits forever
+        with db.engine.connect() as conn, conn.begin():
+            conn.execute(text("SELECT set_config('lock_timeout', :timeout, true)"), {
+                'timeout': '0' if timeout is None else f'{max(1, int(timeout * 1000))}ms'
+            })
+            try:
+                conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('response_wave'), :id)"), {'id': tournament.id})
+                acquired = True
+            except OperationalError:
+                acquired = False
+            yield acquired
+
+    def refresh_responses(self, tournament):
+        prompts = TournamentPrompt.query.filter(
+            TournamentPrompt.tournament_id == tournament.id
+        ).populate_existing().all()
+        return {prompt.position for prompt in prompts if prompt.response is None}
+
+    def get_tournament(self, tournament_id):
+        return Tournament.query.options(
+            selectinload(Tournament.prompts)
+        ).filter(Tournament.id == tournament_id).first()
+
+    def get_user_tournament(self, tournament_id, user_id):
+        return UserTournament.query.filter(
+            and_(
+                UserTournament.tournament_id == tournament_id,
+                UserTournament.user_id == user_id
+            )
+        ).first()
+
+    def new_user_tournament(self, tournament, user_id):
+        # Flushed for its id but only committed with the first vote
+        user_tournament = UserTournament(
+            tournament_id=tournament.id,
+            user_id=user_id,
+            completed=False
+        )
+        db.session.add(user_tournament)
+        db.session.flush()
+        return user_tournament
+
+    def has_vote(self, user_tournament, round_number, match_number):
+        return Vote.query.filter(
+            and_(
+                Vote.user_tournament_id == user_tournament.id,
+                Vote.round_number == round_number,
+                Vote.match_number == match_number
+            )
+        ).first() is not None
+
+    def save_vote(self, user_tournament, round_number, match_number, winner_index, bracket, champion, results_changed):
+        self.save_votes(user_tournament, [(round_number, match_number, winner_index)], bracket, champion, results_changed)
+
+    def save_votes(self, user_tournament, votes, bracket, champion, results_changed):
+        db.session.add_all([
+            Vote(
+                user_tournament_id=user_tournament.id,
+                round_number=round_number,
+                match_number=match_number,
+                winner_index=winner_index
+            ) for round_number, match_number, winner_index in votes
+        ])
+        user_tournament.set_bracket(bracket)
+        if champion is not None:
+            user_tournament.completed = True
+            user_tournament.completed_at = datetime.utcnow()
+            user_tournament.winner_prompt_index = champion
+        
+        # Other workers drop their cached results once this commits
+        if results_changed:
+            results_cache.notify(db.session, user_tournament.tournament_id)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request from the same user won the primary key
+            db.session.rollback()
+            raise ValueError("User has already voted for this match")
+
+    def add_pairwise_results(self, tournament_id, results):
+        # Sorted so concurrent workers lock the rows in the same order
+        statement = insert(PairwiseResult).values([
+            {'tournament_id': tournament_id, 'winner_index': winner, 'loser_index': loser,
+             'wins': wins, 'updated_at': func.localtimestamp()}
+            for (winner, loser), wins in sorted(results.items())
+        ])
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[PairwiseResult.tournament_id, PairwiseResult.winner_index, PairwiseResult.loser_index],
+            set_={'wins': PairwiseResult.wins + statement.excluded.wins, 'updated_at': statement.excluded.updated_at}
+        ))
+        db.session.commit()
+
+    def pairwise_results(self, tournament_id, since):
+        now = db.session.scalar(select(func.localtimestamp()))
+        query = select(
+            PairwiseResult.winner_index, PairwiseResult.loser_index, PairwiseResult.wins
+        ).where(PairwiseResult.tournament_id == tournament_id)
+        if since is not None:
+            query = query.where(PairwiseResult.updated_at >= since)
+        return [PairwiseCount(*row) for row in db.session.execute(query)], now
+
+    def judge_verdicts(self, keys):
+        if not keys:
+            return {}
+        return dict(db.session.execute(
+            select(JudgeVerdict.key, JudgeVerdict.verdict).where(JudgeVerdict.key.in_(keys))
+        ).all())
+
+    def save_judge_verdicts(self, verdicts):
+        if not verdicts:
+            return
+        db.session.execute(insert(JudgeVerdict).values([
+            {'key': key, 'verdict': verdict} for key, verdict in sorted(verdicts.items())
+        ]).on_conflict_do_nothing(index_elements=[JudgeVerdict.key]))
+        db.session.commit()
+
+    def prompt_win_counts(self, tournament_id):
+        rows = db.session.query(
+            TournamentPrompt.position,
+            TournamentPrompt.text,
+            TournamentPrompt.model,
+            func.count(UserTournament.id).filter(UserTournament.completed == True).label('completed_participants'),
+            func.count(UserTournament.id).filter(
+                and_(
+                    UserTournament.completed == True,
+                    UserTournament.winner_prompt_index == TournamentPrompt.position
+                )
+            ).label('win_count')
+        ).select_from(TournamentPrompt).outerjoin(
+            UserTournament, 
+            UserTournament.tournament_id == TournamentPrompt.tournament_id
+        ).filter(
+            TournamentPrompt.tournament_id == tournament_id
+        ).group_by(
+            TournamentPrompt.position, TournamentPrompt.text, TournamentPrompt.model
+        ).order_by(TournamentPrompt.position).all()
+        return [PromptWinCount(*row) for row in rows]
+
+    def participation_counts(self, tournament_id):
+        stats = db.session.query(
+            func.count(UserTournament.id).label('total_participants'),
+            func.sum(case((UserTournament.completed == True, 1), else_=0)).label('completed_participants')
+        ).filter(UserTournament.tournament_id == tournament_id).first()
+        return stats.total_participants or 0, int(stats.completed_participants or 0)
+
+    def tournament_summaries(self):
+        rows = db.session.query(
+            Tournament.id,
+            Tournament.question,
+            Tournament.created_at,
+            func.count(func.distinct(UserTournament.id)).label('total_participants'),
+            func.count(func.distinct(case((UserTournament.completed == True, UserTournament.id)))).label('completed_participants'),
+            func.count(func.distinct(TournamentPrompt.id)).label('num_prompts')
+        ).select_from(Tournament).outerjoin(
+            UserTournament, UserTournament.tournament_id == Tournament.id
+        ).outerjoin(
+            TournamentPrompt, TournamentPrompt.tournament_id == Tournament.id
+        ).group_by(
+            Tournament.id, Tournament.question, Tournament.created_at
+        ).order_by(Tournament.created_at.desc()).all()
+        return [TournamentSummary(*row) for row in rows]
+
+    def search_tournaments(self, query, page, per_page, matches_per_tournament):
+        config = PostgresRepository.SEARCH_CONFIG
+        ts_query = func.websearch_to_tsquery(config, query)
+        
+        prompt_matches = db.session.query(
+            TournamentPrompt.tournament_id.label('tournament_id'),
+            func.max(func.ts_rank(TournamentPrompt.search_vector, ts_query)).label('rank')
+        ).filter(
+            TournamentPrompt.search_vector.op('@@')(ts_query)
+        ).group_by(TournamentPrompt.tournament_id).subquery()
+        
+        question_matches = Tournament.search_vector.op('@@')(ts_query)
+        # Question hits outrank hits that only appear in prompts or responses
+        rank = (
+            case((question_matches, func.ts_rank(Tournament.search_vector, ts_query) * 2), else_=literal(0.0)) +
+            func.coalesce(prompt_matches.c.rank, 0.0)
+        ).label('rank')
+        
+        rows = db.session.query(
+            Tournament.id,
+            Tournament.question,
+            Tournament.created_at,
+            rank,
+            func.count().over().label('total')
+        ).outerjoin(
+            prompt_matches, prompt_matches.c.tournament_id == Tournament.id
+        ).filter(
+            or_(question_matches, prompt_matches.c.tournament_id.isnot(None))
+        ).order_by(
+            rank.desc(), Tournament.created_at.desc()
+        ).limit(per_page).offset((page - 1) * per_page).all()
+        
+        total = rows[0].total if rows else 0
+        if not rows:
+            return {'results': [], 'total': total, 'page': page, 'per_page': per_page}
+        
+        # Highlighting is expensive, so only run it for the rows on this page
+        tournament_ids = [row.id for row in rows]
+        options = PostgresRepository.SEARCH_HEADLINE_OPTIONS
+        question_highlights = dict(db.session.query(
+            Tournament.id,
+            func.ts_headline(config, Tournament.question, ts_query, options)
+        ).filter(Tournament.id.in_(tournament_ids)).all())
+        
+        prompt_highlights = db.session.query(
+            TournamentPrompt.tournament_id,
+            TournamentPrompt.position,
+            TournamentPrompt.model,
+            func.ts_headline(config, TournamentPrompt.text, ts_query, options).label('text'),
+            func.ts_headline(config, func.coalesce(TournamentPrompt.response, ''), ts_query, options).label('response')
+        ).filter(
+            TournamentPrompt.tournament_id.in_(tournament_ids),
+            TournamentPrompt.search_vector.op('@@')(ts_query)
+        ).order_by(
+            TournamentPrompt.tournament_id,
+            func.ts_rank(TournamentPrompt.search_vector, ts_query).desc()
+        ).all()
+        
+        matches = {}
+        for match in prompt_highlights:
+            tournament_matches = matches.setdefault(match.tournament_id, [])
+            if len(tournament_matches) < matches_per_tournament:
+                tournament_matches.append({
+                    'prompt_index': match.position,
+                    'model': match.model,
+                    'text': match.text,
+                    'response': match.response
+                })
+        
+        results = [{
+            'id': row.id,
+            'question': row.question,
+            'question_highlight': question_highlights.get(row.id, row.question),
+            'created_at': row.created_at.isoformat(),
+            'rank': round(float(row.rank), 6),
+            'matches': matches.get(row.id, [])
+        } for row in rows]
+        
+        return {'results': results, 'total': total, 'page': page, 'per_page': per_page}
@@ -0,0 +1,14 @@
+from flask import Blueprint
+from app.core.serialization import json_response
+from app.routes.tournaments import handle_service_errors
+from app.schemas import EvaluationSetResponse
+from app.services.evaluation_sets import EvaluationSetService
+
+bp = Blueprint("evaluation_sets", __name__)
+
+@bp.route('/<int:evaluation_set_id>', methods=['GET'])
+@handle_service_errors
+def get_evaluation_set(evaluation_set_id):
+    """Per-question rankings and rankings summed over every question of an evaluation set"""
+    results = EvaluationSetService.get_evaluation_set(evaluation_set_id)
+    return json_response(EvaluationSetResponse(**results))
@@ -0,0 +1,30 @@
+from flask import Blueprint, Response, request, stream_with_context
+from app.services.exports import ExportService
+from app.routes.tournaments import validate_query, handle_service_errors
+from app.schemas import ExportQuery
+
+bp = Blueprint("exports", __name__)
+
+MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+@bp.route('/<any(votes, user_tournaments, rankings):dataset>', methods=['GET'])
+@validate_query(ExportQuery)
+@handle_service_errors
+def export_dataset(dataset):
+    """Stream a dataset as NDJSON or CSV without buffering it in memory"""
+    query = request.validated_query
+    chunks = ExportService.stream(
+        dataset, query.format,
+        tournament_id=query.tournament_id,
+        since=query.since,
+        until=query.until
+    )
+
+    filename = dataset if query.tournament_id is None else f"{dataset}-tournament-{query.tournament_id}"
+    response = Response(stream_with_context(chunks), mimetype=MIMETYPES[query.format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{query.format}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
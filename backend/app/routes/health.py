@@ -0,0 +1,29 @@
+import logging
+from flask import Blueprint, current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.core.serialization import json_response
+from app.schemas import HealthResponse
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint("health", __name__)
+
+@bp.route('/health', methods=['GET'])
+def health():
+    """Liveness: the process is up and serving requests, no dependencies touched"""
+    return json_response(HealthResponse(status='ok'))
+
+@bp.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: the database answers through the connection pool, with the pool's current usage"""
+    if current_app.config['STORAGE_BACKEND'] == 'memory':
+        return json_response(HealthResponse(status='ok', checks={'storage': 'memory'}))
+    try:
+        db.session.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        logger.warning("Readiness check failed: %s", e)
+        db.session.rollback()
+        return json_response(HealthResponse(status='unavailable', checks={'database': 'unavailable'}), 503)
+    return json_response(HealthResponse(status='ok', checks={'database': 'ok', 'pool': db.engine.pool.status()}))
@@ -1,12 +1,24 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, session
 from app.services.tournaments import TournamentService
 from app.clients.open_router import OpenRouterClient
+from app.utils import diff_brackets
+from app.core.compression import cached_payload_response
+from app.core.serialization import json_response
+from app.core import results_broadcaster, admission_controller
+from app.core.admission import AdmissionRejected
+from app.core.broadcaster import SubscriberLimitReached
+from app.core.deadlines import Deadline, DeadlineExceeded, client_disconnected
+from app.core.metrics import DEADLINES_EXCEEDED
+from app.core.replicas import replica_router
 from app.schemas import (
-    CreateTournamentRequest, VoteRequest, TournamentResponse,
-    TournamentWithResultsResponse, TournamentListResponse,
-    VoteResponse, ModelsResponse, ErrorResponse
+    CreateTournamentRequest, VoteRequest, TournamentResponse, TournamentContentResponse,
+    TournamentWithResultsResponse, TournamentListResponse, LargeTournamentResponse, TournamentStateResponse,
+    SearchQuery, TournamentSearchResponse, ResultsUpdate,
+    VoteResponse, VoteDeltaResponse, ModelsResponse, ErrorResponse
 )
 from pydantic import ValidationError
+from werkzeug.exceptions import HTTPException
+import queue
 import uuid
 from functools import wraps
 
@@ -19,21 +31,30 @@ def get_user_id():
     return session['user_id']
 
 def validate_json(model_class):
-    """Decorator to validate JSON request data with Pydantic"""
+    """Decorator to validate the raw JSON request body with Pydantic"""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             try:
-                data = request.get_json(force=True)
-                validated_data = model_class(**data)
-                request.validated_data = validated_data
-                return f(*args, **kwargs)
+                request.validated_data = model_class.model_validate_json(request.get_data())
             except ValidationError as e:
                 error_response = ErrorResponse(error=f"Validation error: {str(e)}")
-                return jsonify(error_response.dict()), 400
-            except Exception as e:
-                error_response = ErrorResponse(error=f"Invalid JSON: {str(e)}")
-                return jsonify(error_response.dict()), 400
+                return json_response(error_response, 400)
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def validate_query(model_class):
+    """Decorator to validate query string parameters with Pydantic"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            try:
+                request.validated_query = model_class.model_validate(request.args.to_dict())
+            except ValidationError as e:
+                error_response = ErrorResponse(error=f"Validation error: {str(e)}")
+                return json_response(error_response, 400)
+            return f(*args, **kwargs)
         return decorated_function
     return decorator
 
@@ -43,15 +64,29 @@ def handle_service_errors(f):
     def decorated_function(*args, **kwargs):
         try:
             return f(*args, **kwargs)
+        except HTTPException:
+            # Such as abort(404) from the service layer
+            raise
         except ValueError as e:
             error_response = ErrorResponse(error=str(e))
-            return jsonify(error_response.dict()), 400
+            return json_response(error_response, 400)
+        except AdmissionRejected as e:
+            response = json_response(ErrorResponse(error=str(e)), 429)
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response
+        except SubscriberLimitReached as e:
+            response = json_response(ErrorResponse(error=str(e)), 503)
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response
+        except DeadlineExceeded as e:
+            DEADLINES_EXCEEDED.labels(request.endpoint, e.reason).inc()
+            return json_response(ErrorResponse(error=str(e)), 504)
         except RuntimeError as e:
             error_response = ErrorResponse(error=str(e))
-            return jsonify(error_response.dict()), 502
+            return json_response(error_response, 502)
         except Exception as e:
             error_response = ErrorResponse(error='Unexpected error occurred.')
-            return jsonify(error_response.dict()), 500
+            return json_response(error_response, 500)
     return decorated_function
 
 @bp.route('/models', methods=['GET', 'POST'])
@@ -66,7 +101,7 @@ def handle_models():
         models = client.get_available_models()
     
     response = ModelsResponse(models=models)
-    return jsonify(response.dict()), 200
+    return json_response(response, 200)
 
 @bp.route('', methods=['GET', 'POST'])
 def handle_tournaments():
@@ -81,22 +116,35 @@ def _get_tournaments_list():
     """Get tournaments list"""
     tournaments_data = TournamentService.get_tournaments_list()
     response = TournamentListResponse(tournaments=tournaments_data)
-    return jsonify(response.dict())
+    return json_response(response)
 
 @validate_json(CreateTournamentRequest)
 @handle_service_errors
 def _create_tournament():
     """Create tournament"""
     validated_data = request.validated_data
+    # One budget for the whole creation, abandoned early if the client hangs up
+    deadline = Deadline.after(current_app.config['CREATE_DEADLINE'], client_disconnected(request.environ))
+    prompt_data_list = [prompt.model_dump() for prompt in validated_data.prompts]
+    
+    # Refuse bad requests before charging them; every generated response is one upstream completion
+    TournamentService.check_creation(prompt_data_list, validated_data.format)
+    admission_controller.acquire(
+        get_user_id(), TournamentService.creation_cost(len(prompt_data_list)), deadline
+    )
     
     tournament = TournamentService.create_tournament(
         validated_data.question, 
-        [prompt.dict() for prompt in validated_data.prompts]
+        prompt_data_list,
+        validated_data.format,
+        deadline
     )
+    replica_router.stick_to_primary()
     
     response_data = TournamentResponse(
         id=tournament.id,
         question=tournament.question,
+        format=tournament.format,
         prompts=[p.text for p in tournament.prompts],
         responses=[p.response for p in tournament.prompts],
         models=[p.model for p in tournament.prompts],
@@ -108,7 +156,16 @@ def _create_tournament():
         }
     )
     
-    return jsonify(response_data.dict()), 201
+    return json_response(response_data, 201)
+
+@bp.route('/search', methods=['GET'])
+@validate_query(SearchQuery)
+@handle_service_errors
+def search_tournaments():
+    """Full-text search across tournaments, prompts and responses"""
+    query = request.validated_query
+    results = TournamentService.search_tournaments(query.q, query.page, query.per_page)
+    return json_response(TournamentSearchResponse(**results))
 
 @bp.route('/<int:tournament_id>', methods=['GET'])
 @handle_service_errors
@@ -120,25 +177,23 @@ def get_tournament(tournament_id):
     tournament, user_tournament, user_bracket = TournamentService.get_tournament_with_user_state(
         tournament_id, user_id
     )
+    if TournamentService.is_large(tournament):
+        return _large_tournament_response(tournament, user_tournament, user_bracket, include_results)
     
     base_data = {
         'id': tournament.id,
         'question': tournament.question,
+        'format': tournament.format,
         'prompts': [p.text for p in tournament.prompts],
         'responses': [p.response for p in tournament.prompts],
         'models': [p.model for p in tournament.prompts],
         'bracket_template': tournament.bracket_template,
         'user_bracket': user_bracket,
-        'user_state': {
-            'completed': user_tournament.completed if user_tournament else False,
-            'winner_prompt_index': user_tournament.winner_prompt_index if user_tournament else None,
-            'next_match': user_tournament.get_next_votable_match() if user_tournament and user_tournament.current_bracket else None
-        }
+        'user_state': _user_state(user_tournament)
     }
     
     if include_results:
-        rankings = TournamentService.get_prompt_rankings(tournament_id)
-        stats = TournamentService.get_participation_stats(tournament_id)
+        rankings, stats = TournamentService.get_results(tournament_id)
         response = TournamentWithResultsResponse(
             **base_data,
             rankings=rankings,
@@ -147,22 +202,147 @@ def get_tournament(tournament_id):
     else:
         response = TournamentResponse(**base_data)
     
-    return jsonify(response.dict())
+    return json_response(response)
+
+def _user_state(user_tournament, next_match=None):
+    """A regular bracket's user state, or a large one's given its next upcoming match"""
+    if next_match is None and user_tournament and user_tournament.current_bracket:
+        next_match = user_tournament.get_next_votable_match()
+    return {
+        'completed': user_tournament.completed if user_tournament else False,
+        'winner_prompt_index': user_tournament.winner_prompt_index if user_tournament else None,
+        'next_match': next_match
+    }
+
+def _wave_deadline():
+    """The budget for generating a large bracket's next response wave within this request"""
+    return Deadline.after(current_app.config['WAVE_DEADLINE'], client_disconnected(request.environ))
+
+def _large_user_data(tournament, user_tournament, user_bracket):
+    """A large bracket's user state and next matches"""
+    upcoming = TournamentService.get_upcoming_matches(
+        tournament, user_bracket, current_app.config['MATCH_LOOKAHEAD'], _wave_deadline()
+    )
+    return {
+        'user_state': _user_state(user_tournament, (upcoming[0]['round'], upcoming[0]['match']) if upcoming else None),
+        'upcoming_matches': upcoming
+    }
+
+def _large_tournament_response(tournament, user_tournament, user_bracket, include_results):
+    """Only the next matches of a large bracket, instead of every response and the full bracket"""
+    data = {
+        'id': tournament.id,
+        'question': tournament.question,
+        'format': tournament.format,
+        'num_prompts': len(tournament.prompts),
+        'rounds': len(user_bracket),
+        **_large_user_data(tournament, user_tournament, user_bracket)
+    }
+    if include_results:
+        data['rankings'], data['stats'] = TournamentService.get_results(tournament.id)
+    return json_response(LargeTournamentResponse(**data))
+
+@bp.route('/<int:tournament_id>/content', methods=['GET'])
+@handle_service_errors
+def get_tournament_content(tournament_id):
+    """Get immutable tournament content, compressed once per encoding"""
+    def build_payload():
+        content = TournamentService.get_tournament_content(tournament_id)
+        return TournamentContentResponse(**content).model_dump_json().encode()
+    
+    return cached_payload_response(f'tournament-content:{tournament_id}', build_payload)
+
+@bp.route('/<int:tournament_id>/state', methods=['GET'])
+@handle_service_errors
+def get_tournament_state(tournament_id):
+    """Get only the user's bracket and state, to load alongside the cached /content"""
+    include_results = request.args.get('include_results', 'false').lower() == 'true'
+    tournament, user_tournament, user_bracket = TournamentService.get_tournament_with_user_state(
+        tournament_id, get_user_id()
+    )
+    
+    if TournamentService.is_large(tournament):
+        data = {'id': tournament.id, **_large_user_data(tournament, user_tournament, user_bracket)}
+    else:
+        data = {'id': tournament.id, 'user_bracket': user_bracket, 'user_state': _user_state(user_tournament)}
+    if include_results:
+        data['rankings'], data['stats'] = TournamentService.get_results(tournament.id)
+    return json_response(TournamentStateResponse(**data))
+
+def _encode_results_event(results):
+    rankings, stats = results
+    data = ResultsUpdate(rankings=rankings, stats=stats).model_dump_json()
+    return f"event: results\ndata: {data}\n\n".encode()
+
+@bp.route('/<int:tournament_id>/results/stream', methods=['GET'])
+@handle_service_errors
+def stream_results(tournament_id):
+    """Server-sent events with ranking and participation updates"""
+    keepalive = current_app.config['RESULTS_STREAM_KEEPALIVE']
+    # Subscribe first, so a stream over the per-worker cap is refused before any work
+    subscription = results_broadcaster.subscribe(
+        tournament_id,
+        lambda: TournamentService.get_results(tournament_id),
+        _encode_results_event
+    )
+    try:
+        initial_event = _encode_results_event(TournamentService.get_results(tournament_id))
+    except Exception:
+        results_broadcaster.unsubscribe(tournament_id, subscription)
+        raise
+    
+    def events():
+        try:
+            yield initial_event
+            while True:
+                try:
+                    yield subscription.get(timeout=keepalive)
+                except queue.Empty:
+                    yield b": keepalive\n\n"
+        finally:
+            results_broadcaster.unsubscribe(tournament_id, subscription)
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @bp.route('/<int:tournament_id>/vote', methods=['POST'])
 @validate_json(VoteRequest)
 @handle_service_errors
 def vote(tournament_id):
-    """Submit vote"""
+    """Submit vote, optionally returning only the bracket delta and next match"""
+    delta = request.args.get('delta', 'false').lower() == 'true'
     user_id = get_user_id()
     validated_data = request.validated_data
     
-    tournament, _, _ = TournamentService.get_tournament_with_user_state(tournament_id, user_id)
+    # record_vote mutates a copy, so previous_bracket keeps the pre-vote state for diffing
+    tournament, _, previous_bracket = TournamentService.get_tournament_with_user_state(tournament_id, user_id)
     
     user_bracket, completed, winner_prompt_index = TournamentService.record_vote(
         tournament, user_id, validated_data.round, 
         validated_data.match, validated_data.winner
     )
+    replica_router.stick_to_primary()
+    
+    # Large brackets are never shipped whole
+    if delta or TournamentService.is_large(tournament):
+        # The vote is stored by now, so a failed response wave must not fail the request;
+        # the client refetches the tournament for its next match instead
+        next_match_pending = False
+        try:
+            next_match = TournamentService.get_next_match_details(tournament, user_bracket, _wave_deadline())
+        except (AdmissionRejected, DeadlineExceeded, RuntimeError):
+            next_match, next_match_pending = None, True
+        response = VoteDeltaResponse(
+            patch=diff_brackets(previous_bracket, user_bracket),
+            next_match=next_match,
+            next_match_pending=next_match_pending,
+            completed=completed,
+            winner_prompt_index=winner_prompt_index,
+            user_id=user_id
+        )
+        return json_response(response)
     
     response = VoteResponse(
         user_bracket=user_bracket,
@@ -171,4 +351,4 @@ def vote(tournament_id):
         user_id=user_id
     )
     
-    return jsonify(response.dict())
+    return json_response(response)
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
+from app.formats import DEFAULT_FORMAT, FORMATS
 
 # ===== REQUEST SCHEMAS =====
 
@@ -16,10 +17,26 @@ class PromptData(BaseModel):
             raise ValueError('Prompt text cannot be empty or whitespace only')
         return v.strip()
 
+def _check_format(v):
+    if v not in FORMATS:
+        raise ValueError(f"Unknown tournament format, expected one of {', '.join(FORMATS)}")
+    return v
+
+def _check_unique_prompts(v):
+    seen = set()
+    for prompt in v:
+        key = (prompt.text, prompt.model)
+        if key in seen:
+            raise ValueError('Duplicate prompt-model combinations are not allowed')
+        seen.add(key)
+    return v
+
 class CreateTournamentRequest(BaseModel):
     """Schema for creating a new tournament"""
     question: str = Field(..., min_length=1, max_length=1000, description="The tournament question")
-    prompts: List[PromptData] = Field(..., min_length=2, max_length=16, description="List of prompts")
+    format: str = Field(default=DEFAULT_FORMAT, description=f"One of {', '.join(FORMATS)}")
+    prompts: List[PromptData] = Field(..., min_length=2, max_length=1024,
+                                      description="List of prompts; above EAGER_RESPONSE_LIMIT the tournament is a large bracket")
     
     @field_validator('question')
     @classmethod
@@ -28,16 +45,45 @@ class CreateTournamentRequest(BaseModel):
             raise ValueError('Question cannot be empty or whitespace only')
         return v.strip()
     
+    @field_validator('format')
+    @classmethod
+    def validate_format(cls, v):
+        return _check_format(v)
+    
     @field_validator('prompts')
     @classmethod
     def validate_unique_combinations(cls, v):
-        seen = set()
-        for prompt in v:
-            key = (prompt.text, prompt.model)
-            if key in seen:
-                raise ValueError('Duplicate prompt-model combinations are not allowed')
-            seen.add(key)
-        return v
+        return _check_unique_prompts(v)
+
+class CreateEvaluationSetRequest(BaseModel):
+    """Schema for running the same prompts across several questions"""
+    name: str = Field(..., min_length=1, max_length=200, description="Name of the evaluation set")
+    format: str = Field(default=DEFAULT_FORMAT, description=f"One of {', '.join(FORMATS)}")
+    questions: List[str] = Field(..., min_length=1, max_length=500, description="One tournament per question")
+    prompts: List[PromptData] = Field(..., min_length=2, max_length=1024,
+                                      description="Prompts run against every question, at most EAGER_RESPONSE_LIMIT")
+    
+    @field_validator('questions')
+    @classmethod
+    def validate_questions(cls, v):
+        questions = [question.strip() for question in v]
+        if not all(questions):
+            raise ValueError('Questions cannot be empty or whitespace only')
+        if any(len(question) > 1000 for question in questions):
+            raise ValueError('Questions must be at most 1000 characters')
+        if len(set(questions)) != len(questions):
+            raise ValueError('Duplicate questions are not allowed')
+        return questions
+    
+    @field_validator('format')
+    @classmethod
+    def validate_format(cls, v):
+        return _check_format(v)
+    
+    @field_validator('prompts')
+    @classmethod
+    def validate_unique_combinations(cls, v):
+        return _check_unique_prompts(v)
 
 class VoteRequest(BaseModel):
     """Schema for submitting a vote"""
@@ -45,6 +91,26 @@ class VoteRequest(BaseModel):
     match: int = Field(..., ge=0, description="Match number within the round (0-indexed)")
     winner: int = Field(..., ge=0, description="Index of the winning prompt")
 
+class SearchQuery(BaseModel):
+    """Schema for tournament search query parameters"""
+    q: str = Field(..., min_length=1, max_length=200, description="Search terms (web search syntax)")
+    page: int = Field(default=1, ge=1, description="Page number (1-indexed)")
+    per_page: int = Field(default=20, ge=1, le=50, description="Results per page")
+    
+    @field_validator('q')
+    @classmethod
+    def validate_query_not_empty(cls, v):
+        if not v.strip():
+            raise ValueError('Search query cannot be empty or whitespace only')
+        return v.strip()
+
+class ExportQuery(BaseModel):
+    """Schema for bulk export query parameters"""
+    format: Literal['ndjson', 'csv'] = Field(default='ndjson', description="Output format")
+    tournament_id: Optional[int] = Field(default=None, ge=1, description="Only export this tournament")
+    since: Optional[datetime] = Field(default=None, description="Inclusive lower bound on the row timestamp")
+    until: Optional[datetime] = Field(default=None, description="Exclusive upper bound on the row timestamp")
+
 # ===== RESPONSE SCHEMAS =====
 
 class UserState(BaseModel):
@@ -59,10 +125,15 @@ class TournamentBase(BaseModel):
     
     id: int
     question: str
+    format: str = DEFAULT_FORMAT
     prompts: List[str]
-    responses: List[str]
+    responses: List[Optional[str]] = Field(description="None where a large bracket generates the response lazily")
     models: List[str]
-    bracket_template: List[List[Dict[str, Any]]]
+    bracket_template: Optional[List[List[Dict[str, Any]]]] = Field(description="None for large brackets")
+
+class TournamentContentResponse(TournamentBase):
+    """Immutable tournament content shared by every user"""
+    seeding: Optional[List[int]] = Field(default=None, description="First-round slots of a large bracket, -1 for a bye")
 
 class TournamentResponse(TournamentBase):
     """Tournament response with user state"""
@@ -90,6 +161,36 @@ class TournamentWithResultsResponse(TournamentBase):
     rankings: List[PromptRanking]
     stats: ParticipationStats
 
+class EvaluationQuestionResults(BaseModel):
+    """One question of an evaluation set with its tournament's rankings"""
+    tournament_id: int
+    question: str
+    completed_participants: int = Field(ge=0)
+    rankings: List[PromptRanking]
+
+class EvaluationPromptRanking(BaseModel):
+    """A prompt's results summed over every question of an evaluation set"""
+    prompt: str
+    prompt_index: int
+    model: str
+    win_count: int = Field(ge=0)
+    questions_won: int = Field(ge=0, description="Questions where no prompt has more wins")
+    mean_win_percentage: float = Field(ge=0.0, le=100.0, description="Over the questions with completed brackets")
+
+class EvaluationSetResponse(BaseModel):
+    """Evaluation set with per-question and cross-question rankings"""
+    id: int
+    name: str
+    format: str
+    created_at: datetime
+    questions: List[EvaluationQuestionResults]
+    rankings: List[EvaluationPromptRanking]
+
+class ResultsUpdate(BaseModel):
+    """Rankings and stats pushed to live results subscribers"""
+    rankings: List[PromptRanking]
+    stats: ParticipationStats
+
 class TournamentListItem(BaseModel):
     """Tournament item in list view"""
     id: int
@@ -104,6 +205,29 @@ class TournamentListResponse(BaseModel):
     """Response for tournament list endpoint"""
     tournaments: List[TournamentListItem]
 
+class SearchMatch(BaseModel):
+    """Prompt or response matching a search, with highlighted snippets"""
+    prompt_index: int
+    model: str
+    text: str
+    response: str
+
+class TournamentSearchResult(BaseModel):
+    """Tournament matching a search"""
+    id: int
+    question: str
+    question_highlight: str
+    created_at: datetime
+    rank: float
+    matches: List[SearchMatch]
+
+class TournamentSearchResponse(BaseModel):
+    """Response for tournament search endpoint"""
+    results: List[TournamentSearchResult]
+    total: int = Field(ge=0)
+    page: int = Field(ge=1)
+    per_page: int = Field(ge=1)
+
 class VoteResponse(BaseModel):
     """Response after submitting a vote"""
     user_bracket: List[List[Dict[str, Any]]]
@@ -111,6 +235,56 @@ class VoteResponse(BaseModel):
     winner_prompt_index: Optional[int] = None
     user_id: str
 
+class BracketPatchOperation(BaseModel):
+    """JSON-patch style operation against the user bracket"""
+    op: str = Field(..., pattern=r'^(add|replace)$')
+    path: str = Field(description="Pointer into the bracket, e.g. /round/match/field")
+    value: Any = None
+
+class MatchParticipantData(BaseModel):
+    """Participant of a match with its prompt and response inline"""
+    index: int
+    prompt: str
+    response: str
+    model: str
+
+class NextMatchData(BaseModel):
+    """Next votable match with both participants inline"""
+    round: int
+    match: int
+    participant1: MatchParticipantData
+    participant2: MatchParticipantData
+
+class LargeTournamentResponse(BaseModel):
+    """Large bracket with only the user's upcoming matches materialized"""
+    id: int
+    question: str
+    format: str
+    num_prompts: int = Field(ge=2)
+    rounds: int = Field(ge=1)
+    user_state: UserState
+    upcoming_matches: List[NextMatchData]
+    rankings: Optional[List[PromptRanking]] = None
+    stats: Optional[ParticipationStats] = None
+
+class TournamentStateResponse(BaseModel):
+    """The requesting user's part of a tournament, to pair with its cached content"""
+    id: int
+    user_bracket: Optional[List[List[Dict[str, Any]]]] = Field(default=None, description="None for large brackets")
+    user_state: UserState
+    upcoming_matches: Optional[List[NextMatchData]] = Field(default=None, description="Only for large brackets")
+    rankings: Optional[List[PromptRanking]] = None
+    stats: Optional[ParticipationStats] = None
+
+class VoteDeltaResponse(BaseModel):
+    """Compact response after submitting a vote with delta=true"""
+    patch: List[BracketPatchOperation]
+    next_match: Optional[NextMatchData] = None
+    next_match_pending: bool = Field(False, description="The next match's responses could not be generated yet; refetch the tournament for it")
+    completed: bool
+    winner_prompt_index: Optional[int] = None
+    user_id: str
+
 class ModelsResponse(BaseModel):
     """Response for available models"""
     models: Dict[str, str] = Field(description="Available models mapping")
@@ -119,6 +293,11 @@ class ErrorResponse(BaseModel):
     """Standard error response"""
     error: str = Field(description="Error message")
 
+class HealthResponse(BaseModel):
+    """Liveness or readiness status"""
+    status: str = Field(description="'ok' or 'unavailable'")
+    checks: Dict[str, str] = Field(default_factory=dict, description="Status of each dependency checked")
+
 # ===== OPENROUTER SCHEMAS =====
 
 class OpenRouterMessage(BaseModel):
@@ -132,6 +311,8 @@ class OpenRouterRequest(BaseModel):
     messages: List[OpenRouterMessage]
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
     max_tokens: int = Field(default=1000, gt=0, le=4000)
+    # Asks OpenRouter to report each completion's cost alongside its token counts
+    usage: Dict[str, bool] = Field(default_factory=lambda: {"include": True})
 
 class OpenRouterChoice(BaseModel):
     """OpenRouter API response choice"""
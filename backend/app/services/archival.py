@@ -0,0 +1,160 @@
+import re
+from app import db
+from app.formats import get_format
+from app.models import Tournament, UserTournament, Vote
+from sqlalchemy import bindparam, func, null, select, text, update
+
+RANGE_BOUND = re.compile(r"FROM \('?(\d+)'?\) TO \('?(\d+)'?\)")
+
+class ArchivalService:
+    COMPACT_BATCH_SIZE = 500
+
+    @staticmethod
+    def list_partitions(parent):
+        """(name, lower, upper) for each range partition of a table, upper exclusive"""
+        rows = db.session.execute(text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = CAST(:parent AS regclass)"
+        ), {'parent': parent}).all()
+        partitions = []
+        for name, bound in rows:
+            match = RANGE_BOUND.search(bound)
+            if match:
+                partitions.append((name, int(match.group(1)), int(match.group(2))))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    @staticmethod
+    def _max_user_tournament_id():
+        return db.session.scalar(select(func.coalesce(func.max(UserTournament.id), 0)))
+
+    @staticmethod
+    def ensure_vote_partitions(partition_size, ahead=2):
+        """Create vote range partitions up to `ahead` past the newest user tournament.
+
+        Rows that already landed in the default partition for a new range are moved
+        into it before it is attached. partition_size must not change once set.
+        """
+        existing = {
+            lower for _, lower, _ in
+            ArchivalService.list_partitions('vote') + ArchivalService.list_partitions('vote_archive')
+        }
+        created = []
+        for number in range(ArchivalService._max_user_tournament_id() // partition_size + ahead + 1):
+            lower, upper = number * partition_size, (number + 1) * partition_size
+            if lower in existing:
+                continue
+            name = f'vote_p{number}'
+            db.session.execute(text(f"CREATE TABLE {name} (LIKE vote INCLUDING DEFAULTS)"))
+            db.session.execute(text(
+                f"WITH moved AS (DELETE FROM vote_default WHERE user_tournament_id >= :lower "
+                f"AND user_tournament_id < :upper RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+            ), {'lower': lower, 'upper': upper})
+            db.session.execute(text(f"ALTER TABLE vote ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"))
+            created.append(name)
+        db.session.commit()
+        return created
+
+    @staticmethod
+    def migrate_legacy_votes(partition_size, ahead=2):
+        """Bring a database created before vote partitioning up to date; returns the votes moved, None if already done.
+
+        Adds user_tournament.compact_winners and drops the indexes the consolidated
+        ones replaced. An unpartitioned vote table is renamed to vote_legacy, the
+        partitioned one is created with its partitions, and the votes are copied
+        over. The partitions are committed before the copy, so a rerun after a
+        failure resumes from vote_legacy.
+        """
+        if not db.session.scalar(text("SELECT to_regclass('user_tournament') IS NOT NULL")):
+            # A fresh database, which init-db creates in its current form
+            return None
+        db.session.execute(text("ALTER TABLE user_tournament ADD COLUMN IF NOT EXISTS compact_winners bytea"))
+        db.session.execute(text("DROP INDEX IF EXISTS ix_user_tournament_lookup, ix_user_tournament_stats"))
+        vote_kind = db.session.scalar(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('vote')"))
+        has_legacy = db.session.scalar(text("SELECT to_regclass('vote_legacy') IS NOT NULL"))
+        if vote_kind == 'r':
+            db.session.execute(text("ALTER TABLE vote RENAME TO vote_legacy"))
+            # The new table reuses these names
+            db.session.execute(text("ALTER INDEX IF EXISTS vote_pkey RENAME TO vote_legacy_pkey"))
+            db.session.execute(text("ALTER INDEX IF EXISTS ix_vote_timeline RENAME TO ix_vote_legacy_timeline"))
+            has_legacy = True
+        if not has_legacy:
+            db.session.commit()
+            return None
+
+        Vote.__table__.create(db.session.connection(), checkfirst=True)
+        ArchivalService.ensure_vote_partitions(partition_size, ahead)
+        moved = db.session.execute(text(
+            "INSERT INTO vote (user_tournament_id, round_number, match_number, winner_index, created_at) "
+            "SELECT user_tournament_id, round_number, match_number, winner_index, created_at FROM vote_legacy"
+        )).rowcount
+        db.session.execute(text("DROP TABLE vote_legacy"))
+        db.session.commit()
+        return moved
+
+    @staticmethod
+    def compact_completed_brackets(completed_before, batch_size=None):
+        """Replace the JSONB bracket of old completed user tournaments with its format's compact encoding"""
+        batch_size = batch_size or ArchivalService.COMPACT_BATCH_SIZE
+        table = UserTournament.__table__
+        compact = update(table).where(table.c.id == bindparam('b_id')).values(
+            compact_winners=bindparam('b_winners'), current_bracket=null()
+        )
+        compacted = 0
+        while True:
+            rows = db.session.execute(
+                select(UserTournament.id, UserTournament.current_bracket, Tournament.format).join(
+                    Tournament, Tournament.id == UserTournament.tournament_id
+                ).where(
+                    UserTournament.completed == True,
+                    UserTournament.completed_at < completed_before,
+                    UserTournament.current_bracket.isnot(None)
+                ).order_by(UserTournament.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return compacted
+            db.session.execute(compact, [
+                {'b_id': user_tournament_id, 'b_winners': get_format(tournament_format).encode(bracket)}
+                for user_tournament_id, bracket, tournament_format in rows
+            ])
+            db.session.commit()
+            compacted += len(rows)
+
+    @staticmethod
+    def archive_vote_partitions(inactive_since, tablespace=None):
+        """Move closed vote partitions with no votes since `inactive_since` into vote_archive.
+
+        A partition is closed once newer user tournaments exist past its upper bound.
+        Archived partitions drop everything but their primary key, and can be moved to
+        a cheaper tablespace.
+        """
+        max_id = ArchivalService._max_user_tournament_id()
+        archived = []
+        for name, lower, upper in ArchivalService.list_partitions('vote'):
+            if upper > max_id:
+                continue
+            last_vote = db.session.scalar(text(f"SELECT max(created_at) FROM {name}"))
+            if last_vote is not None and last_vote >= inactive_since:
+                continue
+
+            archive_name = name.replace('vote_', 'vote_archive_', 1)
+            db.session.execute(text(f"ALTER TABLE vote DETACH PARTITION {name}"))
+            secondary_indexes = db.session.scalars(text(
+                "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE i.indrelid = CAST(:name AS regclass) AND NOT i.indisprimary"
+            ), {'name': name}).all()
+            for index_name in secondary_indexes:
+                db.session.execute(text(f"DROP INDEX {index_name}"))
+            foreign_keys = db.session.scalars(text(
+                "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"
+            ), {'name': name}).all()
+            for constraint_name in foreign_keys:
+                db.session.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {constraint_name}"))
+            db.session.execute(text(f"ALTER TABLE {name} RENAME TO {archive_name}"))
+            if tablespace:
+                db.session.execute(text(f"ALTER TABLE {archive_name} SET TABLESPACE {tablespace}"))
+            db.session.execute(text(
+                f"ALTER TABLE vote_archive ATTACH PARTITION {archive_name} FOR VALUES FROM ({lower}) TO ({upper})"
+            ))
+            db.session.commit()
+            archived.append(archive_name)
+        return archived
@@ -0,0 +1,225 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from multiprocessing import get_context
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from app.clients.open_router import Usage, get_openrouter_client
+from app.core import admission_controller
+from app.repositories import get_repository
+from app.schemas import CreateTournamentRequest
+from app.services.judging import JudgeService
+from app.services.tournaments import TournamentService
+
+@dataclass
+class BatchSummary:
+    items: int = 0
+    # Done by an earlier run against the same output
+    skipped: int = 0
+    completed: int = 0
+    failed: int = 0
+    matches: int = 0
+    judge_calls: int = 0
+    cached: int = 0
+    elapsed: float = 0.0
+    usage: Usage = field(default_factory=Usage)
+
+    @property
+    def tournaments_per_second(self) -> float:
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def matches_per_second(self) -> float:
+        return self.matches / self.elapsed if self.elapsed else 0.0
+
+class _InlineExecutor:
+    """Runs each task as it is submitted, in this process, for workers=0"""
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+def _init_worker():
+    """Give a pool process its own app, with its own connection pool and client"""
+    from app import create_app
+    create_app().app_context().push()
+
+def _create(request: dict) -> Tuple[int, dict]:
+    client = get_openrouter_client()
+    before = client.usage()
+    TournamentService.check_creation(request['prompts'], request['format'])
+    admission_controller.acquire_waiting(None, TournamentService.creation_cost(len(request['prompts'])))
+    tournament = TournamentService.create_tournament(request['question'], request['prompts'], request['format'])
+    return tournament.id, asdict(client.usage() - before)
+
+def _judge(tournament_id: int, models: List[str], batch_size: Optional[int], concurrency: Optional[int]) -> Optional[dict]:
+    """The judged result, or None when the tournament is gone, as in-memory ones are after a restart"""
+    tournament = get_repository().get_tournament(tournament_id)
+    if tournament is None:
+        return None
+    client = get_openrouter_client()
+    before = client.usage()
+    progress = None
+    for progress in JudgeService.judge_tournament(tournament_id, models, batch_size, concurrency):
+        pass
+    if progress is None:
+        # Judged by an earlier run that stopped before writing the result
+        user_tournament = get_repository().get_user_tournament(tournament_id, JudgeService.judge_user_id(models))
+        winner, matches, judge_calls, cached = user_tournament.winner_prompt_index, 0, 0, 0
+    else:
+        winner, matches, judge_calls, cached = progress.winner, progress.matches, progress.calls, progress.cached
+    prompt = tournament.prompts[winner]
+    return {
+        'tournament_id': tournament_id,
+        'winner_prompt_index': winner,
+        'winner_prompt': prompt.text,
+        'winner_model': prompt.model,
+        'matches': matches,
+        'judge_calls': judge_calls,
+        'cached': cached,
+        'usage': asdict(client.usage() - before),
+    }
+
+class BatchEvaluation:
+    """Creates and judges tournaments listed in a JSONL file, headless and resumable.
+
+    Each input line is a tournament creation request, with an optional "id". Results
+    are appended to the output JSONL as tournaments finish, and each created
+    tournament's id to ``<output>.checkpoint``, so a rerun skips finished lines and
+    resumes judging instead of recreating tournaments. Failed lines are rerun.
+    """
+
+    def __init__(self, input_path: str, output_path: str, models: List[str], workers: int = 0,
+                 batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.checkpoint_path = output_path + '.checkpoint'
+        self.models = models
+        self.workers = workers
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    def read_items(self) -> Iterator[Tuple[str, dict]]:
+        """(id, validated request) per line; raises ValueError naming the first invalid line"""
+        seen = set()
+        with open(self.input_path) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                    request = CreateTournamentRequest(**item)
+                except (ValueError, TypeError, ValidationError) as e:
+                    raise ValueError(f"{self.input_path}:{number}: {e}")
+                item_id = str(item.get('id', number))
+                if item_id in seen:
+                    raise ValueError(f"{self.input_path}:{number}: duplicate id {item_id}")
+                seen.add(item_id)
+                yield item_id, request.model_dump()
+
+    def load_checkpoint(self) -> Tuple[Set[str], Dict[str, int]]:
+        """Ids with a stored result, and tournament ids created for the rest"""
+        done = set()
+        created = {}
+        if os.path.exists(self.output_path):
+            with open(self.output_path) as f:
+                for line in f:
+                    row = json.loads(line)
+                    if 'error' not in row:
+                        done.add(row['id'])
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                for line in f:
+                    row = json.loads(line)
+                    created[row['id']] = row['tournament_id']
+        return done, created
+
+    def run(self, on_result: Optional[Callable[[dict, BatchSummary], None]] = None) -> BatchSummary:
+        # In-memory tournaments live in one process and their ids restart with it, so another
+        # worker or a later run would find a different tournament under a checkpointed id
+        in_memory = get_repository().name == 'memory'
+        if in_memory and self.workers:
+            raise ValueError("The memory storage backend needs --workers 0")
+        items = list(self.read_items())
+        done, created = self.load_checkpoint()
+        if in_memory:
+            created = {}
+        summary = BatchSummary(items=len(items))
+        requests = {item_id: request for item_id, request in items if item_id not in done}
+        todo = deque(requests)
+        summary.skipped = len(items) - len(todo)
+        creation_usage: Dict[str, dict] = {}
+        start = time.perf_counter()
+
+        if self.workers:
+            executor = ProcessPoolExecutor(self.workers, mp_context=get_context('spawn'), initializer=_init_worker)
+        else:
+            executor = _InlineExecutor()
+        pending: Dict[Future, Tuple[str, str]] = {}
+
+        def submit_next():
+            item_id = todo.popleft()
+            tournament_id = created.get(item_id)
+            if tournament_id is None:
+                pending[executor.submit(_create, requests[item_id])] = ('create', item_id)
+            else:
+                judge = (_judge, tournament_id, self.models, self.batch_size, self.concurrency)
+                pending[executor.submit(*judge)] = ('judge', item_id)
+
+        # A few tasks queued per worker keep every process busy without reading the whole set into the pool
+        max_pending = max(1, 2 * self.workers)
+        with open(self.output_path, 'a') as output, open(self.checkpoint_path, 'a') as checkpoint:
+            def write(stream, row):
+                stream.write(json.dumps(row) + '\n')
+                stream.flush()
+
+            def finish(row):
+                write(output, row)
+                summary.elapsed = time.perf_counter() - start
+                if on_result:
+                    on_result(row, summary)
+
+            try:
+                while todo or pending:
+                    while todo and len(pending) < max_pending:
+                        submit_next()
+                    finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        kind, item_id = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            summary.failed += 1
+                            finish({'id': item_id, 'error': str(e) or type(e).__name__})
+                            continue
+                        if kind == 'create':
+                            created[item_id], creation_usage[item_id] = result
+                            summary.usage += Usage(**creation_usage[item_id])
+                            write(checkpoint, {'id': item_id, 'tournament_id': created[item_id]})
+                            todo.appendleft(item_id)
+                        elif result is None:
+                            del created[item_id]
+                            todo.appendleft(item_id)
+                        else:
+                            usage = Usage(**result.pop('usage'))
+                            summary.usage += usage
+                            summary.completed += 1
+                            summary.matches += result['matches']
+                            summary.judge_calls += result['judge_calls']
+                            summary.cached += result['cached']
+                            usage += Usage(**creation_usage.get(item_id, {}))
+                            finish({'id': item_id, **result, 'usage': asdict(usage)})
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+        summary.elapsed = time.perf_counter() - start
+        return summary
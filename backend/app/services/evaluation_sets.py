@@ -0,0 +1,124 @@
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+from flask import abort, current_app
+from app.clients.open_router import get_openrouter_client
+from app.core import admission_controller
+from app.core.replicas import read_only
+from app.formats import DEFAULT_FORMAT, get_format
+from app.repositories import get_repository
+from app.services.tournaments import TournamentService
+
+@dataclass
+class EvaluationProgress:
+    evaluation_set_id: int
+    questions: int
+    created: int = 0
+    failed: int = 0
+    completions: int = 0
+    elapsed: float = 0.0
+    # The question just finished, and its tournament unless a completion failed
+    question: Optional[str] = None
+    tournament_id: Optional[int] = None
+
+    @property
+    def completions_per_second(self) -> float:
+        return self.completions / self.elapsed if self.elapsed else 0.0
+
+class EvaluationSetService:
+    @staticmethod
+    def create_evaluation_set(name, questions, prompt_data_list, tournament_format=DEFAULT_FORMAT,
+                              concurrency=None) -> Iterator[EvaluationProgress]:
+        """Generate every prompt's response to every question and store one tournament per question.
+
+        All N x M completions run in one event loop under one semaphore, question by
+        question, so the first questions' tournaments are stored, and yielded, while
+        later questions are still generating. A question with a failed completion is
+        counted as failed and gets no tournament.
+        """
+        config = current_app.config
+        fmt = get_format(tournament_format)
+        fmt.check_size(len(prompt_data_list))
+        if len(prompt_data_list) > config['EAGER_RESPONSE_LIMIT']:
+            raise ValueError(f"An evaluation set allows at most {config['EAGER_RESPONSE_LIMIT']} prompts")
+        client = get_openrouter_client()
+        prompts = client.validate_prompts_data(prompt_data_list)
+        questions = [question.strip() for question in questions]
+
+        num_prompts = len(prompts)
+        calls = [(prompt.model, prompt.text, question) for question in questions for prompt in prompts]
+        admission_controller.acquire_waiting(None, len(calls))
+        evaluation_set = get_repository().add_evaluation_set(name, fmt.name)
+
+        progress = EvaluationProgress(evaluation_set.id, len(questions))
+        responses: List[List[Optional[str]]] = [[None] * num_prompts for _ in questions]
+        remaining = [num_prompts] * len(questions)
+        start = time.perf_counter()
+        for index, content in client.complete_iter(calls, concurrency or config['EVALUATION_CONCURRENCY']):
+            question_index, position = divmod(index, num_prompts)
+            responses[question_index][position] = content
+            remaining[question_index] -= 1
+            progress.completions += 1
+            if remaining[question_index]:
+                continue
+
+            progress.question, progress.tournament_id = questions[question_index], None
+            if any(response.startswith("[Error:") for response in responses[question_index]):
+                progress.failed += 1
+            else:
+                tournament = TournamentService.store_tournament(
+                    questions[question_index], prompt_data_list, responses[question_index], fmt, evaluation_set.id
+                )
+                progress.created += 1
+                progress.tournament_id = tournament.id
+            progress.elapsed = time.perf_counter() - start
+            yield progress
+
+    @staticmethod
+    @read_only
+    def get_evaluation_set(evaluation_set_id):
+        """Per-question rankings and rankings summed over every question"""
+        repository = get_repository()
+        evaluation_set = repository.get_evaluation_set(evaluation_set_id)
+        if evaluation_set is None:
+            abort(404)
+
+        questions = []
+        totals: Dict[int, Dict] = {}
+        percentages: Dict[int, List[float]] = {}
+        for tournament_id, question in repository.evaluation_set_questions(evaluation_set_id):
+            rankings, stats = TournamentService.get_results(tournament_id)
+            completed = stats['completed_participants']
+            questions.append({
+                'tournament_id': tournament_id,
+                'question': question,
+                'completed_participants': completed,
+                'rankings': rankings
+            })
+            top = max(ranking['win_count'] for ranking in rankings)
+            for ranking in rankings:
+                index = ranking['prompt_index']
+                total = totals.setdefault(index, {
+                    'prompt': ranking['prompt'],
+                    'prompt_index': index,
+                    'model': ranking['model'],
+                    'win_count': 0,
+                    'questions_won': 0
+                })
+                total['win_count'] += ranking['win_count']
+                if completed:
+                    total['questions_won'] += ranking['win_count'] == top
+                    percentages.setdefault(index, []).append(ranking['win_percentage'])
+
+        for index, total in totals.items():
+            total['mean_win_percentage'] = round(statistics.fmean(percentages[index]), 2) if index in percentages else 0.0
+
+        return {
+            'id': evaluation_set.id,
+            'name': evaluation_set.name,
+            'format': evaluation_set.format,
+            'created_at': evaluation_set.created_at,
+            'questions': questions,
+            'rankings': sorted(totals.values(), key=lambda x: (x['mean_win_percentage'], x['win_count']), reverse=True)
+        }
@@ -0,0 +1,225 @@
+import csv
+import io
+from datetime import datetime
+from app.models import ArchivedVote, TournamentPrompt, UserTournament, Vote
+from app import db
+from app.core.replicas import replica_reads
+from app.core.serialization import dumps
+from sqlalchemy import select, func, and_
+
+# Column name and type per dataset; the types drive the Parquet schema
+DATASET_COLUMNS = {
+    'votes': [
+        ('tournament_id', 'int'),
+        ('user_tournament_id', 'int'),
+        ('user_id', 'str'),
+        ('round_number', 'int'),
+        ('match_number', 'int'),
+        ('winner_index', 'int'),
+        ('created_at', 'datetime'),
+    ],
+    'user_tournaments': [
+        ('user_tournament_id', 'int'),
+        ('tournament_id', 'int'),
+        ('user_id', 'str'),
+        ('completed', 'bool'),
+        ('winner_prompt_index', 'int'),
+        ('started_at', 'datetime'),
+        ('completed_at', 'datetime'),
+    ],
+    'rankings': [
+        ('tournament_id', 'int'),
+        ('prompt_index', 'int'),
+        ('prompt', 'str'),
+        ('model', 'str'),
+        ('completed_participants', 'int'),
+        ('win_count', 'int'),
+        ('win_percentage', 'float'),
+    ],
+}
+
+class ExportService:
+    DATASETS = tuple(DATASET_COLUMNS)
+    FORMATS = ('ndjson', 'csv')
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def _votes_query(tournament_id=None, since=None, until=None, source=Vote):
+        query = select(
+            UserTournament.tournament_id,
+            source.user_tournament_id,
+            UserTournament.user_id,
+            source.round_number,
+            source.match_number,
+            source.winner_index,
+            source.created_at
+        ).join(UserTournament, UserTournament.id == source.user_tournament_id)
+
+        if tournament_id is not None:
+            query = query.where(UserTournament.tournament_id == tournament_id)
+        if since is not None:
+            query = query.where(source.created_at >= since)
+        if until is not None:
+            query = query.where(source.created_at < until)
+
+        # Walk ix_vote_timeline (user_tournament_id, created_at) per bracket
+        return query.order_by(source.user_tournament_id, source.created_at)
+
+    @staticmethod
+    def _user_tournaments_query(tournament_id=None, since=None, until=None):
+        query = select(
+            UserTournament.id,
+            UserTournament.tournament_id,
+            UserTournament.user_id,
+            UserTournament.completed,
+            UserTournament.winner_prompt_index,
+            UserTournament.started_at,
+            UserTournament.completed_at
+        )
+
+        if tournament_id is not None:
+            query = query.where(UserTournament.tournament_id == tournament_id)
+        if since is not None:
+            query = query.where(UserTournament.started_at >= since)
+        if until is not None:
+            query = query.where(UserTournament.started_at < until)
+
+        return query.order_by(UserTournament.id)
+
+    @staticmethod
+    def _rankings_query(tournament_id=None, since=None, until=None):
+        """Per-prompt win counts, restricted to brackets completed inside the time range"""
+        completed = [
+            UserTournament.tournament_id == TournamentPrompt.tournament_id,
+            UserTournament.completed == True
+        ]
+        if since is not None:
+            completed.append(UserTournament.completed_at >= since)
+        if until is not None:
+            completed.append(UserTournament.completed_at < until)
+
+        completed_participants = func.count(UserTournament.id)
+        win_count = func.count(UserTournament.id).filter(
+            UserTournament.winner_prompt_index == TournamentPrompt.position
+        )
+        query = select(
+            TournamentPrompt.tournament_id,
+            TournamentPrompt.position,
+            TournamentPrompt.text,
+            TournamentPrompt.model,
+            completed_participants,
+            win_count,
+            func.round(
+                func.coalesce(100.0 * win_count / func.nullif(completed_participants, 0), 0), 2
+            ).cast(db.Float)
+        ).select_from(TournamentPrompt).outerjoin(
+            UserTournament, and_(*completed)
+        )
+
+        if tournament_id is not None:
+            query = query.where(TournamentPrompt.tournament_id == tournament_id)
+
+        return query.group_by(
+            TournamentPrompt.tournament_id, TournamentPrompt.position,
+            TournamentPrompt.text, TournamentPrompt.model
+        ).order_by(TournamentPrompt.tournament_id, TournamentPrompt.position)
+
+    @staticmethod
+    def iter_batches(dataset, tournament_id=None, since=None, until=None, batch_size=None):
+        """Yield lists of row tuples for a dataset from a server-side cursor.
+
+        Rows are plain column tuples rather than ORM entities, so nothing is added
+        to the session's identity map and memory stays bounded by the batch size.
+        """
+        if dataset == 'votes':
+            # Archived partitions only hold lower user tournament ids, so reading them first keeps the order
+            queries = [ExportService._votes_query(tournament_id, since, until, source)
+                       for source in (ArchivedVote, Vote)]
+        else:
+            build_query = getattr(ExportService, f'_{dataset}_query')
+            queries = [build_query(tournament_id, since, until)]
+        batch_size = batch_size or ExportService.BATCH_SIZE
+
+        for query in queries:
+            # Analytics exports are the heaviest reads, keep them off the primary when possible
+            with replica_reads():
+                result = db.session.execute(query.execution_options(yield_per=batch_size))
+            try:
+                for partition in result.partitions():
+                    yield [tuple(row) for row in partition]
+            finally:
+                result.close()
+
+    @staticmethod
+    def _iso(value):
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    @staticmethod
+    def stream_ndjson(dataset, batches):
+        """Encode row batches as newline-delimited JSON, one chunk per batch"""
+        names = [name for name, _ in DATASET_COLUMNS[dataset]]
+        iso = ExportService._iso
+        for batch in batches:
+            yield b''.join(
+                dumps({name: iso(value) for name, value in zip(names, row)}) + b'\n'
+                for row in batch
+            )
+
+    @staticmethod
+    def stream_csv(dataset, batches):
+        """Encode row batches as CSV with a header row, one chunk per batch"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name for name, _ in DATASET_COLUMNS[dataset]])
+        iso = ExportService._iso
+        for batch in batches:
+            writer.writerows([iso(value) for value in row] for row in batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        # Header only when the export is empty
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    def stream(dataset, export_format, tournament_id=None, since=None, until=None, batch_size=None):
+        """Stream an export as encoded byte chunks"""
+        if dataset not in DATASET_COLUMNS:
+            raise ValueError(f"Unknown export dataset: {dataset}")
+        if export_format not in ExportService.FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        batches = ExportService.iter_batches(dataset, tournament_id, since, until, batch_size)
+        encode = ExportService.stream_ndjson if export_format == 'ndjson' else ExportService.stream_csv
+        return encode(dataset, batches)
+
+    @staticmethod
+    def write_parquet(dataset, path, tournament_id=None, since=None, until=None, batch_size=None):
+        """Write an export to a Parquet file one row group per batch; requires pyarrow"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        types = {
+            'int': pa.int64(),
+            'str': pa.string(),
+            'bool': pa.bool_(),
+            'float': pa.float64(),
+            'datetime': pa.timestamp('us'),
+        }
+        columns = DATASET_COLUMNS[dataset]
+        schema = pa.schema([(name, types[kind]) for name, kind in columns])
+
+        rows_written = 0
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in ExportService.iter_batches(dataset, tournament_id, since, until, batch_size):
+                arrays = [
+                    pa.array([row[i] for row in batch], type=schema.field(i).type)
+                    for i in range(len(columns))
+                ]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                rows_written += len(batch)
+        return rows_written
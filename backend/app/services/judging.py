@@ -0,0 +1,154 @@
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+from flask import current_app
+from app.clients.open_router import get_openrouter_client
+from app.core import admission_controller
+from app.core.metrics import JUDGE_VERDICTS
+from app.repositories import get_repository
+from app.services.tournaments import TournamentService
+
+JUDGE_SYSTEM_PROMPT = (
+    "You are an impartial judge comparing two responses to the same question. "
+    "Reply with the single letter A if Response A is better, or B if Response B is better."
+)
+JUDGE_USER_PROMPT = "Question:\n{question}\n\n[Response A]\n{response_a}\n\n[Response B]\n{response_b}"
+JUDGE_MAX_TOKENS = 16
+VERDICT = re.compile(r"^\W*(?:response\s+)?([AB])\b", re.IGNORECASE)
+
+@dataclass
+class JudgeProgress:
+    matches: int = 0
+    calls: int = 0
+    cached: int = 0
+    invalid: int = 0
+    # Matches the verdicts tied on, decided for participant1
+    split: int = 0
+    elapsed: float = 0.0
+    completed: bool = False
+    winner: Optional[int] = None
+
+    @property
+    def matches_per_second(self) -> float:
+        return self.matches / self.elapsed if self.elapsed else 0.0
+
+class JudgeService:
+    """Votes through tournaments with LLM judges instead of people"""
+
+    @staticmethod
+    def judge_user_id(models: List[str]) -> str:
+        """The synthetic user a judge panel votes as"""
+        return "judge:" + "+".join(models)
+
+    @staticmethod
+    def verdict_key(model: str, question: str, response_a: str, response_b: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, question, response_a, response_b):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @staticmethod
+    def parse_verdict(content: str) -> Optional[str]:
+        """'A' or 'B' from a judge completion, None for anything else, including client errors"""
+        if content.startswith("[Error:"):
+            return None
+        match = VERDICT.match(content.strip())
+        return match.group(1).upper() if match else None
+
+    @staticmethod
+    def judge_tournament(tournament_id: int, models: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                         concurrency: Optional[int] = None) -> Iterator[JudgeProgress]:
+        """Vote through a tournament with a judge panel, yielding progress after each stored batch.
+
+        Every model judges every match in both orders, so position bias cancels out,
+        and the prompt with more verdicts wins. Verdicts are cached by judge model,
+        question and ordered response pair, and a batch's votes are stored in one
+        transaction under judge_user_id(models). Rerunning resumes where it stopped.
+        """
+        config = current_app.config
+        models = list(models or config["JUDGE_MODELS"])
+        batch_size = batch_size or config["JUDGE_BATCH_SIZE"]
+        concurrency = concurrency or config["JUDGE_CONCURRENCY"]
+        if not models:
+            raise ValueError("At least one judge model is required")
+        # A batch's completions are admitted together, so they have to fit in the burst
+        if admission_controller.enabled:
+            batch_size = max(1, min(batch_size, int(admission_controller.global_bucket.capacity) // (2 * len(models))))
+
+        if get_repository().get_tournament(tournament_id) is None:
+            raise ValueError(f"Tournament {tournament_id} not found")
+        user_id = JudgeService.judge_user_id(models)
+        tournament, user_tournament, bracket = TournamentService.get_tournament_with_user_state(tournament_id, user_id)
+
+        progress = JudgeProgress()
+        if user_tournament is not None and user_tournament.completed:
+            progress.completed, progress.winner = True, user_tournament.winner_prompt_index
+            return
+        start = time.perf_counter()
+        while not progress.completed:
+            # Responses a large bracket still lacks wait for budget too, like the judges' own calls
+            matches = TournamentService.get_upcoming_matches(tournament, bracket, limit=batch_size, wait_for_budget=True)
+            if not matches:
+                break
+            votes = JudgeService._judge_batch(tournament.question, matches, models, concurrency, progress)
+            if not votes:
+                raise RuntimeError("The judges returned no usable verdicts")
+            bracket, progress.completed, progress.winner = TournamentService.record_votes(tournament, user_id, votes)
+            progress.matches += len(votes)
+            progress.elapsed = time.perf_counter() - start
+            yield progress
+
+    @staticmethod
+    def _judge_batch(question, matches, models, concurrency, progress) -> List[Tuple[int, int, int]]:
+        """Votes for the matches at least one verdict was returned for"""
+        judgements = [
+            (model, a, b, JudgeService.verdict_key(model, question, a['response'], b['response']))
+            for match in matches
+            for model in models
+            for a, b in ((match['participant1'], match['participant2']), (match['participant2'], match['participant1']))
+        ]
+        repository = get_repository()
+        verdicts = repository.judge_verdicts([key for _, _, _, key in judgements])
+        for model, _, _, key in judgements:
+            if key in verdicts:
+                JUDGE_VERDICTS.labels(model, "cache").inc()
+        progress.cached += sum(key in verdicts for _, _, _, key in judgements)
+
+        missing = {key: (model, a, b) for model, a, b, key in judgements if key not in verdicts}
+        if missing:
+            # Judging is a batch job, so it waits for the global LLM budget rather than failing
+            admission_controller.acquire_waiting(None, len(missing))
+            contents = get_openrouter_client().complete_all([
+                (model, JUDGE_SYSTEM_PROMPT,
+                 JUDGE_USER_PROMPT.format(question=question, response_a=a['response'], response_b=b['response']))
+                for model, a, b in missing.values()
+            ], concurrency, temperature=0.0, max_tokens=JUDGE_MAX_TOKENS)
+            fresh: Dict[str, str] = {}
+            for (key, (model, _, _)), content in zip(missing.items(), contents):
+                verdict = JudgeService.parse_verdict(content)
+                JUDGE_VERDICTS.labels(model, "llm" if verdict else "invalid").inc()
+                if verdict:
+                    fresh[key] = verdict
+            repository.save_judge_verdicts(fresh)
+            verdicts.update(fresh)
+            progress.calls += len(missing)
+            progress.invalid += len(missing) - len(fresh)
+
+        votes = []
+        per_match = 2 * len(models)
+        for i, match in enumerate(matches):
+            p1, p2 = match['participant1']['index'], match['participant2']['index']
+            points = {p1: 0, p2: 0}
+            for _, a, b, key in judgements[i * per_match:(i + 1) * per_match]:
+                if key in verdicts:
+                    points[(a if verdicts[key] == 'A' else b)['index']] += 1
+            if not any(points.values()):
+                # Left for the next batch to retry
+                continue
+            if points[p1] == points[p2]:
+                progress.split += 1
+            votes.append((match['round'], match['match'], p2 if points[p2] > points[p1] else p1))
+        return votes
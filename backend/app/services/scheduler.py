@@ -0,0 +1,181 @@
+import logging
+import math
+import random
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from flask import current_app
+from app.repositories import get_repository
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[int, int]
+
+def _win_probability(score, other):
+    # Clamped so a long winning streak cannot overflow exp
+    return 1 / (1 + math.exp(max(-30.0, min(30.0, other - score))))
+
+class PairwiseEstimates:
+    """Bradley-Terry strengths with a Gaussian uncertainty per prompt, updated one result at a time.
+
+    A result moves both strengths by their variance times the surprise, 1 - p, and
+    adds the comparison's Fisher information, p(1 - p), to both precisions, so an
+    update is O(1) however many prompts and votes there are.
+    """
+
+    PRIOR_PRECISION = 1.0
+
+    def __init__(self, num_prompts: int):
+        self.scores = [0.0] * num_prompts
+        self.precisions = [self.PRIOR_PRECISION] * num_prompts
+
+    def update(self, winner_index: int, loser_index: int, count: int = 1):
+        for _ in range(count):
+            p = _win_probability(self.scores[winner_index], self.scores[loser_index])
+            self.scores[winner_index] += (1 - p) / self.precisions[winner_index]
+            self.scores[loser_index] -= (1 - p) / self.precisions[loser_index]
+            self.precisions[winner_index] += p * (1 - p)
+            self.precisions[loser_index] += p * (1 - p)
+
+    def ranking(self) -> List[int]:
+        return sorted(range(len(self.scores)), key=lambda i: -self.scores[i])
+
+    def choose(self, seen: Set[frozenset], rng: random.Random) -> Optional[Pair]:
+        """The unseen pair with the largest expected information gain, or None when every pair was seen.
+
+        The gain of (i, j) is p(1 - p) times the summed variances: the variance a
+        result removes under the model. The anchor is the least certain prompt with
+        an unseen opponent, and strengths are Thompson-sampled from their posteriors
+        so concurrent voters spread over near-equal pairs instead of sharing one.
+        O(n) per pair in the usual case where the anchor has an unseen opponent.
+        """
+        num_prompts = len(self.scores)
+        variances = [1 / precision for precision in self.precisions]
+        sampled = [rng.gauss(score, math.sqrt(variance)) for score, variance in zip(self.scores, variances)]
+        anchors = sorted(range(num_prompts), key=lambda i: (-variances[i], rng.random()))
+
+        for anchor in anchors:
+            best, best_gain = None, -1.0
+            for other in range(num_prompts):
+                if other == anchor or frozenset((anchor, other)) in seen:
+                    continue
+                p = _win_probability(sampled[anchor], sampled[other])
+                gain = p * (1 - p) * (variances[anchor] + variances[other])
+                if gain > best_gain:
+                    best, best_gain = other, gain
+            if best is not None:
+                return anchor, best
+        return None
+
+class _TournamentState:
+    __slots__ = ("estimates", "applied", "pending", "since", "synced_at", "lock")
+
+    def __init__(self, num_prompts):
+        self.estimates = PairwiseEstimates(num_prompts)
+        # (winner, loser) results folded into the estimates, and those not yet persisted
+        self.applied: Dict[Pair, int] = {}
+        self.pending: Dict[Pair, int] = {}
+        self.since = None
+        self.synced_at = time.monotonic()
+        self.lock = threading.Lock()
+
+class MatchScheduler:
+    """Picks each voter's next pair for scheduled formats from estimates shared by every voter.
+
+    Estimates live in process memory and take each vote in O(1). At most every
+    ADAPTIVE_SYNC_INTERVAL seconds a worker adds its new results to the repository's
+    pairwise counts and folds in the counts other workers added, so workers converge
+    without coordinating per vote. Results lost with a worker before they were
+    persisted only cost scheduling quality; the votes themselves are stored.
+    """
+
+    # Rows updated by transactions still in flight at the last read are read again
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+        self._states: Dict[int, _TournamentState] = {}
+        self._lock = threading.Lock()
+
+    def opening(self, tournament_id: int, num_prompts: int, user_id: str) -> Pair:
+        """A voter's first pair, random but fixed per voter so it needs no storage before the first vote"""
+        return tuple(random.Random(f"{tournament_id}:{user_id}").sample(range(num_prompts), 2))
+
+    def next_pair(self, tournament_id: int, num_prompts: int, bracket) -> Optional[Pair]:
+        """The most informative pair the voter has not been shown yet"""
+        seen = {
+            frozenset((match['participant1'], match['participant2']))
+            for round_matches in bracket for match in round_matches if match['participant1'] is not None
+        }
+        state = self._state(tournament_id, num_prompts)
+        with state.lock:
+            return state.estimates.choose(seen, self._rng)
+
+    def record(self, tournament_id: int, num_prompts: int, winner_index: int, loser_index: int):
+        """Fold a stored vote into the estimates; call after the vote is committed"""
+        state = self._state(tournament_id, num_prompts)
+        key = (winner_index, loser_index)
+        with state.lock:
+            state.estimates.update(winner_index, loser_index)
+            state.applied[key] = state.applied.get(key, 0) + 1
+            state.pending[key] = state.pending.get(key, 0) + 1
+            due = time.monotonic() - state.synced_at >= current_app.config["ADAPTIVE_SYNC_INTERVAL"]
+        if due:
+            self.sync(tournament_id)
+
+    def sync(self, tournament_id: int):
+        """Persist this process's new results and fold in those other processes persisted"""
+        state = self._states.get(tournament_id)
+        if state is None:
+            return
+        with state.lock:
+            pending, state.pending = state.pending, {}
+            state.synced_at = time.monotonic()
+        repository = get_repository()
+        try:
+            if pending:
+                repository.add_pairwise_results(tournament_id, pending)
+        except Exception:
+            logger.exception("Persisting pairwise results failed for tournament %s", tournament_id)
+            with state.lock:
+                for key, count in pending.items():
+                    state.pending[key] = state.pending.get(key, 0) + count
+            return
+        self._pull(tournament_id, state)
+
+    def estimates(self, tournament_id: int, num_prompts: int) -> PairwiseEstimates:
+        return self._state(tournament_id, num_prompts).estimates
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+    def _state(self, tournament_id, num_prompts):
+        with self._lock:
+            state = self._states.get(tournament_id)
+            if state is not None:
+                return state
+            state = self._states[tournament_id] = _TournamentState(num_prompts)
+        # Runs inside the voter's transaction, so it only reads
+        self._pull(tournament_id, state)
+        return state
+
+    def _pull(self, tournament_id, state):
+        """Fold in stored counts changed since the last pull; counts are totals, so rereading is harmless"""
+        try:
+            rows, now = get_repository().pairwise_results(tournament_id, state.since)
+        except Exception:
+            logger.exception("Loading pairwise results failed for tournament %s", tournament_id)
+            return
+        with state.lock:
+            for row in rows:
+                key = (row.winner_index, row.loser_index)
+                total = row.wins + state.pending.get(key, 0)
+                new = total - state.applied.get(key, 0)
+                if new > 0:
+                    state.estimates.update(*key, count=new)
+                    state.applied[key] = total
+            state.since = now - self.SYNC_OVERLAP
+
+match_scheduler = MatchScheduler()
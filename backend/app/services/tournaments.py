@@ -1,71 +1,201 @@
 import copy
-from datetime import datetime
-from app.models import Tournament, TournamentPrompt, UserTournament, Vote
-from app import db
-from app.utils import create_bracket
-from sqlalchemy import func, case, and_
-from sqlalchemy.orm import selectinload
-from sqlalchemy.orm.attributes import flag_modified
-from app.clients.open_router import OpenRouterClient
-
-client = OpenRouterClient()
+from itertools import islice
+from flask import abort, current_app
+from app.core import admission_controller, results_cache
+from app.core.deadlines import DeadlineExceeded
+from app.core.metrics import timed
+from app.core.replicas import read_only
+from app.formats import DEFAULT_FORMAT, get_format
+from app.repositories import get_repository
+from app.services.scheduler import match_scheduler
+from app.utils import decode_seeding, encode_seeding, iter_votable_matches
+from app.clients.open_router import get_openrouter_client
 
 class TournamentService:
+    SEARCH_MATCHES_PER_TOURNAMENT = 3
+
+    @staticmethod
+    def is_large(tournament):
+        """Large brackets keep only their seeding and generate responses in waves"""
+        return tournament.bracket_template is None
+
+    @staticmethod
+    def creation_cost(num_prompts):
+        """Upstream completions made while creating a tournament with num_prompts prompts"""
+        config = current_app.config
+        if num_prompts <= config['EAGER_RESPONSE_LIMIT']:
+            return num_prompts
+        return min(num_prompts, config['RESPONSE_WAVE_SIZE'])
+
+    @staticmethod
+    def check_creation(prompt_data_list, tournament_format=DEFAULT_FORMAT):
+        """Raise ValueError for a creation that would be refused, before any budget is spent on it"""
+        get_format(tournament_format).check_size(len(prompt_data_list))
+        get_openrouter_client().validate_prompts_data(prompt_data_list)
+
     @staticmethod
-    def create_tournament(question, prompt_data_list):
-        """Create a new tournament with LLM responses"""        
+    def create_tournament(question, prompt_data_list, tournament_format=DEFAULT_FORMAT, deadline=None):
+        """Create a new tournament with LLM responses; past the deadline, raise DeadlineExceeded and store nothing"""
+        fmt = get_format(tournament_format)
+        fmt.check_size(len(prompt_data_list))
+        if len(prompt_data_list) > current_app.config['EAGER_RESPONSE_LIMIT']:
+            return TournamentService._create_large_tournament(question, prompt_data_list, fmt, deadline)
+        
         # Generate responses
-        responses = client.generate_completions(prompt_data_list, question)
+        responses = get_openrouter_client().generate_completions(prompt_data_list, question, deadline)
         if any(response is None or response.strip() == "" for response in responses):
             raise RuntimeError("Failed to generate one or more LLM responses. Tournament not created.")
         
-        bracket_template = create_bracket(prompt_data_list)
-
-        tournament = Tournament(
-            question=question,
-            bracket_template=bracket_template
+        return TournamentService.store_tournament(question, prompt_data_list, responses, fmt)
+    
+    @staticmethod
+    def store_tournament(question, prompt_data_list, responses, fmt, evaluation_set_id=None):
+        """Store a tournament whose responses are already generated"""
+        bracket_template = fmt.create(len(prompt_data_list))
+        prompts = [
+            {
+                'position': i,
+                'text': prompt_data['text'],
+                'model': prompt_data['model'],
+                'response': response
+            } for i, (prompt_data, response) in enumerate(zip(prompt_data_list, responses))
+        ]
+        
+        return get_repository().add_tournament(
+            question, bracket_template, prompts, tournament_format=fmt.name, evaluation_set_id=evaluation_set_id
+        )
+    
+    @staticmethod
+    def _create_large_tournament(question, prompt_data_list, fmt, deadline=None):
+        """Store a large bracket's seeding and generate only the first wave of responses"""
+        seeding = fmt.seed(len(prompt_data_list))
+        wave = TournamentService._next_wave(seeding, set(range(len(prompt_data_list))), [])
+        responses = get_openrouter_client().generate_completions(
+            [prompt_data_list[i] for i in wave], question, deadline
+        )
+        if any(response is None or response.strip() == "" for response in responses):
+            raise RuntimeError("Failed to generate one or more LLM responses. Tournament not created.")
+        
+        generated = dict(zip(wave, responses))
+        prompts = [
+            {
+                'position': i,
+                'text': prompt_data['text'],
+                'model': prompt_data['model'],
+                'response': generated.get(i)
+            } for i, prompt_data in enumerate(prompt_data_list)
+        ]
+        
+        return get_repository().add_tournament(
+            question, None, prompts, seeding=encode_seeding(seeding), tournament_format=fmt.name
         )
-        db.session.add(tournament)
-        db.session.flush()
-        
-        # Create prompt records
-        tournament_prompts = [
-            TournamentPrompt(
-                tournament_id=tournament.id,
-                position=i,
-                text=prompt_data['text'],
-                model=prompt_data['model'],
-                response=response
-            ) for i, (prompt_data, response) in enumerate(zip(prompt_data_list, responses))
+    
+    @staticmethod
+    def _next_wave(seeding, missing, needed):
+        """Positions to generate next: the needed ones, then missing ones in first-round slot order.
+
+        Users vote through the first round in slot order, so the rest of the wave is what they reach next.
+        """
+        wave = list(dict.fromkeys(needed))
+        wave_size = current_app.config['RESPONSE_WAVE_SIZE']
+        for position in seeding:
+            if len(wave) >= wave_size:
+                break
+            if position in missing and position not in wave:
+                wave.append(position)
+        return wave
+    
+    @staticmethod
+    def _ensure_responses(tournament, user_bracket, matches, deadline=None, wait_for_budget=False):
+        """Generate missing responses for the given matches, topped up to a full wave.
+
+        One request at a time generates a tournament's wave; the others wait for it and use its responses.
+        Batch jobs pass wait_for_budget to wait for the global budget instead of being rejected.
+        """
+        prompts = tournament.prompts
+        positions = [
+            index for round_number, match_number in matches
+            for index in (user_bracket[round_number][match_number]['participant1'],
+                          user_bracket[round_number][match_number]['participant2'])
         ]
-        db.session.bulk_save_objects(tournament_prompts)
-        db.session.commit()
+        if all(prompts[i].response is not None for i in positions):
+            return
         
-        return Tournament.query.options(selectinload(Tournament.prompts)).get(tournament.id)
+        repository = get_repository()
+        with repository.wave_lock(tournament, deadline.remaining() if deadline else None) as acquired:
+            if not acquired:
+                raise DeadlineExceeded(deadline.reason() or 'timeout')
+            # Whoever held the lock may have generated these already
+            missing = repository.refresh_responses(tournament)
+            needed = [i for i in positions if i in missing]
+            if not needed:
+                return
+            
+            wave = TournamentService._next_wave(decode_seeding(tournament.seeding), missing, needed)
+            # Waves serve every later voter as well, so they draw on the global budget only
+            if wait_for_budget:
+                admission_controller.acquire_waiting(None, len(wave))
+            else:
+                admission_controller.acquire(None, len(wave), deadline)
+            responses = get_openrouter_client().generate_completions(
+                [{'text': prompts[i].text, 'model': prompts[i].model} for i in wave], tournament.question, deadline
+            )
+            if any(response is None or response.strip() == "" for response in responses):
+                raise RuntimeError("Failed to generate one or more LLM responses")
+            
+            repository.save_responses(tournament, dict(zip(wave, responses)))
+    
+    @staticmethod
+    def _get_tournament_or_404(tournament_id):
+        tournament = get_repository().get_tournament(tournament_id)
+        if tournament is None:
+            abort(404)
+        return tournament
+    
+    @staticmethod
+    def _start_bracket(tournament, user_id):
+        """A new user's bracket: the template, with the opening pair filled in for scheduled formats"""
+        bracket = copy.deepcopy(tournament.get_template())
+        fmt = get_format(tournament.format)
+        if fmt.scheduled:
+            fmt.schedule(bracket, match_scheduler.opening(tournament.id, len(tournament.prompts), user_id))
+        return bracket
     
     @staticmethod
     def get_tournament_with_user_state(tournament_id, user_id):
         """Get tournament with user state"""
-        tournament = Tournament.query.options(
-            selectinload(Tournament.prompts)
-        ).get_or_404(tournament_id)
+        tournament = TournamentService._get_tournament_or_404(tournament_id)
         
         # Get user tournament
-        user_tournament = UserTournament.query.filter(
-            and_(
-                UserTournament.tournament_id == tournament_id,
-                UserTournament.user_id == user_id
-            )
-        ).first()
+        user_tournament = get_repository().get_user_tournament(tournament_id, user_id)
         
         # Get user bracket or create new one
-        if user_tournament and user_tournament.current_bracket:
-            user_bracket = user_tournament.current_bracket
-        else:
-            user_bracket = copy.deepcopy(tournament.bracket_template)
+        user_bracket = user_tournament.get_bracket() if user_tournament else None
+        if user_bracket is None:
+            with timed("bracket"):
+                user_bracket = TournamentService._start_bracket(tournament, user_id)
         
         return tournament, user_tournament, user_bracket
 
+    @staticmethod
+    @read_only
+    def get_tournament_content(tournament_id):
+        """Get the user-independent content of a tournament"""
+        tournament = TournamentService._get_tournament_or_404(tournament_id)
+        # Content is cached as immutable, and large brackets are still filling in responses
+        large = TournamentService.is_large(tournament)
+        
+        return {
+            'id': tournament.id,
+            'question': tournament.question,
+            'format': tournament.format,
+            'prompts': [p.text for p in tournament.prompts],
+            'responses': [None if large else p.response for p in tournament.prompts],
+            'models': [p.model for p in tournament.prompts],
+            'bracket_template': tournament.bracket_template,
+            'seeding': decode_seeding(tournament.seeding) if large else None
+        }
+
     @staticmethod
     def _validate_vote(user_bracket, round_number, match_number, winner_index):
         """Vote validation logic"""
@@ -95,113 +225,151 @@ class TournamentService:
     @staticmethod
     def record_vote(tournament, user_id, round_number, match_number, winner_index):
         """Record a vote and update user tournament state"""
-        # Get user tournament
-        user_tournament = UserTournament.query.filter(
-            and_(
-                UserTournament.tournament_id == tournament.id,
-                UserTournament.user_id == user_id
-            )
-        ).first()
+        repository = get_repository()
+        user_tournament = repository.get_user_tournament(tournament.id, user_id)
         
+        # Starting or completing a bracket changes participation stats and rankings
+        results_changed = False
         if not user_tournament:
-            user_tournament = UserTournament(
-                tournament_id=tournament.id,
-                user_id=user_id,
-                current_bracket=copy.deepcopy(tournament.bracket_template),
-                completed=False
-            )
-            db.session.add(user_tournament)
-            db.session.flush()
-        
-        if not user_tournament.current_bracket:
-            user_tournament.current_bracket = copy.deepcopy(tournament.bracket_template)
+            user_tournament = repository.new_user_tournament(tournament, user_id)
+            results_changed = True
         
-        user_bracket = copy.deepcopy(user_tournament.current_bracket)
-        
-        # Validate vote
-        TournamentService._validate_vote(user_bracket, round_number, match_number, winner_index)
-        
-        # Check for existing vote
-        existing_vote = Vote.query.filter(
-            and_(
-                Vote.user_tournament_id == user_tournament.id,
-                Vote.round_number == round_number,
-                Vote.match_number == match_number
-            )
-        ).first()
+        with timed("bracket"):
+            stored_bracket = user_tournament.get_bracket()
+            user_bracket = (copy.deepcopy(stored_bracket) if stored_bracket
+                            else TournamentService._start_bracket(tournament, user_id))
+            
+            # Validate vote
+            TournamentService._validate_vote(user_bracket, round_number, match_number, winner_index)
         
-        if existing_vote:
+        if repository.has_vote(user_tournament, round_number, match_number):
             raise ValueError("User has already voted for this match")
         
-        # Create vote record
-        vote_record = Vote(
-            user_tournament_id=user_tournament.id,
-            round_number=round_number,
-            match_number=match_number,
-            winner_index=winner_index
+        fmt = get_format(tournament.format)
+        loser_index, champion = TournamentService._apply_vote(
+            fmt, tournament, user_bracket, round_number, match_number, winner_index
         )
-        db.session.add(vote_record)
         
-        # Update bracket state
-        current_match = user_bracket[round_number][match_number]
-        current_match['winner'] = winner_index
+        # A champion completes the tournament
+        results_changed = results_changed or champion is not None
         
-        # Advance winner to next round
-        TournamentService._advance_winner_in_bracket(
-            user_bracket, round_number, match_number, winner_index
+        repository.save_vote(
+            user_tournament, round_number, match_number, winner_index,
+            user_bracket, champion, results_changed
         )
+        if results_changed:
+            results_cache.invalidate(tournament.id)
+        if fmt.scheduled:
+            match_scheduler.record(tournament.id, len(tournament.prompts), winner_index, loser_index)
+        
+        return user_bracket, user_tournament.completed, user_tournament.winner_prompt_index
+
+    @staticmethod
+    def _apply_vote(fmt, tournament, user_bracket, round_number, match_number, winner_index):
+        """Decide a validated match in place and return (loser_index, champion)"""
+        # Update bracket state, advancing or pairing the next round as the format requires
+        with timed("bracket"):
+            match = user_bracket[round_number][match_number]
+            loser_index = match['participant2'] if winner_index == match['participant1'] else match['participant1']
+            fmt.record_result(user_bracket, round_number, match_number, winner_index)
+            champion = fmt.champion(user_bracket)
         
-        user_tournament.current_bracket = user_bracket
-        flag_modified(user_tournament, 'current_bracket')
+        # Scheduled formats store the next pair along with the vote
+        if fmt.scheduled and champion is None:
+            with timed("schedule"):
+                fmt.schedule(user_bracket, match_scheduler.next_pair(
+                    tournament.id, len(tournament.prompts), user_bracket
+                ))
+        return loser_index, champion
+
+    @staticmethod
+    def record_votes(tournament, user_id, votes):
+        """Record (round_number, match_number, winner_index) votes in order, stored in one transaction.
+
+        For automated voters such as the LLM judge; each vote is validated against the
+        bracket as left by the ones before it.
+        """
+        repository = get_repository()
+        user_tournament = repository.get_user_tournament(tournament.id, user_id)
+        
+        results_changed = False
+        if not user_tournament:
+            user_tournament = repository.new_user_tournament(tournament, user_id)
+            results_changed = True
         
-        # Check if this completes the tournament
-        is_final_round = round_number == len(user_bracket) - 1
-        if is_final_round:
-            user_tournament.completed = True
-            user_tournament.completed_at = datetime.utcnow()
-            user_tournament.winner_prompt_index = winner_index
+        stored_bracket = user_tournament.get_bracket()
+        user_bracket = (copy.deepcopy(stored_bracket) if stored_bracket
+                        else TournamentService._start_bracket(tournament, user_id))
+        fmt = get_format(tournament.format)
+        champion = None
+        results = []
+        for round_number, match_number, winner_index in votes:
+            TournamentService._validate_vote(user_bracket, round_number, match_number, winner_index)
+            loser_index, champion = TournamentService._apply_vote(
+                fmt, tournament, user_bracket, round_number, match_number, winner_index
+            )
+            results.append((winner_index, loser_index))
         
-        db.session.commit()
+        results_changed = results_changed or champion is not None
+        repository.save_votes(user_tournament, votes, user_bracket, champion, results_changed)
+        if results_changed:
+            results_cache.invalidate(tournament.id)
+        if fmt.scheduled:
+            for winner_index, loser_index in results:
+                match_scheduler.record(tournament.id, len(tournament.prompts), winner_index, loser_index)
         
         return user_bracket, user_tournament.completed, user_tournament.winner_prompt_index
 
     @staticmethod
-    def _advance_winner_in_bracket(bracket, round_number, match_number, winner_index):
-        """Advance winner to next round in bracket"""
-        if round_number >= len(bracket) - 1:
-            return
+    def get_upcoming_matches(tournament, user_bracket, limit=1, deadline=None, wait_for_budget=False):
+        """Get the next votable matches with both participants' prompts and responses.
+
+        For large brackets, responses missing from the next MATCH_LOOKAHEAD matches are generated first.
+        """
+        if TournamentService.is_large(tournament):
+            lookahead = max(limit, current_app.config['MATCH_LOOKAHEAD'])
+            TournamentService._ensure_responses(
+                tournament, user_bracket, list(islice(iter_votable_matches(user_bracket), lookahead)),
+                deadline, wait_for_budget
+            )
         
-        next_round = round_number + 1
-        next_match = match_number // 2
+        prompts = tournament.prompts
         
-        if next_round < len(bracket) and next_match < len(bracket[next_round]):
-            if match_number % 2 == 0:
-                bracket[next_round][next_match]['participant1'] = winner_index
-            else:
-                bracket[next_round][next_match]['participant2'] = winner_index
+        def participant(index):
+            prompt = prompts[index]
+            return {
+                'index': index,
+                'prompt': prompt.text,
+                'response': prompt.response,
+                'model': prompt.model
+            }
+        
+        return [{
+            'round': round_number,
+            'match': match_number,
+            'participant1': participant(user_bracket[round_number][match_number]['participant1']),
+            'participant2': participant(user_bracket[round_number][match_number]['participant2'])
+        } for round_number, match_number in islice(iter_votable_matches(user_bracket), limit)]
+
+    @staticmethod
+    def get_next_match_details(tournament, user_bracket, deadline=None):
+        """Get the next votable match with both participants' prompts and responses"""
+        upcoming = TournamentService.get_upcoming_matches(tournament, user_bracket, deadline=deadline)
+        return upcoming[0] if upcoming else None
+
+    @staticmethod
+    def get_results(tournament_id):
+        """Get rankings and participation stats, served from the results cache"""
+        return results_cache.get(tournament_id, lambda: (
+            TournamentService.get_prompt_rankings(tournament_id),
+            TournamentService.get_participation_stats(tournament_id)
+        ))
 
     @staticmethod
+    @read_only
     def get_prompt_rankings(tournament_id):
         """Get prompt performance rankings"""
-        results = db.session.query(
-            TournamentPrompt.position,
-            TournamentPrompt.text,
-            TournamentPrompt.model,
-            func.count(UserTournament.id).filter(UserTournament.completed == True).label('completed_participants'),
-            func.count(UserTournament.id).filter(
-                and_(
-                    UserTournament.completed == True,
-                    UserTournament.winner_prompt_index == TournamentPrompt.position
-                )
-            ).label('win_count')
-        ).select_from(TournamentPrompt).outerjoin(
-            UserTournament, 
-            UserTournament.tournament_id == TournamentPrompt.tournament_id
-        ).filter(
-            TournamentPrompt.tournament_id == tournament_id
-        ).group_by(
-            TournamentPrompt.position, TournamentPrompt.text, TournamentPrompt.model
-        ).order_by(TournamentPrompt.position).all()
+        results = get_repository().prompt_win_counts(tournament_id)
         
         # Calculate percentages
         formatted_results = []
@@ -219,15 +387,10 @@ class TournamentService:
         return sorted(formatted_results, key=lambda x: (x['win_count'], x['win_percentage']), reverse=True)
 
     @staticmethod
+    @read_only
     def get_participation_stats(tournament_id):
         """Get tournament participation statistics"""
-        stats = db.session.query(
-            func.count(UserTournament.id).label('total_participants'),
-            func.sum(case((UserTournament.completed == True, 1), else_=0)).label('completed_participants')
-        ).filter(UserTournament.tournament_id == tournament_id).first()
-        
-        total = stats.total_participants or 0
-        completed = int(stats.completed_participants or 0)
+        total, completed = get_repository().participation_counts(tournament_id)
         
         return {
             'total_participants': total,
@@ -236,22 +399,10 @@ class TournamentService:
         }
 
     @staticmethod
+    @read_only
     def get_tournaments_list():
         """Get list of all tournaments"""
-        results = db.session.query(
-            Tournament.id,
-            Tournament.question,
-            Tournament.created_at,
-            func.count(func.distinct(UserTournament.id)).label('total_participants'),
-            func.count(func.distinct(case((UserTournament.completed == True, UserTournament.id)))).label('completed_participants'),
-            func.count(func.distinct(TournamentPrompt.id)).label('num_prompts')
-        ).select_from(Tournament).outerjoin(
-            UserTournament, UserTournament.tournament_id == Tournament.id
-        ).outerjoin(
-            TournamentPrompt, TournamentPrompt.tournament_id == Tournament.id
-        ).group_by(
-            Tournament.id, Tournament.question, Tournament.created_at
-        ).order_by(Tournament.created_at.desc()).all()
+        results = get_repository().tournament_summaries()
         
         tournaments = []
         for tournament in results:
@@ -270,3 +421,11 @@ class TournamentService:
             })
         
         return tournaments
+
+    @staticmethod
+    @read_only
+    def search_tournaments(query, page=1, per_page=20):
+        """Full-text search over questions, prompts and responses, ranked and paginated"""
+        return get_repository().search_tournaments(
+            query, page, per_page, TournamentService.SEARCH_MATCHES_PER_TOURNAMENT
+        )
@@ -1,10 +1,13 @@
 import math
 import random
-from typing import List, Dict
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-def create_bracket(prompt_data_list: List[Dict[str, str]]) -> List[List[Dict]]:
-    """Create tournament bracket"""
-    num_prompts = len(prompt_data_list)
+# Placeholder for a match without a winner in compactly stored brackets; -1 already means a bye
+UNDECIDED = -32768
+
+def create_seeding(num_prompts: int) -> List[int]:
+    """Shuffled first-round slots with byes spread evenly, -1 for a bye"""
     if num_prompts < 2:
         raise ValueError("At least 2 prompts required")
 
@@ -27,8 +30,10 @@ def create_bracket(prompt_data_list: List[Dict[str, str]]) -> List[List[Dict]]:
             participants.append(-1)  # Bye
         else:
             participants.append(next(prompt_iter))
+    return participants
 
-    # Build rounds
+def bracket_from_seeding(participants: List[int]) -> List[List[Dict]]:
+    """Build the bracket rounds from first-round slots, advancing byes"""
     bracket = []
     current_round = participants
     while len(current_round) > 1:
@@ -51,3 +56,76 @@ def create_bracket(prompt_data_list: List[Dict[str, str]]) -> List[List[Dict]]:
         current_round = next_round
 
     return bracket
+
+def create_bracket(prompt_data_list: List[Dict[str, str]]) -> List[List[Dict]]:
+    """Create tournament bracket"""
+    return bracket_from_seeding(create_seeding(len(prompt_data_list)))
+
+def encode_seeding(participants: List[int]) -> bytes:
+    """Pack first-round slots as little-endian int16s"""
+    return struct.pack(f'<{len(participants)}h', *participants)
+
+def decode_seeding(encoded: bytes) -> List[int]:
+    return list(struct.unpack(f'<{len(encoded) // 2}h', encoded))
+
+def is_match_votable(match: Dict) -> bool:
+    """Check whether a match has two real participants and no winner yet"""
+    p1 = match.get('participant1')
+    p2 = match.get('participant2')
+    return (p1 is not None and p1 != -1 and
+            p2 is not None and p2 != -1 and
+            match.get('winner') is None)
+
+def iter_votable_matches(bracket: List[List[Dict]]) -> Iterator[Tuple[int, int]]:
+    """Yield every (round, match) ready for voting, in bracket order"""
+    for round_num, round_matches in enumerate(bracket or []):
+        for match_num, match in enumerate(round_matches):
+            if is_match_votable(match):
+                yield round_num, match_num
+
+def find_next_votable_match(bracket: List[List[Dict]]) -> Optional[Tuple[int, int]]:
+    """Find the first (round, match) in bracket order that is ready for voting"""
+    return next(iter_votable_matches(bracket), None)
+
+def diff_brackets(old_bracket: List[List[Dict]], new_bracket: List[List[Dict]]) -> List[Dict[str, Any]]:
+    """Build JSON-patch style replace operations turning old_bracket into new_bracket"""
+    operations = []
+    for round_num, round_matches in enumerate(new_bracket):
+        old_round = old_bracket[round_num] if round_num < len(old_bracket) else []
+        for match_num, match in enumerate(round_matches):
+            old_match = old_round[match_num] if match_num < len(old_round) else None
+            if old_match is None:
+                operations.append({'op': 'add', 'path': f'/{round_num}/{match_num}', 'value': match})
+                continue
+            for key, value in match.items():
+                if old_match.get(key) != value:
+                    operations.append({'op': 'replace', 'path': f'/{round_num}/{match_num}/{key}', 'value': value})
+    return operations
+
+def encode_bracket_winners(bracket: List[List[Dict]], partial: bool = False) -> bytes:
+    """Pack a bracket's winners in (round, match) order as little-endian int16s.
+
+    Brackets still in progress need partial=True, which stores UNDECIDED for open matches.
+    """
+    winners = [match['winner'] for round_matches in bracket for match in round_matches]
+    if partial:
+        winners = [UNDECIDED if winner is None else winner for winner in winners]
+    elif any(winner is None for winner in winners):
+        raise ValueError("Only fully decided brackets can be encoded")
+    return struct.pack(f'<{len(winners)}h', *winners)
+
+def decode_bracket_winners(template: List[List[Dict]], encoded: bytes) -> List[List[Dict]]:
+    """Rebuild a bracket from its template and encode_bracket_winners output"""
+    winners = iter(struct.unpack(f'<{len(encoded) // 2}h', encoded))
+    # Matches are flat dicts, so a shallow copy per match is enough and far cheaper than deepcopy
+    bracket = [[dict(match) for match in round_matches] for round_matches in template]
+    for round_num, round_matches in enumerate(bracket):
+        for match_num, match in enumerate(round_matches):
+            winner = next(winners)
+            if winner == UNDECIDED:
+                continue
+            match['winner'] = winner
+            if round_num + 1 < len(bracket):
+                slot = 'participant1' if match_num % 2 == 0 else 'participant2'
+                bracket[round_num + 1][match_num // 2][slot] = match['winner']
+    return bracket
@@ -0,0 +1,55 @@
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+def time_calls(fn: Callable[[], object], iterations: int, warmup: int = 10) -> List[float]:
+    """Call fn repeatedly and return per-call wall times in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Summarize millisecond timings into mean and percentiles"""
+    ordered = sorted(timings)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        'p50_ms': round(percentile(0.50), 4),
+        'p95_ms': round(percentile(0.95), 4),
+        'p99_ms': round(percentile(0.99), 4),
+        'max_ms': round(ordered[-1], 4)
+    }
+
+def git_commit() -> str:
+    """Current git commit, so saved results can be compared across commits"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def save_results(path: str, benchmark: str, results: Dict) -> None:
+    """Write benchmark results as JSON tagged with the current commit"""
+    with open(path, 'w') as f:
+        json.dump({
+            'benchmark': benchmark,
+            'commit': git_commit(),
+            'recorded_at': datetime.utcnow().isoformat(),
+            'results': results
+        }, f, indent=2)
+
+def print_table(rows: List[Dict], columns: List[str]) -> None:
+    """Print result rows as an aligned text table"""
+    widths = {c: max(len(c), *(len(str(r.get(c, ''))) for r in rows)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print('  '.join(str(row.get(c, '')).ljust(widths[c]) for c in columns))
@@ -0,0 +1,58 @@
+"""Tournament creation latency against a heavy-tailed upstream, with and without hedging.
+
+Each creation is ``--prompts`` concurrent completions from the local fake provider,
+which answers in ``--latency`` seconds except for ``--slow-rate`` of requests that
+take ``--slow-latency``. Creation waits for the slowest, so a rare slow request
+sets the tail. Hedged runs first warm up the per-model latency windows. Extra
+requests is the share of requests that were hedges. No database needed. Run from
+``backend/``:
+
+    python -m benchmarks.hedging --creations 200 --slow-rate 0.02 --output hedging.json
+"""
+import argparse
+from benchmarks.common import print_table, save_results, summarize, time_calls
+from app.clients.fake_provider import serve_in_thread
+from app.clients.hedging import HedgePolicy
+from app.clients.open_router import OpenRouterClient
+
+MODEL = "meta-llama/llama-3.1-8b-instruct:free"
+
+def run(creations, prompts, percentile, max_ratio, latency, slow_rate, slow_latency):
+    url, stop = serve_in_thread(latency=latency, slow_rate=slow_rate, slow_latency=slow_latency)
+    calls = [(MODEL, f"Prompt {i}", "Question?") for i in range(prompts)]
+    rows = []
+    try:
+        for mode in ('off', 'on'):
+            client = OpenRouterClient()
+            client.base_url = url
+            if mode == 'on':
+                client.hedging = HedgePolicy(percentile=percentile, min_delay=0.0, max_ratio=max_ratio)
+            timings = time_calls(lambda: client.complete_all(calls, concurrency=prompts), creations, warmup=5)
+            requests = client.usage().calls
+            row = {'hedging': mode, **summarize(timings)}
+            row['extra_requests'] = f"{(requests / ((creations + 5) * prompts) - 1) * 100:.1f}%"
+            rows.append(row)
+    finally:
+        stop()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--creations', type=int, default=200)
+    parser.add_argument('--prompts', type=int, default=16, help="Completions per creation")
+    parser.add_argument('--percentile', type=float, default=95, help="Hedge after this latency percentile")
+    parser.add_argument('--max-ratio', type=float, default=0.1, help="Cap on hedges as a fraction of requests")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds per usual completion")
+    parser.add_argument('--slow-rate', type=float, default=0.02, help="Fraction of completions that are slow")
+    parser.add_argument('--slow-latency', type=float, default=1.0, help="Seconds per slow completion")
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = run(args.creations, args.prompts, args.percentile, args.max_ratio,
+               args.latency, args.slow_rate, args.slow_latency)
+    print_table(rows, ['hedging', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'extra_requests'])
+    if args.output:
+        save_results(args.output, 'hedging', rows)
+
+if __name__ == '__main__':
+    main()
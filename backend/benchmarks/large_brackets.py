@@ -0,0 +1,81 @@
+"""Per-user bracket storage and vote cost for large brackets, JSONB against compact.
+
+``jsonb`` stores the whole dict bracket per user, as tournaments up to
+EAGER_RESPONSE_LIMIT prompts do; ``compact`` stores the int16 seeding once per
+tournament and int16 winners per user. Vote cost covers loading the bracket,
+deciding a first-round match and encoding it for storage. Pure Python, no
+database needed. Run from ``backend/``:
+
+    python -m benchmarks.large_brackets --sizes 16 64 256 1024 --output large_brackets.json
+"""
+import argparse
+import copy
+import json
+from benchmarks.common import time_calls, summarize, save_results, print_table
+from app.utils import (
+    bracket_from_seeding, create_seeding, decode_bracket_winners, decode_seeding,
+    encode_bracket_winners, encode_seeding, find_next_votable_match
+)
+
+def _half_played(template):
+    """A bracket with half of its first-round matches decided"""
+    bracket = copy.deepcopy(template)
+    for _ in range(len(bracket[0]) // 2):
+        round_num, match_num = find_next_votable_match(bracket)
+        match = bracket[round_num][match_num]
+        match['winner'] = match['participant1']
+        bracket[round_num + 1][match_num // 2]['participant1' if match_num % 2 == 0 else 'participant2'] = match['winner']
+    return bracket
+
+def _vote(bracket):
+    round_num, match_num = find_next_votable_match(bracket)
+    bracket[round_num][match_num]['winner'] = bracket[round_num][match_num]['participant1']
+
+def run(sizes, iterations):
+    rows = []
+    for size in sizes:
+        seeding = create_seeding(size)
+        encoded_seeding = encode_seeding(seeding)
+        template = bracket_from_seeding(seeding)
+        bracket = _half_played(template)
+        stored_json = json.dumps(bracket)
+        stored_winners = encode_bracket_winners(bracket, partial=True)
+
+        def jsonb_vote():
+            loaded = json.loads(stored_json)
+            _vote(loaded)
+            return json.dumps(loaded)
+
+        def compact_vote():
+            loaded = decode_bracket_winners(bracket_from_seeding(decode_seeding(encoded_seeding)), stored_winners)
+            _vote(loaded)
+            return encode_bracket_winners(loaded, partial=True)
+
+        for layout, user_bytes, vote in (('jsonb', len(stored_json), jsonb_vote),
+                                          ('compact', len(stored_winners), compact_vote)):
+            timings = summarize(time_calls(vote, iterations))
+            rows.append({
+                'prompts': size,
+                'layout': layout,
+                'bytes_per_user': user_bytes,
+                'tournament_bytes': len(json.dumps(template)) if layout == 'jsonb' else len(encoded_seeding),
+                'vote_p50_ms': timings['p50_ms'],
+                'vote_p95_ms': timings['p95_ms'],
+                'vote': timings
+            })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 64, 256, 1024])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.iterations)
+    print_table(rows, ['prompts', 'layout', 'bytes_per_user', 'tournament_bytes', 'vote_p50_ms', 'vote_p95_ms'])
+    if args.output:
+        save_results(args.output, 'large_brackets', rows)
+
+if __name__ == '__main__':
+    main()
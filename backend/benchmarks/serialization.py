@@ -0,0 +1,123 @@
+"""Micro-benchmark of request parsing and response encoding per endpoint.
+
+Compares the previous path (``Model(**request.get_json())`` and
+``jsonify(model.dict())``) with the current one (``model_validate_json`` and
+``model_dump_json``). Run from ``backend/``:
+
+    python -m benchmarks.serialization --iterations 2000 --output serialization.json
+"""
+import argparse
+from flask import Flask, json, jsonify
+from app.core.serialization import json_response
+from app.schemas import (
+    CreateTournamentRequest, VoteRequest, TournamentResponse,
+    TournamentWithResultsResponse, TournamentListResponse,
+    VoteResponse, VoteDeltaResponse
+)
+from app.utils import create_bracket
+from benchmarks.common import time_calls, summarize, save_results, print_table
+
+NUM_PROMPTS = 16
+RESPONSE_LENGTH = 2000
+
+def _tournament_payload():
+    bracket = create_bracket([{}] * NUM_PROMPTS)
+    return {
+        'id': 1,
+        'question': "Explain the trade-offs between consistency and availability.",
+        'prompts': [f"You are assistant number {i}. Answer precisely." for i in range(NUM_PROMPTS)],
+        'responses': [("Response text " * (RESPONSE_LENGTH // 14))[:RESPONSE_LENGTH] for _ in range(NUM_PROMPTS)],
+        'models': ["meta-llama/llama-3.1-8b-instruct:free"] * NUM_PROMPTS,
+        'bracket_template': bracket,
+        'user_bracket': bracket,
+        'user_state': {'completed': False, 'winner_prompt_index': None, 'next_match': (0, 0)}
+    }
+
+def _results_payload():
+    payload = _tournament_payload()
+    payload['rankings'] = [
+        {'prompt': p, 'prompt_index': i, 'model': m, 'win_count': i, 'win_percentage': 6.25}
+        for i, (p, m) in enumerate(zip(payload['prompts'], payload['models']))
+    ]
+    payload['stats'] = {'total_participants': 100, 'completed_participants': 80, 'completion_rate': 80.0}
+    return payload
+
+def _list_payload():
+    return {'tournaments': [
+        {
+            'id': i,
+            'question': f"Tournament question number {i}?",
+            'num_prompts': 8,
+            'created_at': '2024-01-01T00:00:00',
+            'total_participants': 25,
+            'completed_participants': 20,
+            'completion_rate': 80.0
+        } for i in range(200)
+    ]}
+
+def _vote_payload():
+    return {'user_bracket': create_bracket([{}] * NUM_PROMPTS), 'completed': False,
+            'winner_prompt_index': None, 'user_id': 'benchmark-user'}
+
+def _vote_delta_payload():
+    participant = {'index': 0, 'prompt': "Prompt", 'response': "Response text " * 140, 'model': "test-model"}
+    return {
+        'patch': [
+            {'op': 'replace', 'path': '/0/0/winner', 'value': 0},
+            {'op': 'replace', 'path': '/1/0/participant1', 'value': 0}
+        ],
+        'next_match': {'round': 0, 'match': 1, 'participant1': participant,
+                       'participant2': dict(participant, index=1)},
+        'completed': False,
+        'winner_prompt_index': None,
+        'user_id': 'benchmark-user'
+    }
+
+RESPONSE_CASES = {
+    'GET /tournaments': (TournamentListResponse, _list_payload),
+    'GET /tournaments/<id>': (TournamentResponse, _tournament_payload),
+    'GET /tournaments/<id>?include_results': (TournamentWithResultsResponse, _results_payload),
+    'POST /tournaments/<id>/vote': (VoteResponse, _vote_payload),
+    'POST /tournaments/<id>/vote?delta': (VoteDeltaResponse, _vote_delta_payload),
+}
+
+REQUEST_CASES = {
+    'POST /tournaments (body)': (CreateTournamentRequest, lambda: {
+        'question': "Which answer is best?",
+        'prompts': [{'text': f"Prompt variant {i}", 'model': "test-model"} for i in range(NUM_PROMPTS)]
+    }),
+    'POST /tournaments/<id>/vote (body)': (VoteRequest, lambda: {'round': 0, 'match': 3, 'winner': 6}),
+}
+
+def run(iterations):
+    app = Flask(__name__)
+    rows = []
+    with app.app_context():
+        for name, (model_class, build) in RESPONSE_CASES.items():
+            data = build()
+            legacy = summarize(time_calls(lambda: jsonify(model_class(**data).model_dump()).get_data(), iterations))
+            fast = summarize(time_calls(lambda: json_response(model_class(**data)).get_data(), iterations))
+            rows.append({'endpoint': name, 'legacy_p50_ms': legacy['p50_ms'], 'fast_p50_ms': fast['p50_ms'],
+                         'speedup': round(legacy['p50_ms'] / fast['p50_ms'], 2), 'legacy': legacy, 'fast': fast})
+
+        for name, (model_class, build) in REQUEST_CASES.items():
+            raw = json.dumps(build()).encode()
+            legacy = summarize(time_calls(lambda: model_class(**json.loads(raw)), iterations))
+            fast = summarize(time_calls(lambda: model_class.model_validate_json(raw), iterations))
+            rows.append({'endpoint': name, 'legacy_p50_ms': legacy['p50_ms'], 'fast_p50_ms': fast['p50_ms'],
+                         'speedup': round(legacy['p50_ms'] / fast['p50_ms'], 2), 'legacy': legacy, 'fast': fast})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = run(args.iterations)
+    print_table(rows, ['endpoint', 'legacy_p50_ms', 'fast_p50_ms', 'speedup'])
+    if args.output:
+        save_results(args.output, 'serialization', rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Latency and SQL statements per call of the hot service-layer operations.
+
+Runs against whatever is in DATABASE_URL, normally a dataset loaded with
+``python -m benchmarks.synthetic``. The session is cleared before every call so
+ORM caching does not hide queries. ``record_vote`` plays new users through random
+tournaments and leaves their votes behind. Run from ``backend/``:
+
+    python -m benchmarks.synthetic --scale medium
+    python -m benchmarks.service_layer --iterations 200 --output service_layer.json
+    python -m benchmarks.service_layer --baseline service_layer.json
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from benchmarks.common import summarize, save_results, print_table
+from benchmarks.synthetic import PROMPTS_PER_TOURNAMENT, dataset_counts
+
+SAMPLE_SIZE = 1000
+# Whole-table aggregates get fewer iterations than point lookups
+ITERATION_SCALE = {'get_tournaments_list': 0.1}
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(Engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+def _operations(db, tournament_ids, in_progress_ids):
+    from app.models import Tournament, UserTournament
+    from app.services.tournaments import TournamentService
+    from app.utils import create_bracket, find_next_votable_match
+
+    prompts = [{}] * PROMPTS_PER_TOURNAMENT
+    player = {'bracket': None}
+
+    def record_vote():
+        if player['bracket'] is None or find_next_votable_match(player['bracket']) is None:
+            player.update(tournament_id=random.choice(tournament_ids), user_id=f"benchmark-{uuid.uuid4().hex}", bracket=None)
+        tournament = db.session.get(Tournament, player['tournament_id'])
+        bracket = player['bracket'] or tournament.bracket_template
+        round_number, match_number = find_next_votable_match(bracket)
+        winner = bracket[round_number][match_number]['participant1']
+        player['bracket'], _, _ = TournamentService.record_vote(
+            tournament, player['user_id'], round_number, match_number, winner
+        )
+
+    return {
+        'create_bracket': lambda: create_bracket(prompts),
+        'record_vote': record_vote,
+        'get_next_votable_match': lambda: db.session.get(UserTournament, random.choice(in_progress_ids)).get_next_votable_match(),
+        'get_prompt_rankings': lambda: TournamentService.get_prompt_rankings(random.choice(tournament_ids)),
+        'get_participation_stats': lambda: TournamentService.get_participation_stats(random.choice(tournament_ids)),
+        'get_tournaments_list': TournamentService.get_tournaments_list,
+    }
+
+def measure(db, counter, name, call, iterations, warmup=5):
+    for _ in range(warmup):
+        call()
+        db.session.remove()
+
+    timings, statements = [], []
+    for _ in range(iterations):
+        before = counter.count
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+        statements.append(counter.count - before)
+        db.session.remove()
+
+    latency = summarize(timings)
+    return {
+        'operation': name,
+        'calls': iterations,
+        'p50_ms': latency['p50_ms'],
+        'p95_ms': latency['p95_ms'],
+        'p99_ms': latency['p99_ms'],
+        'queries_per_call': round(statistics.fmean(statements), 2),
+        'latency': latency
+    }
+
+def run(iterations, operations=None):
+    from app import create_app, db
+    from app.models import Tournament, UserTournament
+
+    app = create_app()
+    counter = StatementCounter()
+    with app.app_context():
+        tournament_ids = db.session.scalars(select(Tournament.id).limit(SAMPLE_SIZE)).all()
+        in_progress_ids = db.session.scalars(
+            select(UserTournament.id).where(UserTournament.completed == False).limit(SAMPLE_SIZE)
+        ).all()
+        if not tournament_ids or not in_progress_ids:
+            raise SystemExit("No data to benchmark, load some with python -m benchmarks.synthetic")
+
+        calls = _operations(db, tournament_ids, in_progress_ids)
+        rows = [
+            measure(db, counter, name, calls[name], max(1, int(iterations * ITERATION_SCALE.get(name, 1))))
+            for name in operations or calls
+        ]
+        counts = dataset_counts(db)
+    return counts, rows
+
+def compare(rows, baseline_path):
+    """Add the p50 change against a previously saved run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {row['operation']: row for row in baseline['results']['rows']}
+    for row in rows:
+        before = previous.get(row['operation'])
+        if before and before['p50_ms']:
+            row['p50_change'] = f"{(row['p50_ms'] / before['p50_ms'] - 1) * 100:+.1f}%"
+            row['baseline_commit'] = baseline['commit']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--operations', nargs='+', help="Only run these operations")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--baseline', help="Earlier --output file to compare against")
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    counts, rows = run(args.iterations, args.operations)
+    columns = ['operation', 'calls', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_call']
+    if args.baseline:
+        compare(rows, args.baseline)
+        columns += ['p50_change', 'baseline_commit']
+    print(f"dataset: {counts}")
+    print_table(rows, columns)
+    if args.output:
+        save_results(args.output, 'service_layer', {'dataset': counts, 'iterations': args.iterations, 'rows': rows})
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Cold start time of the app, with and without schema setup on boot.
+
+Every sample runs in a fresh interpreter so imports are not cached, and counts
+the SQL statements issued while booting. ``app+schema`` reproduces the old boot
+path that ran ``db.create_all()`` inside ``create_app``. Run from ``backend/``:
+
+    python -m benchmarks.startup --runs 10 --output startup.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+from benchmarks.common import summarize, save_results, print_table
+
+MODES = ('app', 'app+schema')
+
+SAMPLE = """
+import json, time
+start = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, 'before_cursor_execute', lambda *args: statements.append(1))
+from app import create_app, db
+imported = time.perf_counter()
+app = create_app()
+if {create_schema}:
+    with app.app_context():
+        db.create_all()
+booted = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (booted - imported) * 1000,
+    'total_ms': (booted - start) * 1000,
+    'statements': len(statements)
+}}))
+"""
+
+def _sample(mode):
+    code = SAMPLE.format(create_schema=mode == 'app+schema')
+    output = subprocess.check_output([sys.executable, '-c', code], text=True, stderr=subprocess.DEVNULL)
+    return json.loads(output.strip().splitlines()[-1])
+
+def run(runs):
+    rows = []
+    for mode in MODES:
+        samples = [_sample(mode) for _ in range(runs)]
+        total = summarize([s['total_ms'] for s in samples])
+        rows.append({
+            'mode': mode,
+            'import_p50_ms': summarize([s['import_ms'] for s in samples])['p50_ms'],
+            'create_app_p50_ms': summarize([s['create_app_ms'] for s in samples])['p50_ms'],
+            'total_p50_ms': total['p50_ms'],
+            'total_p95_ms': total['p95_ms'],
+            'sql_statements': samples[-1]['statements'],
+            'total': total
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = run(args.runs)
+    print_table(rows, ['mode', 'import_p50_ms', 'create_app_p50_ms', 'total_p50_ms', 'total_p95_ms', 'sql_statements'])
+    if args.output:
+        save_results(args.output, 'startup', rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Generate a synthetic tournament dataset for the service-layer benchmarks.
+
+Rows are produced by ``generate_series`` inside Postgres so even the large scale
+loads in minutes. About 60% of brackets are completed with every vote cast, the
+rest stop part way. All tables are dropped and recreated first, so point
+DATABASE_URL at a scratch database. Run from ``backend/``:
+
+    python -m benchmarks.synthetic --scale large
+"""
+import argparse
+import time
+from sqlalchemy import text
+from app.utils import create_bracket
+
+PROMPTS_PER_TOURNAMENT = 16
+COMPLETED_PER_TEN = 6
+MODEL = "meta-llama/llama-3.1-8b-instruct:free"
+RESPONSE = "Synthetic response text. " * 40
+
+# (tournaments, user brackets); votes follow at roughly 12 per bracket
+SCALES = {
+    'small': (100, 10_000),
+    'medium': (1_000, 100_000),
+    'large': (10_000, 1_000_000),
+}
+
+def _decided(bracket):
+    """Play a bracket through with participant1 always winning"""
+    decided = [[dict(match) for match in round_matches] for round_matches in bracket]
+    for round_num, round_matches in enumerate(decided):
+        for match_num, match in enumerate(round_matches):
+            if match['winner'] is None:
+                match['winner'] = match['participant1']
+            if round_num + 1 < len(decided):
+                slot = 'participant1' if match_num % 2 == 0 else 'participant2'
+                decided[round_num + 1][match_num // 2][slot] = match['winner']
+    return decided
+
+def generate(db, tournaments, brackets, chunk_size=100_000, log=print):
+    """Drop, recreate and fill the schema; returns row counts"""
+    from app.core.serialization import dumps
+    from app.services.archival import ArchivalService
+    from flask import current_app
+
+    template = create_bracket([{}] * PROMPTS_PER_TOURNAMENT)
+    matches = [(r, m) for r, round_matches in enumerate(template) for m in range(len(round_matches))]
+    params = {
+        'template': dumps(template).decode(),
+        'decided': dumps(_decided(template)).decode(),
+        'prompts': PROMPTS_PER_TOURNAMENT,
+        'model': MODEL,
+        'response': RESPONSE,
+        'tournaments': tournaments,
+        'total_votes': len(matches),
+        'rounds': [r for r, _ in matches],
+        'matches': [m for _, m in matches],
+    }
+
+    db.drop_all()
+    db.create_all()
+    start = time.perf_counter()
+    db.session.execute(text(
+        "INSERT INTO tournament (question, bracket_template, created_at) "
+        "SELECT 'Synthetic question ' || i || '?', CAST(:template AS jsonb), now() - i * interval '1 minute' "
+        "FROM generate_series(1, :tournaments) i"
+    ), params)
+    db.session.execute(text(
+        "INSERT INTO tournament_prompt (tournament_id, position, text, model, response, created_at) "
+        "SELECT t.id, p, 'Synthetic prompt ' || p || ' for tournament ' || t.id, :model, :response, t.created_at "
+        "FROM tournament t CROSS JOIN generate_series(0, :prompts - 1) p"
+    ), params)
+    db.session.commit()
+    log(f"tournaments and prompts: {time.perf_counter() - start:.1f}s")
+
+    ArchivalService.ensure_vote_partitions(current_app.config['VOTE_PARTITION_SIZE'],
+                                           brackets // current_app.config['VOTE_PARTITION_SIZE'] + 1)
+    for lower in range(1, brackets + 1, chunk_size):
+        upper = min(lower + chunk_size, brackets + 1)
+        db.session.execute(text(
+            "INSERT INTO user_tournament (tournament_id, user_id, current_bracket, completed, "
+            "winner_prompt_index, started_at, completed_at) "
+            "SELECT i % :tournaments + 1, 'synthetic-' || i, "
+            "CAST(CASE WHEN i % 10 < :completed THEN :decided ELSE :template END AS jsonb), "
+            "i % 10 < :completed, CASE WHEN i % 10 < :completed THEN i * 7919 % :prompts END, "
+            "now() - interval '1 day', CASE WHEN i % 10 < :completed THEN now() END "
+            "FROM generate_series(:lower, :upper - 1) i"
+        ), dict(params, lower=lower, upper=upper, completed=COMPLETED_PER_TEN))
+        db.session.execute(text(
+            "INSERT INTO vote (user_tournament_id, round_number, match_number, winner_index, created_at) "
+            "SELECT ut.id, m.round_number, m.match_number, 0, ut.started_at + m.ordinal * interval '10 seconds' "
+            "FROM user_tournament ut CROSS JOIN unnest(CAST(:rounds AS smallint[]), CAST(:matches AS smallint[])) "
+            "WITH ORDINALITY AS m(round_number, match_number, ordinal) "
+            "WHERE ut.id >= :lower AND ut.id < :upper "
+            "AND m.ordinal <= CASE WHEN ut.completed THEN :total_votes ELSE ut.id % :total_votes END"
+        ), dict(params, lower=lower, upper=upper))
+        db.session.commit()
+        log(f"brackets {upper - 1}/{brackets}: {time.perf_counter() - start:.1f}s")
+
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    return dataset_counts(db)
+
+def dataset_counts(db):
+    """Approximate row counts from planner statistics, cheap even at 10M votes"""
+    rows = db.session.execute(text(
+        "SELECT c.relname, sum(coalesce(nullif(p.reltuples, -1), 0))::bigint FROM pg_class c "
+        "LEFT JOIN pg_inherits i ON i.inhparent = c.oid "
+        "JOIN pg_class p ON p.oid = coalesce(i.inhrelid, c.oid) "
+        "WHERE c.relname IN ('tournament', 'tournament_prompt', 'user_tournament', 'vote') "
+        "AND c.relnamespace = CAST('public' AS regnamespace) GROUP BY c.relname"
+    )).all()
+    return {name: int(count) for name, count in rows}
+
+def main():
+    from app import create_app, db
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--tournaments', type=int, help="Override the scale's tournament count")
+    parser.add_argument('--brackets', type=int, help="Override the scale's user bracket count")
+    args = parser.parse_args()
+
+    tournaments, brackets = SCALES[args.scale]
+    app = create_app()
+    with app.app_context():
+        counts = generate(db, args.tournaments or tournaments, args.brackets or brackets)
+    print(counts)
+
+if __name__ == '__main__':
+    main()
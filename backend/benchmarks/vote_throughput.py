@@ -0,0 +1,180 @@
+"""Vote throughput with and without concurrent tournament creations per server mode.
+
+Each server runs in its own process with LLM generation replaced by a fixed
+sleep, so creations hold a request open the way a slow model does. Voters
+play through brackets as new users while creators keep posting tournaments.
+Run from ``backend/`` against a scratch database:
+
+    python -m benchmarks.vote_throughput --duration 10 --output vote_throughput.json
+"""
+import argparse
+import copy
+import multiprocessing
+import threading
+import time
+import requests
+from benchmarks.common import summarize, save_results, print_table
+
+SERVERS = ('werkzeug', 'werkzeug-threaded', 'gunicorn')
+NUM_PROMPTS = 8
+MODEL = "meta-llama/llama-3.1-8b-instruct:free"
+
+def _prompts():
+    return [{'text': f"Benchmark prompt {i}", 'model': MODEL} for i in range(NUM_PROMPTS)]
+
+def _build_app(llm_delay):
+    from app import create_app
+    from app.clients.open_router import get_openrouter_client
+
+    def generate_completions(prompts_data, question):
+        time.sleep(llm_delay)
+        return [f"Benchmark response {i}" for i in range(len(prompts_data))]
+
+    get_openrouter_client().generate_completions = generate_completions
+    return create_app()
+
+def _serve(server, port, llm_delay, workers, threads):
+    if server == 'gunicorn':
+        from gunicorn.app.base import BaseApplication
+        import gunicorn_config
+        app = _build_app(llm_delay)
+
+        class BenchmarkApplication(BaseApplication):
+            def load_config(self):
+                for key in ('worker_class', 'preload_app', 'timeout', 'keepalive', 'post_fork', 'child_exit'):
+                    self.cfg.set(key, getattr(gunicorn_config, key))
+                self.cfg.set('bind', f"127.0.0.1:{port}")
+                self.cfg.set('workers', workers)
+                self.cfg.set('threads', threads)
+
+            def load(self):
+                return app
+
+        BenchmarkApplication().run()
+    else:
+        from werkzeug.serving import make_server
+        app = _build_app(llm_delay)
+        make_server('127.0.0.1', port, app, threaded=server == 'werkzeug-threaded').serve_forever()
+
+def _wait_until_ready(base_url, tournament_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/api/tournaments/{tournament_id}/content", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+def _voter(base_url, tournament_id, template, stop, latencies, errors):
+    from app.utils import find_next_votable_match
+
+    while not stop.is_set():
+        # A fresh session is a new user with an untouched bracket
+        with requests.Session() as http:
+            bracket = copy.deepcopy(template)
+            while not stop.is_set():
+                next_match = find_next_votable_match(bracket)
+                if next_match is None:
+                    break
+                round_number, match_number = next_match
+                winner = bracket[round_number][match_number]['participant1']
+                start = time.perf_counter()
+                response = http.post(
+                    f"{base_url}/api/tournaments/{tournament_id}/vote",
+                    json={'round': round_number, 'match': match_number, 'winner': winner},
+                    timeout=60
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+                if not response.ok:
+                    errors.append(response.status_code)
+                    break
+                bracket = response.json()['user_bracket']
+
+def _creator(base_url, stop, created, errors):
+    while not stop.is_set():
+        response = requests.post(
+            f"{base_url}/api/tournaments",
+            json={'question': "Benchmark question?", 'prompts': _prompts()},
+            timeout=300
+        )
+        if response.ok:
+            created.append(response.json()['id'])
+        else:
+            errors.append(response.status_code)
+
+def _run_phase(base_url, tournament_id, template, voters, creators, duration):
+    stop = threading.Event()
+    latencies, created, errors = [], [], []
+    threads = [
+        threading.Thread(target=_voter, args=(base_url, tournament_id, template, stop, latencies, errors))
+        for _ in range(voters)
+    ] + [
+        threading.Thread(target=_creator, args=(base_url, stop, created, errors))
+        for _ in range(creators)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    row = {'votes_per_s': round(len(latencies) / duration, 1), 'creations': len(created), 'errors': len(errors)}
+    if latencies:
+        row.update(summarize(latencies))
+    return row
+
+def _create_fixture_tournament():
+    from app import db
+    from app.services.tournaments import TournamentService
+
+    app = _build_app(0)
+    with app.app_context():
+        db.create_all()
+        tournament = TournamentService.create_tournament("Benchmark fixture?", _prompts())
+        fixture = tournament.id, tournament.bracket_template
+        db.engine.dispose()
+    return fixture
+
+def run(servers, duration, voters, creators, llm_delay, workers, threads, port):
+    tournament_id, template = _create_fixture_tournament()
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for offset, server in enumerate(servers):
+        server_port = port + offset
+        base_url = f"http://127.0.0.1:{server_port}"
+        process = context.Process(target=_serve, args=(server, server_port, llm_delay, workers, threads), daemon=True)
+        process.start()
+        try:
+            _wait_until_ready(base_url, tournament_id)
+            for phase, phase_creators in (('votes only', 0), ('with creations', creators)):
+                row = _run_phase(base_url, tournament_id, template, voters, phase_creators, duration)
+                rows.append(dict(row, server=server, phase=phase))
+        finally:
+            process.terminate()
+            process.join(timeout=30)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per phase")
+    parser.add_argument('--voters', type=int, default=8)
+    parser.add_argument('--creators', type=int, default=4)
+    parser.add_argument('--llm-delay', type=float, default=2.0, help="Simulated generation time in seconds")
+    parser.add_argument('--workers', type=int, default=2, help="Gunicorn worker processes")
+    parser.add_argument('--threads', type=int, default=8, help="Gunicorn threads per worker")
+    parser.add_argument('--port', type=int, default=5100)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = run(args.servers, args.duration, args.voters, args.creators, args.llm_delay,
+               args.workers, args.threads, args.port)
+    print_table(rows, ['server', 'phase', 'votes_per_s', 'p50_ms', 'p95_ms', 'p99_ms', 'creations', 'errors'])
+    if args.output:
+        save_results(args.output, 'vote_throughput', {'settings': vars(args), 'rows': rows})
+
+if __name__ == '__main__':
+    main()
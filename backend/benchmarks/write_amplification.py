@@ -0,0 +1,140 @@
+"""Write amplification of the vote table before and after index consolidation.
+
+``legacy`` is the old layout: a surrogate id plus four indexes, two of them on the
+same columns as the unique constraint. ``consolidated`` is the current layout: the
+natural key as primary key, ix_vote_timeline, and range partitions by user
+tournament. Votes are inserted one per transaction, interleaved across brackets the
+way concurrent users vote, into a scratch schema of DATABASE_URL that is dropped
+afterwards. Run from ``backend/``:
+
+    python -m benchmarks.write_amplification --brackets 2000 --output write_amplification.json
+"""
+import argparse
+import os
+import random
+import time
+from sqlalchemy import create_engine, text
+from benchmarks.common import summarize, save_results, print_table
+
+SCHEMA = 'bench_write_amp'
+VOTES_PER_BRACKET = 15  # a 16 prompt bracket
+
+LAYOUTS = {
+    'legacy': [
+        """CREATE TABLE {schema}.vote (
+            id serial PRIMARY KEY,
+            user_tournament_id integer NOT NULL,
+            round_number smallint NOT NULL,
+            match_number smallint NOT NULL,
+            winner_index smallint NOT NULL,
+            created_at timestamp,
+            CONSTRAINT uq_vote_match UNIQUE (user_tournament_id, round_number, match_number))""",
+        "CREATE INDEX ix_vote_user_tournament_id ON {schema}.vote (user_tournament_id)",
+        "CREATE INDEX ix_vote_duplicate_check ON {schema}.vote (user_tournament_id, round_number, match_number)",
+        "CREATE INDEX ix_vote_timeline ON {schema}.vote (user_tournament_id, created_at)",
+    ],
+    'consolidated': [
+        """CREATE TABLE {schema}.vote (
+            user_tournament_id integer NOT NULL,
+            round_number smallint NOT NULL,
+            match_number smallint NOT NULL,
+            winner_index smallint NOT NULL,
+            created_at timestamp,
+            PRIMARY KEY (user_tournament_id, round_number, match_number)
+        ) PARTITION BY RANGE (user_tournament_id)""",
+        "CREATE INDEX ix_vote_timeline ON {schema}.vote (user_tournament_id, created_at)",
+        "CREATE TABLE {schema}.vote_default PARTITION OF {schema}.vote DEFAULT",
+    ],
+}
+
+SIZES = """
+SELECT coalesce(sum(pg_relation_size(c.oid)), 0), coalesce(sum(pg_indexes_size(c.oid)), 0),
+       coalesce(max((SELECT count(*) FROM pg_index i WHERE i.indrelid = c.oid)), 0)
+FROM pg_class c
+WHERE c.relkind = 'r' AND c.relnamespace = CAST(:schema AS regnamespace)
+"""
+
+def _workload(brackets):
+    """(user_tournament_id, round, match) in the order concurrent users would vote"""
+    pending = {bracket: 0 for bracket in range(1, brackets + 1)}
+    order = []
+    while pending:
+        bracket = random.choice(list(pending))
+        step = pending[bracket]
+        round_number = 0 if step < 8 else 1 if step < 12 else 2 if step < 14 else 3
+        first_in_round = (0, 8, 12, 14)[round_number]
+        order.append((bracket, round_number, step - first_in_round))
+        pending[bracket] += 1
+        if pending[bracket] == VOTES_PER_BRACKET:
+            del pending[bracket]
+    return order
+
+def run_layout(engine, layout, workload, partition_size):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        for statement in LAYOUTS[layout]:
+            conn.execute(text(statement.format(schema=SCHEMA)))
+        if layout == 'consolidated':
+            brackets = max(vote[0] for vote in workload)
+            for number in range(brackets // partition_size + 1):
+                conn.execute(text(
+                    f"CREATE TABLE {SCHEMA}.vote_p{number} PARTITION OF {SCHEMA}.vote "
+                    f"FOR VALUES FROM ({number * partition_size}) TO ({(number + 1) * partition_size})"
+                ))
+
+    insert = text(
+        f"INSERT INTO {SCHEMA}.vote (user_tournament_id, round_number, match_number, winner_index, created_at) "
+        "VALUES (:ut, :round, :match, 0, now())"
+    )
+    timings = []
+    with engine.connect() as conn:
+        wal_start = conn.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+        conn.commit()
+        for user_tournament_id, round_number, match_number in workload:
+            start = time.perf_counter()
+            conn.execute(insert, {'ut': user_tournament_id, 'round': round_number, 'match': match_number})
+            conn.commit()
+            timings.append((time.perf_counter() - start) * 1000)
+        wal_bytes = conn.execute(
+            text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:start AS pg_lsn))"), {'start': wal_start}
+        ).scalar()
+        table_bytes, index_bytes, indexes = conn.execute(text(SIZES), {'schema': SCHEMA}).one()
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        conn.commit()
+
+    votes = len(workload)
+    latency = summarize(timings)
+    return {
+        'layout': layout,
+        'votes': votes,
+        'indexes_per_table': int(indexes),
+        'insert_p50_ms': latency['p50_ms'],
+        'insert_p95_ms': latency['p95_ms'],
+        'wal_bytes_per_vote': round(float(wal_bytes) / votes),
+        'table_bytes_per_vote': round(table_bytes / votes),
+        'index_bytes_per_vote': round(index_bytes / votes),
+        'insert': latency
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--brackets', type=int, default=2000)
+    parser.add_argument('--partition-size', type=int, default=500, help="Brackets per partition")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    workload = _workload(args.brackets)
+    engine = create_engine(os.environ['DATABASE_URL'])
+    rows = [run_layout(engine, layout, workload, args.partition_size) for layout in LAYOUTS]
+    print_table(rows, [
+        'layout', 'votes', 'indexes_per_table', 'insert_p50_ms', 'insert_p95_ms',
+        'wal_bytes_per_vote', 'table_bytes_per_vote', 'index_bytes_per_vote'
+    ])
+    if args.output:
+        save_results(args.output, 'write_amplification', rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Gunicorn settings for production: ``gunicorn -c gunicorn_config.py run:app``
+
+Workers are preforked from a preloaded app and each runs a thread pool, so a
+request blocked on LLM generation only occupies one thread while votes keep
+being served by the others. An open results stream holds its thread for as long
+as the page is open, so each worker allows at most RESULTS_STREAM_MAX_PER_WORKER
+of them (half of SERVER_THREADS by default) and refuses the rest with a 503.
+Size workers x that cap to the number of results pages expected to be open at once.
+"""
+import os
+import shutil
+
+# Workers share metrics through files in this directory. It must be set before the
+# app package (and with it prometheus_client) is imported, and starts out empty.
+multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-metrics")
+shutil.rmtree(multiproc_dir, ignore_errors=True)
+os.makedirs(multiproc_dir)
+
+from app.config import Config
+
+bind = Config.SERVER_BIND
+# In-memory storage lives inside one process
+workers = 1 if Config.STORAGE_BACKEND == "memory" else Config.SERVER_WORKERS
+threads = Config.SERVER_THREADS
+worker_class = "gthread"
+preload_app = True
+# Tournament creation waits on every LLM response before returning
+timeout = Config.SERVER_TIMEOUT
+keepalive = Config.SERVER_KEEPALIVE
+max_requests = Config.SERVER_MAX_REQUESTS
+max_requests_jitter = Config.SERVER_MAX_REQUESTS // 10
+accesslog = "-"
+
+def post_fork(server, worker):
+    from app.core.database import reset_pool_after_fork
+    if Config.STORAGE_BACKEND == "postgres":
+        reset_pool_after_fork(server.app.wsgi())
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,10 @@
-from app import create_app
+from app import create_app, db
 
 app = create_app()
 
 if __name__ == "__main__":
+    # The development server sets up the schema itself; deployments run `flask --app run init-db`
+    if app.config["STORAGE_BACKEND"] == "postgres":
+        with app.app_context():
+            db.create_all()
     app.run(host="0.0.0.0", port=5000)
@@ -1,6 +1,32 @@
 import pytest
 import os
 from app import create_app, db
+from app.config import Config
+from app.core import results_cache
+from app.core.compression import payload_cache
+from app.repositories import create_repository, get_repository
+from app.services.scheduler import match_scheduler
+
+# STORAGE_BACKEND=memory runs the suite without Postgres; tests of Postgres itself are skipped
+BACKEND = Config.STORAGE_BACKEND
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: needs the Postgres storage backend")
+
+def pytest_collection_modifyitems(config, items):
+    if BACKEND == 'postgres':
+        return
+    skip = pytest.mark.skip(reason="needs the Postgres storage backend")
+    for item in items:
+        # Including the postgres case of tests parametrized over every backend
+        params = getattr(item, 'callspec', None)
+        if item.get_closest_marker('postgres') or (params and 'postgres' in params.params.values()):
+            item.add_marker(skip)
+
+def _clear_tournament_caches():
+    results_cache.clear()
+    payload_cache.clear()
+    match_scheduler.clear()
 
 @pytest.fixture(scope='session')
 def app():
@@ -10,9 +36,14 @@ def app():
     else:
         print("Running tests locally")
     
+    # Admission control is exercised on its own in test_core_admission.py
+    Config.ADMISSION_ENABLED = False
     app = create_app()
     
     with app.app_context():
+        if BACKEND != 'postgres':
+            yield app
+            return
         db.create_all()
         yield app
         
@@ -22,11 +53,21 @@ def app():
 @pytest.fixture(scope='function')
 def client(app):
     """Test client"""
+    results_cache.clear()
     return app.test_client()
 
 @pytest.fixture(scope='function')
 def db_session(app):
-    """Database session for testing with transaction rollback"""
+    """Database session for testing with transaction rollback; in memory mode, a fresh repository instead"""
+    if BACKEND != 'postgres':
+        # Ids restart with each repository, so nothing cached by tournament id may carry over
+        previous = app.extensions['repository']
+        app.extensions['repository'] = create_repository(BACKEND)
+        _clear_tournament_caches()
+        yield None
+        app.extensions['repository'] = previous
+        _clear_tournament_caches()
+        return
     with app.app_context():
         connection = db.engine.connect()
         transaction = connection.begin()
@@ -42,11 +83,9 @@ def db_session(app):
 @pytest.fixture
 def sample_tournament(db_session):
     """Create a sample tournament for testing"""
-    from app.models import Tournament, TournamentPrompt
-    
-    tournament = Tournament(
-        question="What's the best programming language?",
-        bracket_template=[
+    return get_repository().add_tournament(
+        "What's the best programming language?",
+        [
             [
                 {"participant1": 0, "participant2": 1, "winner": None},
                 {"participant1": 2, "participant2": 3, "winner": None}
@@ -54,55 +93,41 @@ def sample_tournament(db_session):
             [
                 {"participant1": None, "participant2": None, "winner": None}
             ]
+        ],
+        [
+            {
+                'position': 0,
+                'text': "Python is great",
+                'model': "meta-llama/llama-3.1-8b-instruct:free",
+                'response': "Python response"
+            },
+            {
+                'position': 1,
+                'text': "JavaScript rocks",
+                'model': "meta-llama/llama-3.1-8b-instruct:free",
+                'response': "JS response"
+            },
+            {
+                'position': 2,
+                'text': "Go is fast",
+                'model': "mistralai/mistral-7b-instruct:free",
+                'response': "Go response"
+            },
+            {
+                'position': 3,
+                'text': "Rust is safe",
+                'model': "google/gemma-2-9b-it:free",
+                'response': "Rust response"
+            }
         ]
     )
-    
-    db_session.add(tournament)
-    db_session.flush()
-    
-    prompts = [
-        TournamentPrompt(
-            tournament_id=tournament.id, 
-            position=0, 
-            text="Python is great", 
-            model="meta-llama/llama-3.1-8b-instruct:free",
-            response="Python response"
-        ),
-        TournamentPrompt(
-            tournament_id=tournament.id, 
-            position=1, 
-            text="JavaScript rocks", 
-            model="meta-llama/llama-3.1-8b-instruct:free",
-            response="JS response"
-        ),
-        TournamentPrompt(
-            tournament_id=tournament.id, 
-            position=2, 
-            text="Go is fast", 
-            model="mistralai/mistral-7b-instruct:free",
-            response="Go response"
-        ),
-        TournamentPrompt(
-            tournament_id=tournament.id, 
-            position=3, 
-            text="Rust is safe", 
-            model="google/gemma-2-9b-it:free",
-            response="Rust response"
-        )
-    ]
-    db_session.add_all(prompts)
-    db_session.commit()
-    
-    return tournament
 
 @pytest.fixture
 def sample_tournament_with_prompts(db_session):
     """Create a sample tournament with prompts for results testing"""
-    from app.models import Tournament, TournamentPrompt
-    
-    tournament = Tournament(
-        question="Best framework?",
-        bracket_template=[
+    return get_repository().add_tournament(
+        "Best framework?",
+        [
             [
                 {"participant1": 0, "participant2": 1, "winner": None},
                 {"participant1": 2, "participant2": 3, "winner": None}
@@ -110,44 +135,34 @@ def sample_tournament_with_prompts(db_session):
             [
                 {"participant1": None, "participant2": None, "winner": None}
             ]
+        ],
+        [
+            {
+                'position': 0,
+                'text': "React is awesome",
+                'model': "meta-llama/llama-3.1-8b-instruct:free",
+                'response': "React response"
+            },
+            {
+                'position': 1,
+                'text': "Vue is simple",
+                'model': "mistralai/mistral-7b-instruct:free",
+                'response': "Vue response"
+            },
+            {
+                'position': 2,
+                'text': "Angular is powerful",
+                'model': "google/gemma-2-9b-it:free",
+                'response': "Angular response"
+            },
+            {
+                'position': 3,
+                'text': "Svelte is fast",
+                'model': "microsoft/phi-3-mini-128k-instruct:free",
+                'response': "Svelte response"
+            }
         ]
     )
-    db_session.add(tournament)
-    db_session.flush()
-    
-    prompts = [
-        TournamentPrompt(
-            tournament_id=tournament.id, 
-            position=0, 
-            text="React is awesome", 
-            model="meta-llama/llama-3.1-8b-instruct:free",
-            response="React response"
-        ),
-        TournamentPrompt(
-            tournament_id=tournament.id, 
-            position=1, 
-            text="Vue is simple", 
-            model="mistralai/mistral-7b-instruct:free",
-            response="Vue response"
-        ),
-        TournamentPrompt(
-            tournament_id=tournament.id, 
-            position=2, 
-            text="Angular is powerful", 
-            model="google/gemma-2-9b-it:free",
-            response="Angular response"
-        ),
-        TournamentPrompt(
-            tournament_id=tournament.id, 
-            position=3, 
-            text="Svelte is fast", 
-            model="microsoft/phi-3-mini-128k-instruct:free",
-            response="Svelte response"
-        )
-    ]
-    db_session.add_all(prompts)
-    db_session.commit()
-    return tournament
 
 @pytest.fixture
 def sample_user_tournament(db_session, sample_tournament):
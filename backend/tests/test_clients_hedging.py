@@ -0,0 +1,49 @@
+from app.clients.hedging import HedgePolicy
+
+MODEL = "meta-llama/llama-3.1-8b-instruct:free"
+
+def test_no_delay_until_enough_latencies():
+    policy = HedgePolicy(min_samples=3, min_delay=0.0)
+    for seconds in (0.1, 0.2):
+        policy.record(MODEL, seconds)
+
+    assert policy.delay(MODEL) is None
+    policy.record(MODEL, 0.3)
+    assert policy.delay(MODEL) == 0.3
+    assert policy.delay("other-model") is None
+
+def test_delay_is_a_percentile_floored_at_min_delay():
+    policy = HedgePolicy(percentile=90, min_samples=1, min_delay=0.0)
+    for i in range(1, 101):
+        policy.record(MODEL, i / 100)
+
+    assert policy.delay(MODEL) == 0.9
+    policy.min_delay = 2.0
+    assert policy.delay(MODEL) == 2.0
+
+def test_window_forgets_old_latencies():
+    policy = HedgePolicy(percentile=100, min_samples=1, min_delay=0.0, window=2)
+    for seconds in (5.0, 0.1, 0.2):
+        policy.record(MODEL, seconds)
+
+    assert policy.delay(MODEL) == 0.2
+
+def test_budget_caps_hedges_at_a_ratio_of_requests():
+    policy = HedgePolicy(max_ratio=0.25, burst=2)
+
+    assert [policy.try_hedge() for _ in range(3)] == [True, True, False]
+    for _ in range(3):
+        policy.delay(MODEL)
+    assert not policy.try_hedge()
+    policy.delay(MODEL)
+    assert policy.try_hedge()
+    # Idle time does not bank more than a burst
+    for _ in range(100):
+        policy.delay(MODEL)
+    assert [policy.try_hedge() for _ in range(3)] == [True, True, False]
+
+def test_hedges_go_to_the_fallback_model():
+    policy = HedgePolicy(fallbacks={MODEL: "mistralai/mistral-7b-instruct:free"})
+
+    assert policy.hedge_model(MODEL) == "mistralai/mistral-7b-instruct:free"
+    assert policy.hedge_model("mistralai/mistral-7b-instruct:free") == "mistralai/mistral-7b-instruct:free"
@@ -2,7 +2,8 @@ import pytest
 import asyncio
 import aiohttp
 from unittest.mock import patch, MagicMock, AsyncMock
-from app.clients.open_router import OpenRouterClient
+from app.clients.hedging import HedgePolicy
+from app.clients.open_router import OpenRouterClient, get_openrouter_client
 from app.schemas import PromptData
 
 class TestOpenRouterClient:
@@ -14,6 +15,17 @@ class TestOpenRouterClient:
             assert client.api_key == 'test-api-key'
             assert client.timeout == 60
 
+    def test_get_openrouter_client_is_shared(self):
+        """Test the shared client is created once, on first use"""
+        get_openrouter_client.cache_clear()
+        with patch('app.clients.open_router.OpenRouterClient', wraps=OpenRouterClient) as mock_class:
+            first = get_openrouter_client()
+            second = get_openrouter_client()
+            
+            assert first is second
+            assert mock_class.call_count == 1
+        get_openrouter_client.cache_clear()
+
     def test_init_no_api_key(self):
         """Test client initialization without API key"""
         with patch('app.clients.open_router.Config.OPENROUTER_API_KEY', None):
@@ -286,4 +298,44 @@ class TestOpenRouterClient:
             for model in expected_models:
                 assert model in models
                 assert isinstance(models[model], str)
-                assert len(models[model]) > 0
\ No newline at end of file
+                assert len(models[model]) > 0
+    @pytest.mark.asyncio
+    async def test_generate_completion_hedges_a_slow_request(self):
+        """Test a slow request is hedged, the hedge's answer is returned and the slow request cancelled"""
+        with patch('app.clients.open_router.Config.OPENROUTER_API_KEY', 'test-key'):
+            client = OpenRouterClient()
+            client.hedging = HedgePolicy(min_samples=1, min_delay=0.05, fallbacks={"test-model": "fallback-model"})
+            client.hedging.record("test-model", 0.01)
+            cancelled = []
+            
+            def post(url, json, **kwargs):
+                async def enter(*args):
+                    try:
+                        await asyncio.sleep(10 if json["model"] == "test-model" else 0)
+                    except asyncio.CancelledError:
+                        cancelled.append(json["model"])
+                        raise
+                    response = MagicMock()
+                    response.json = AsyncMock(return_value={
+                        "choices": [{"message": {"content": f"{json['model']} response"}}]
+                    })
+                    return response
+                context = AsyncMock()
+                context.__aenter__ = enter
+                context.__aexit__ = AsyncMock(return_value=None)
+                return context
+            
+            mock_session = MagicMock()
+            mock_session.post = MagicMock(side_effect=post)
+            
+            result = await client.generate_completion(
+                mock_session,
+                "test-model",
+                "System prompt",
+                "User prompt",
+                asyncio.Semaphore(1)
+            )
+            
+            assert result == "fallback-model response"
+            assert mock_session.post.call_count == 2
+            assert cancelled == ["test-model"]
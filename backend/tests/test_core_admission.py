@@ -0,0 +1,159 @@
+import uuid
+from unittest.mock import patch
+import pytest
+from prometheus_client import REGISTRY
+from app.core.admission import (
+    AdmissionController, AdmissionRejected, Bucket, MemoryBucketStore, PostgresBucketStore
+)
+from app.core.database import db
+from app.core.deadlines import Deadline
+
+PAYLOAD = {
+    "question": "Which is better?",
+    "prompts": [{"text": "Option A", "model": "google/gemma-2-9b-it:free"}, {"text": "Option B", "model": "google/gemma-2-9b-it:free"}]
+}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _bucket(scope='global', capacity=4, rate=1.0):
+    return Bucket(f'test-{scope}-{uuid.uuid4().hex}', scope, capacity, rate)
+
+def _controller(store, capacity=4, rate=1.0, max_wait=0.0, max_queue=4):
+    """Per-user buckets of the given size behind a global bucket that never runs short"""
+    controller = AdmissionController()
+    controller.enabled = True
+    controller.store = store
+    controller.global_bucket = _bucket('global', 1000, 1000.0)
+    controller.user_capacity = capacity
+    controller.user_rate = rate
+    controller.max_wait = max_wait
+    controller.max_queue = max_queue
+    return controller
+
+@pytest.fixture(params=['postgres', 'memory'])
+def store(request, app):
+    if request.param == 'postgres':
+        return PostgresBucketStore(lambda: db.engine)
+    return MemoryBucketStore()
+
+def test_take_within_capacity(store):
+    """Test tokens are taken until the bucket runs dry, then the wait is reported"""
+    bucket = _bucket(capacity=4, rate=0.5)
+
+    assert store.take([bucket], 3) is None
+    denied_bucket, wait = store.take([bucket], 3)
+
+    assert denied_bucket == bucket
+    assert wait == pytest.approx(4, abs=0.1)  # two tokens short at half a token per second
+
+def test_take_is_all_or_nothing(store):
+    """Test a short user bucket leaves the global bucket untouched"""
+    global_bucket, user_bucket = _bucket('global', capacity=10), _bucket('user', capacity=2)
+
+    denied_bucket, _ = store.take([global_bucket, user_bucket], 3)
+
+    assert denied_bucket == user_bucket
+    assert store.take([global_bucket], 10) is None
+
+def test_memory_bucket_refills():
+    """Test buckets refill at their rate up to capacity"""
+    clock = FakeClock()
+    store = MemoryBucketStore(clock)
+    bucket = _bucket(capacity=4, rate=2.0)
+
+    assert store.take([bucket], 4) is None
+    assert store.take([bucket], 1) is not None
+    clock.now += 1
+    assert store.take([bucket], 2) is None
+    clock.now += 100
+    assert store.take([bucket], 4) is None
+    assert store.take([bucket], 1) is not None
+
+def test_prune_forgets_idle_buckets():
+    """Test pruning drops buckets idle long enough to be full"""
+    clock = FakeClock()
+    store = MemoryBucketStore(clock)
+    store.take([_bucket()], 1)
+    clock.now += 10
+
+    assert store.prune(5) == 1
+    assert store.prune(5) == 0
+
+def test_acquire_waits_for_refill():
+    """Test a short wait is queued instead of rejected"""
+    controller = _controller(MemoryBucketStore(), capacity=2, rate=50.0, max_wait=1.0)
+
+    controller.acquire("user-a", 2)
+    controller.acquire("user-a", 2)
+
+    assert controller.waiting == 0
+
+def test_acquire_rejects_with_retry_after():
+    """Test requests that would wait past max_wait are rejected and counted"""
+    controller = _controller(MemoryBucketStore(), capacity=4, rate=0.1, max_wait=1.0)
+    before = REGISTRY.get_sample_value('admission_rejections_total', {'scope': 'user'}) or 0
+    controller.acquire("user-b", 4)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("user-b", 2)
+
+    assert rejected.value.scope == 'user'
+    assert rejected.value.retry_after == 20
+    assert REGISTRY.get_sample_value('admission_rejections_total', {'scope': 'user'}) == before + 1
+
+def test_acquire_wait_is_limited_by_the_deadline():
+    """Test a wait max_wait allows is still rejected when the request's deadline would pass first"""
+    controller = _controller(MemoryBucketStore(), capacity=2, rate=1.0, max_wait=10.0)
+    controller.acquire("user-e", 2)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("user-e", 2, Deadline.after(0.5))
+
+    assert rejected.value.scope == 'user'
+    assert controller.waiting == 0
+
+def test_acquire_rejects_when_queue_full():
+    """Test requests are rejected instead of queued once the queue is full"""
+    controller = _controller(MemoryBucketStore(), capacity=2, rate=1.0, max_wait=10.0, max_queue=0)
+    controller.acquire("user-c", 2)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("user-c", 2)
+
+    assert rejected.value.scope == 'queue'
+
+def test_acquire_rejects_requests_larger_than_burst():
+    """Test a request that can never fit is a client error"""
+    controller = _controller(MemoryBucketStore(), capacity=4)
+
+    with pytest.raises(ValueError, match="exceeds the admission burst size"):
+        controller.acquire("user-d", 5)
+
+def test_create_tournament_rejected_with_429(client):
+    """Test creation returns 429 with Retry-After when the budget is exhausted"""
+    with patch('app.routes.tournaments.admission_controller.acquire') as mock_acquire:
+        with patch('app.routes.tournaments.TournamentService.create_tournament') as mock_create:
+            mock_acquire.side_effect = AdmissionRejected('global', 7)
+
+            response = client.post('/api/tournaments', json=PAYLOAD)
+
+            assert response.status_code == 429
+            assert response.headers['Retry-After'] == '7'
+            assert 'LLM budget exhausted' in response.get_json()['error']
+            assert mock_acquire.call_args.args[1] == 2
+            mock_create.assert_not_called()
+
+def test_invalid_create_tournament_spends_no_budget(client):
+    """Test a creation refused for a bad model is refused before admission charges for it"""
+    payload = {**PAYLOAD, "prompts": [{"text": "Option A", "model": "unknown-model"}, PAYLOAD["prompts"][1]]}
+    with patch('app.routes.tournaments.admission_controller.acquire') as mock_acquire:
+        response = client.post('/api/tournaments', json=payload)
+
+        assert response.status_code == 400
+        assert "not in available models" in response.get_json()['error']
+        mock_acquire.assert_not_called()
@@ -0,0 +1,113 @@
+import json
+import queue
+from unittest.mock import MagicMock, patch
+import pytest
+from app.core import results_broadcaster
+from app.core.broadcaster import ResultsBroadcaster, SubscriberLimitReached
+
+def _broadcaster(app):
+    broadcaster = ResultsBroadcaster(interval=3600)
+    broadcaster.init_app(app)
+    broadcaster._ensure_ticker = MagicMock()
+    return broadcaster
+
+def test_bursts_are_coalesced_into_one_computation(app):
+    """Test many invalidations between ticks cost one computation for all subscribers"""
+    broadcaster = _broadcaster(app)
+    compute = MagicMock(return_value={'stats': 1})
+    encode = lambda value: json.dumps(value).encode()
+    
+    first = broadcaster.subscribe(7, compute, encode)
+    second = broadcaster.subscribe(7, compute, encode)
+    for _ in range(25):
+        broadcaster.mark_dirty(7)
+    broadcaster.tick()
+    
+    assert compute.call_count == 1
+    assert first.get_nowait() == second.get_nowait() == b'{"stats": 1}'
+
+def test_unchanged_results_are_not_rebroadcast(app):
+    """Test ticks without changes or with identical results publish nothing"""
+    broadcaster = _broadcaster(app)
+    compute = MagicMock(return_value={'stats': 1})
+    subscription = broadcaster.subscribe(7, compute, lambda value: json.dumps(value).encode())
+    
+    broadcaster.tick()
+    assert compute.call_count == 0
+    
+    broadcaster.mark_dirty(7)
+    broadcaster.tick()
+    broadcaster.mark_dirty(7)
+    broadcaster.tick()
+    
+    assert compute.call_count == 2
+    assert subscription.qsize() == 1
+
+def test_slow_subscribers_keep_latest_update(app):
+    """Test a full subscriber queue drops its oldest payload"""
+    broadcaster = _broadcaster(app)
+    broadcaster.queue_size = 1
+    values = iter(range(3))
+    subscription = broadcaster.subscribe(7, lambda: next(values), lambda value: str(value).encode())
+    
+    for _ in range(3):
+        broadcaster.mark_dirty(7)
+        broadcaster.tick()
+    
+    assert subscription.get_nowait() == b'2'
+    assert subscription.empty()
+
+def test_unsubscribe_removes_channel(app):
+    """Test the channel disappears with its last subscriber"""
+    broadcaster = _broadcaster(app)
+    subscription = broadcaster.subscribe(7, MagicMock(), MagicMock())
+    
+    broadcaster.unsubscribe(7, subscription)
+    broadcaster.mark_dirty(7)
+    
+    assert broadcaster.subscriber_count(7) == 0
+
+def test_results_stream_sends_initial_snapshot(client):
+    """Test the SSE endpoint starts with the current results"""
+    with patch('app.routes.tournaments.TournamentService.get_results') as mock_results:
+        mock_results.return_value = (
+            [{'prompt': 'A', 'prompt_index': 0, 'model': 'test-model', 'win_count': 1, 'win_percentage': 100.0}],
+            {'total_participants': 1, 'completed_participants': 1, 'completion_rate': 100.0}
+        )
+        
+        response = client.get('/api/tournaments/1/results/stream', buffered=False)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        first_event = next(response.response).decode()
+        response.close()
+        
+        assert first_event.startswith('event: results\ndata: ')
+        data = json.loads(first_event.split('data: ', 1)[1])
+        assert data['stats']['completion_rate'] == 100.0
+
+def test_subscribers_are_capped_per_process(app):
+    """Test subscriptions past max_subscribers are refused until one closes"""
+    broadcaster = _broadcaster(app)
+    broadcaster.max_subscribers = 2
+    first = broadcaster.subscribe(1, MagicMock(), MagicMock())
+    broadcaster.subscribe(2, MagicMock(), MagicMock())
+    
+    with pytest.raises(SubscriberLimitReached):
+        broadcaster.subscribe(1, MagicMock(), MagicMock())
+    broadcaster.unsubscribe(1, first)
+    broadcaster.unsubscribe(1, first)
+    broadcaster.subscribe(1, MagicMock(), MagicMock())
+    with pytest.raises(SubscriberLimitReached):
+        broadcaster.subscribe(3, MagicMock(), MagicMock())
+
+def test_results_stream_over_the_cap_is_refused(client, monkeypatch):
+    """Test a stream past the per-worker cap gets a 503 instead of holding a thread"""
+    monkeypatch.setattr(results_broadcaster, 'max_subscribers', 0)
+    with patch('app.routes.tournaments.TournamentService.get_results') as mock_results:
+        mock_results.return_value = ([], {'total_participants': 0, 'completed_participants': 0, 'completion_rate': 0.0})
+        
+        response = client.get('/api/tournaments/1/results/stream')
+    
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) > 0
@@ -0,0 +1,114 @@
+import gzip
+from unittest.mock import patch
+from app.core import compression
+from app.core.compression import CompressedPayloadCache, negotiate_encoding, payload_cache
+
+def _content(num_prompts=4):
+    return {
+        'id': 1,
+        'question': "Which response is better?",
+        'prompts': [f"Prompt {i}" for i in range(num_prompts)],
+        'responses': [f"Long response {i} " * 100 for i in range(num_prompts)],
+        'models': ["test-model"] * num_prompts,
+        'bracket_template': [[{"participant1": 0, "participant2": 1, "winner": None}]]
+    }
+
+def test_negotiate_encoding_prefers_best_supported():
+    """Test Accept-Encoding negotiation honours q-values and preference order"""
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("*") == next(iter(compression.ENCODERS))
+
+def test_compressed_payload_cache_evicts_least_recently_used():
+    """Test payload cache stays within its byte budget"""
+    cache = CompressedPayloadCache(max_bytes=10)
+    cache.put("a", "gzip", b"12345")
+    cache.put("b", "gzip", b"12345")
+    assert cache.get("a", "gzip") == b"12345"
+    
+    cache.put("c", "gzip", b"12345")
+    
+    assert cache.get("b", "gzip") is None
+    assert cache.get("a", "gzip") == b"12345"
+    assert cache.size == 10
+    
+    cache.invalidate("a")
+    assert cache.get("a", "gzip") is None
+    assert cache.size == 5
+
+def test_dynamic_compression_of_json_responses(client):
+    """Test large JSON responses are gzip encoded when requested"""
+    with patch('app.routes.tournaments.TournamentService.get_tournaments_list') as mock_list:
+        mock_list.return_value = [
+            {
+                'id': i,
+                'question': f'Question {i}?',
+                'num_prompts': 4,
+                'created_at': '2024-01-01T00:00:00',
+                'total_participants': 0,
+                'completed_participants': 0,
+                'completion_rate': 0
+            } for i in range(50)
+        ]
+        
+        plain = client.get('/api/tournaments')
+        compressed = client.get('/api/tournaments', headers={'Accept-Encoding': 'gzip'})
+        
+        assert 'Content-Encoding' not in plain.headers
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+        assert gzip.decompress(compressed.data) == plain.data
+
+def test_tournament_content_is_compressed_once(client):
+    """Test immutable tournament content is built and compressed once per encoding"""
+    payload_cache.clear()
+    with patch('app.routes.tournaments.TournamentService.get_tournament_content') as mock_content:
+        mock_content.return_value = _content()
+        
+        first = client.get('/api/tournaments/1/content', headers={'Accept-Encoding': 'gzip'})
+        with patch('app.core.compression.compress') as mock_compress:
+            second = client.get('/api/tournaments/1/content', headers={'Accept-Encoding': 'gzip'})
+            mock_compress.assert_not_called()
+        plain = client.get('/api/tournaments/1/content')
+        
+        assert mock_content.call_count == 1
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert second.data == first.data
+        assert gzip.decompress(first.data) == plain.data
+        assert plain.get_json()['responses'][0].startswith("Long response 0")
+        assert 'immutable' in plain.headers['Cache-Control']
+
+def test_tournament_content_conditional_request(client):
+    """Test matching If-None-Match short-circuits to 304"""
+    payload_cache.clear()
+    with patch('app.routes.tournaments.TournamentService.get_tournament_content') as mock_content:
+        mock_content.return_value = _content()
+        
+        first = client.get('/api/tournaments/1/content')
+        etag = first.headers['ETag']
+        second = client.get('/api/tournaments/1/content', headers={'If-None-Match': etag})
+        
+        assert second.status_code == 304
+        assert second.data == b''
+    payload_cache.clear()
+
+def test_tournament_content_etag_differs_per_encoding(client):
+    """Test each content coding is its own representation, with its own strong ETag"""
+    payload_cache.clear()
+    with patch('app.routes.tournaments.TournamentService.get_tournament_content') as mock_content:
+        mock_content.return_value = _content()
+        
+        plain = client.get('/api/tournaments/1/content')
+        compressed = client.get('/api/tournaments/1/content', headers={'Accept-Encoding': 'gzip'})
+        stale = client.get('/api/tournaments/1/content', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': plain.headers['ETag']
+        })
+        
+        assert plain.headers['ETag'] != compressed.headers['ETag']
+        assert not compressed.headers['ETag'].startswith('W/')
+        assert stale.status_code == 200
+        assert stale.headers['Content-Encoding'] == 'gzip'
+    payload_cache.clear()
@@ -0,0 +1,68 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from app import db
+from app.core.database import engine_options, set_statement_timeout_per_transaction
+
+pytestmark = pytest.mark.postgres
+
+BASE_CONFIG = {
+    'DB_POOL_SIZE': 8,
+    'DB_MAX_OVERFLOW': 4,
+    'DB_POOL_TIMEOUT': 10,
+    'DB_POOL_RECYCLE': 1800,
+    'DB_POOL_PRE_PING': True,
+    'DB_STATEMENT_TIMEOUT_MS': 5000,
+    'DB_PGBOUNCER': False,
+}
+
+def test_engine_options_from_config():
+    """Test pool settings and the statement timeout startup option"""
+    options = engine_options(BASE_CONFIG)
+    
+    assert options['pool_size'] == 8
+    assert options['max_overflow'] == 4
+    assert options['pool_pre_ping'] is True
+    assert options['connect_args'] == {'options': '-c statement_timeout=5000'}
+
+def test_engine_options_pgbouncer_skips_startup_options():
+    """Test transaction pooling mode does not send startup parameters"""
+    options = engine_options(dict(BASE_CONFIG, DB_PGBOUNCER=True))
+    
+    assert 'connect_args' not in options
+
+def test_app_engine_uses_statement_timeout(app):
+    """Test the app's connections carry the configured statement timeout"""
+    timeout = db.session.execute(text("SHOW statement_timeout")).scalar()
+    db.session.rollback()
+    
+    assert timeout == f"{app.config['DB_STATEMENT_TIMEOUT_MS'] // 1000}s"
+
+def test_statement_timeout_per_transaction(app):
+    """Test SET LOCAL applies inside each transaction and does not outlive it"""
+    engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'], pool_size=1, max_overflow=0)
+    set_statement_timeout_per_transaction(engine, 1234)
+    try:
+        with engine.connect() as connection:
+            with connection.begin():
+                assert connection.execute(text("SHOW statement_timeout")).scalar() == '1234ms'
+            
+            # Bypass SQLAlchemy so no new transaction re-applies the setting
+            cursor = connection.connection.dbapi_connection.cursor()
+            cursor.execute("SHOW statement_timeout")
+            assert cursor.fetchone()[0] != '1234ms'
+            cursor.close()
+            connection.connection.dbapi_connection.rollback()
+    finally:
+        engine.dispose()
+
+def test_pool_gauges_track_checkouts(app):
+    """Test the checked-out gauge follows connections leaving and returning to the pool"""
+    before = REGISTRY.get_sample_value('db_pool_checked_out_connections')
+    
+    connection = db.engine.connect()
+    assert REGISTRY.get_sample_value('db_pool_checked_out_connections') == before + 1
+    connection.close()
+    
+    assert REGISTRY.get_sample_value('db_pool_checked_out_connections') == before
+    assert REGISTRY.get_sample_value('db_pool_open_connections') >= 1
@@ -0,0 +1,84 @@
+import socket
+import threading
+import time
+import pytest
+from app.clients.fake_provider import serve_in_thread
+from app.clients.open_router import OpenRouterClient
+from app.core.deadlines import Deadline, DeadlineExceeded, client_disconnected
+
+MODEL = "meta-llama/llama-3.1-8b-instruct:free"
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def slow_client():
+    """A client of a fake provider taking a second per completion"""
+    url, stop = serve_in_thread(latency=1.0)
+    client = OpenRouterClient()
+    client.base_url = url
+    yield client
+    stop()
+
+def test_deadline_runs_out():
+    clock = FakeClock()
+    deadline = Deadline.after(5, clock=clock)
+
+    assert deadline.remaining() == 5
+    deadline.check()
+    clock.now += 6
+    assert deadline.remaining() == 0
+    with pytest.raises(DeadlineExceeded) as exceeded:
+        deadline.check()
+    assert exceeded.value.reason == 'timeout'
+
+def test_deadline_ends_when_cancelled():
+    hung_up = threading.Event()
+    deadline = Deadline.after(60, hung_up.is_set)
+
+    assert deadline.reason() is None
+    hung_up.set()
+    assert deadline.reason() == 'disconnect'
+
+def test_client_disconnected_peeks_at_the_socket():
+    server, peer = socket.socketpair()
+    disconnected = client_disconnected({"gunicorn.socket": server})
+
+    assert not disconnected()
+    peer.sendall(b"GET / HTTP/1.1\r\n")
+    # Pipelined data is not a hang-up, and peeking leaves it for the server
+    assert not disconnected()
+    peer.close()
+    assert server.recv(100) == b"GET / HTTP/1.1\r\n"
+    assert disconnected()
+    server.close()
+    assert not client_disconnected({})()
+
+def test_generation_stops_at_the_deadline(slow_client):
+    """Test in-flight completions are cancelled and queued ones never sent"""
+    prompts = [{"text": f"Prompt {i}", "model": MODEL} for i in range(20)]
+    start = time.perf_counter()
+
+    with pytest.raises(DeadlineExceeded) as exceeded:
+        slow_client.generate_completions(prompts, "Question?", Deadline.after(0.3))
+
+    assert exceeded.value.reason == 'timeout'
+    assert time.perf_counter() - start < 0.9
+    # Only the first ten, under the semaphore, had started
+    assert slow_client.usage().calls == 10
+
+def test_generation_stops_when_the_client_hangs_up(slow_client):
+    hung_up = threading.Event()
+    threading.Timer(0.2, hung_up.set).start()
+    slow_client.DEADLINE_POLL_INTERVAL = 0.05
+    start = time.perf_counter()
+
+    with pytest.raises(DeadlineExceeded) as exceeded:
+        slow_client.generate_completions([{"text": "Prompt", "model": MODEL}], "Question?", Deadline.after(60, hung_up.is_set))
+
+    assert exceeded.value.reason == 'disconnect'
+    assert time.perf_counter() - start < 0.9
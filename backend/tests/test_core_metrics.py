@@ -0,0 +1,54 @@
+import pytest
+from prometheus_client import REGISTRY
+from app.core.metrics import timed, record_llm_call
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+@pytest.mark.postgres
+def test_server_timing_header_reports_sql(client):
+    """Test responses carry Server-Timing with SQL time, statement count and total"""
+    response = client.get('/api/tournaments')
+    
+    assert response.status_code == 200
+    server_timing = response.headers['Server-Timing']
+    assert 'db;dur=' in server_timing
+    assert 'serialize;dur=' in server_timing
+    assert 'total;dur=' in server_timing
+
+@pytest.mark.postgres
+def test_request_metrics_are_recorded(client):
+    """Test per-endpoint latency and per-request SQL histograms are updated"""
+    labels = {'method': 'GET', 'endpoint': 'tournaments.handle_tournaments', 'status': '200'}
+    before = _sample('http_request_duration_seconds_count', **labels)
+    statements_before = _sample('http_request_db_statements_sum', endpoint='tournaments.handle_tournaments')
+    
+    client.get('/api/tournaments')
+    
+    assert _sample('http_request_duration_seconds_count', **labels) == before + 1
+    assert _sample('http_request_db_statements_sum', endpoint='tournaments.handle_tournaments') > statements_before
+
+def test_metrics_endpoint_exposes_prometheus_text(client):
+    """Test /metrics serves the Prometheus exposition format"""
+    client.get('/api/tournaments')
+    
+    response = client.get('/metrics')
+    
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    body = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_bucket' in body
+    assert 'db_pool_checkout_wait_seconds_count' in body
+    assert 'Server-Timing' not in response.headers
+
+def test_timed_and_llm_calls_are_observed():
+    """Test named sections and LLM calls land in their histograms"""
+    section_before = _sample('app_section_duration_seconds_count', section='test-section')
+    llm_before = _sample('llm_request_duration_seconds_count', model='test-model', outcome='success')
+    
+    with timed('test-section'):
+        pass
+    record_llm_call('test-model', 'success', 0.5)
+    
+    assert _sample('app_section_duration_seconds_count', section='test-section') == section_before + 1
+    assert _sample('llm_request_duration_seconds_count', model='test-model', outcome='success') == llm_before + 1
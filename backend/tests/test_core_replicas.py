@@ -0,0 +1,78 @@
+import os
+import time
+import pytest
+from sqlalchemy import create_engine
+from app import db
+from app.core.replicas import replica_router, replica_reads, primary_reads, PRIMARY_UNTIL_KEY
+from app.models import Tournament
+from app.services.tournaments import TournamentService
+
+pytestmark = pytest.mark.postgres
+
+REPLICA_URL = os.getenv('TEST_REPLICA_DATABASE_URL')
+
+@pytest.fixture
+def replica_engine(app):
+    """Register a replica engine for the duration of a test"""
+    engine = create_engine(REPLICA_URL or app.config['SQLALCHEMY_DATABASE_URI'])
+    previous = replica_router.engines
+    replica_router.engines = [engine]
+    yield engine
+    replica_router.engines = previous
+    engine.dispose()
+
+def test_reads_stay_on_primary_without_replicas(app):
+    """Test replica_reads is a no-op when no replicas are configured"""
+    with replica_reads():
+        assert replica_router.should_use_replica() is False
+        assert db.session.get_bind() is db.engine
+
+def test_replica_reads_route_to_replica(app, replica_engine):
+    """Test only reads marked read-only go to the replica"""
+    assert db.session.get_bind() is db.engine
+    with replica_reads():
+        assert db.session.get_bind() is replica_engine
+        with primary_reads():
+            assert db.session.get_bind() is db.engine
+
+def test_recent_writer_reads_from_primary(app, replica_engine):
+    """Test read-your-writes stickiness keeps a user on the primary after writing"""
+    with app.test_request_context():
+        replica_router.stick_to_primary()
+        with replica_reads():
+            assert db.session.get_bind() is db.engine
+        
+        from flask import session
+        session[PRIMARY_UNTIL_KEY] = time.time() - 1
+        with replica_reads():
+            assert db.session.get_bind() is replica_engine
+
+def test_vote_marks_user_sticky(client, sample_tournament, replica_engine):
+    """Test voting stores the stickiness deadline in the user's session"""
+    response = client.post(
+        f'/api/tournaments/{sample_tournament.id}/vote',
+        json={'round': 0, 'match': 0, 'winner': 0}
+    )
+    
+    assert response.status_code == 200
+    with client.session_transaction() as session:
+        assert session[PRIMARY_UNTIL_KEY] > time.time()
+
+@pytest.mark.skipif(not REPLICA_URL, reason="TEST_REPLICA_DATABASE_URL not set")
+def test_read_only_methods_query_the_replica(app, replica_engine):
+    """Test read-only service methods see the replica's data, not the primary's"""
+    db.metadata.create_all(replica_engine)
+    with replica_engine.begin() as connection:
+        connection.execute(Tournament.__table__.insert().values(
+            question="Only on the replica?", bracket_template=[]
+        ))
+    try:
+        questions = [t['question'] for t in TournamentService.get_tournaments_list()]
+        assert "Only on the replica?" in questions
+        
+        with primary_reads():
+            questions = [t['question'] for t in TournamentService.get_tournaments_list()]
+        assert "Only on the replica?" not in questions
+    finally:
+        db.session.rollback()
+        db.metadata.drop_all(replica_engine)
@@ -0,0 +1,122 @@
+import pytest
+import time
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine, text
+from app.core.results_cache import ResultsCache, NOTIFY_CHANNEL
+from app.services.tournaments import TournamentService
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_results_are_computed_once_while_fresh(app):
+    """Test fresh entries are served from memory"""
+    cache = ResultsCache(ttl=60, stale_ttl=60)
+    compute = MagicMock(return_value=([], {}))
+    
+    assert cache.get(1, compute) == ([], {})
+    assert cache.get(1, compute) == ([], {})
+    assert compute.call_count == 1
+
+def test_expired_results_are_served_stale_while_revalidating(app):
+    """Test expired entries are returned immediately and refreshed in the background"""
+    cache = ResultsCache(ttl=0, stale_ttl=60)
+    compute = MagicMock(side_effect=["first", "second"])
+    
+    assert cache.get(1, compute) == "first"
+    assert cache.get(1, compute) == "first"
+    assert _wait_for(lambda: compute.call_count == 2)
+    assert _wait_for(lambda: not cache._entries[1].refreshing)
+    
+    cache.ttl = 60
+    cache._entries[1].fresh_until = time.monotonic() + 60
+    assert cache.get(1, compute) == "second"
+
+def test_invalidated_results_are_recomputed_by_next_reader(app):
+    """Test explicit invalidation makes the next read recompute synchronously"""
+    cache = ResultsCache(ttl=60, stale_ttl=60)
+    compute = MagicMock(side_effect=["before vote", "after vote"])
+    callback = MagicMock()
+    cache.add_invalidation_callback(callback)
+    
+    cache.get(1, compute)
+    cache.invalidate(1)
+    
+    assert cache.get(1, compute) == "after vote"
+    callback.assert_called_once_with(1)
+
+def test_invalidation_during_computation_keeps_value_stale(app):
+    """Test a computation racing an invalidation is not cached as fresh"""
+    cache = ResultsCache(ttl=60, stale_ttl=60)
+    
+    def compute():
+        cache.invalidate(1)
+        return "raced"
+    
+    assert cache.get(1, compute) == "raced"
+    assert cache._entries[1].fresh_until == 0
+
+def test_least_recently_read_entries_are_evicted(app):
+    """Test the cache holds at most max_entries tournaments"""
+    cache = ResultsCache(ttl=60, stale_ttl=60, max_entries=2)
+    compute = MagicMock(return_value="results")
+    
+    cache.get(1, compute)
+    cache.get(2, compute)
+    cache.get(1, compute)
+    cache.get(3, compute)
+    
+    assert list(cache._entries) == [1, 3]
+    cache.invalidate(2)
+    assert 2 not in cache._generations
+
+def test_expired_entries_are_swept(app):
+    """Test entries past their stale TTL are dropped instead of kept forever"""
+    cache = ResultsCache(ttl=0, stale_ttl=0.05)
+    compute = MagicMock(return_value="results")
+    for tournament_id in range(4):
+        cache.get(tournament_id, compute)
+        cache.invalidate(tournament_id)
+    time.sleep(0.1)
+    
+    cache.get(4, compute)
+    cache.invalidate(4)
+    
+    assert list(cache._entries) == [4]
+    assert list(cache._generations) == [4]
+
+@pytest.mark.postgres
+def test_notifications_invalidate_across_processes(app):
+    """Test a committed pg_notify reaches the listener connection"""
+    cache = ResultsCache(ttl=60, stale_ttl=60)
+    cache.init_app(app)
+    cache.listen = True
+    cache.get(42, lambda: "cached")
+    assert _wait_for(lambda: cache._listener_pid is not None)
+    
+    engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+    try:
+        # The listener subscribes asynchronously, so keep notifying until it reacts
+        def notified():
+            with engine.begin() as connection:
+                connection.execute(text("SELECT pg_notify(:channel, '42')"), {"channel": NOTIFY_CHANNEL})
+            return _wait_for(lambda: cache._entries[42].invalidated, timeout=0.5)
+        assert _wait_for(notified)
+    finally:
+        engine.dispose()
+
+def test_record_vote_invalidates_results(sample_tournament, db_session):
+    """Test starting a bracket invalidates cached results"""
+    compute = MagicMock(side_effect=["no participants", "one participant"])
+    from app.core import results_cache
+    results_cache.clear()
+    results_cache.get(sample_tournament.id, compute)
+    
+    TournamentService.record_vote(sample_tournament, "cache_user", 0, 0, 1)
+    
+    assert results_cache.get(sample_tournament.id, compute) == "one participant"
+    results_cache.clear()
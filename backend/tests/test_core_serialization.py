@@ -0,0 +1,38 @@
+import json
+from datetime import datetime
+from app.core.serialization import dumps, json_response
+from app.schemas import TournamentListItem, VoteRequest
+
+def test_json_response_encodes_model_directly(app):
+    """Test models are emitted as JSON without a dict round trip"""
+    item = TournamentListItem(
+        id=1,
+        question="Question?",
+        num_prompts=2,
+        created_at=datetime(2024, 1, 1),
+        total_participants=0,
+        completed_participants=0,
+        completion_rate=0
+    )
+    
+    response = json_response(item, 201)
+    
+    assert response.status_code == 201
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['created_at'] == '2024-01-01T00:00:00'
+
+def test_dumps_is_compact_json():
+    """Test fast encoder output round-trips through the standard library"""
+    payload = {'patch': [{'op': 'replace', 'path': '/0/0/winner', 'value': 1}], 'completed': False}
+    
+    encoded = dumps(payload)
+    
+    assert isinstance(encoded, bytes)
+    assert b' ' not in encoded
+    assert json.loads(encoded) == payload
+
+def test_vote_request_validates_from_raw_bytes():
+    """Test request bodies validate straight from bytes"""
+    vote = VoteRequest.model_validate_json(b'{"round": 1, "match": 0, "winner": 3}')
+    
+    assert (vote.round, vote.match, vote.winner) == (1, 0, 3)
@@ -0,0 +1,107 @@
+import math
+import random
+from itertools import combinations
+import pytest
+from app.formats import FORMATS, get_format
+from app.utils import iter_votable_matches
+
+def _copy(bracket):
+    return [[dict(match) for match in round_matches] for round_matches in bracket]
+
+def _play(fmt, template, pick, votes=None):
+    """Decide matches in order with pick over the participants, until the champion or after votes"""
+    bracket = _copy(template)
+    while fmt.champion(bracket) is None and votes != 0:
+        if fmt.scheduled and next(iter_votable_matches(bracket), None) is None:
+            fmt.schedule(bracket, tuple(random.sample(range(len(template) + 1), 2)))
+        round_number, match_number = next(iter_votable_matches(bracket))
+        match = bracket[round_number][match_number]
+        fmt.record_result(bracket, round_number, match_number, pick(match['participant1'], match['participant2']))
+        votes = None if votes is None else votes - 1
+    return bracket
+
+@pytest.mark.parametrize('name', FORMATS)
+@pytest.mark.parametrize('num_prompts', [2, 3, 5, 8, 13])
+def test_format_plays_to_a_champion(name, num_prompts):
+    """Test every format reaches a champion and survives its compact encoding mid-way and at the end"""
+    fmt = get_format(name)
+    template = fmt.build(fmt.seed(num_prompts))
+    pick = lambda a, b: random.choice((a, b))
+
+    bracket = _play(fmt, template, pick)
+    partial = _play(fmt, template, pick, votes=num_prompts // 2)
+
+    assert fmt.champion(bracket) in range(num_prompts)
+    assert next(iter_votable_matches(bracket), None) is None
+    assert fmt.decode(template, fmt.encode(bracket)) == bracket
+    assert fmt.decode(template, fmt.encode(partial)) == partial
+
+def test_round_robin_pairs_everyone_once():
+    """Test round-robin meets every pair exactly once, one match per prompt per round"""
+    fmt = get_format('round_robin')
+    bracket = fmt.create(7)
+
+    pairs = [frozenset((m['participant1'], m['participant2'])) for round_matches in bracket for m in round_matches]
+    assert sorted(map(sorted, pairs)) == sorted(map(sorted, map(frozenset, combinations(range(7), 2))))
+    for round_matches in bracket:
+        players = [p for m in round_matches for p in (m['participant1'], m['participant2'])]
+        assert len(players) == len(set(players))
+
+    with pytest.raises(ValueError, match="at most 16"):
+        fmt.check_size(17)
+
+def test_round_robin_champion_has_most_wins():
+    """Test the strongest prompt wins round-robin once every match is decided"""
+    fmt = get_format('round_robin')
+    bracket = _play(fmt, fmt.create(6), pick=min)
+
+    assert fmt.champion(bracket) == 0
+
+@pytest.mark.parametrize('num_prompts', [5, 16, 33])
+def test_swiss_rounds(num_prompts):
+    """Test Swiss plays ceil(log2 n) rounds, everyone once per round, byes spread out"""
+    fmt = get_format('swiss')
+    bracket = _play(fmt, fmt.create(num_prompts), pick=min)
+
+    assert len(bracket) == math.ceil(math.log2(num_prompts))
+    byes = []
+    for round_matches in bracket:
+        players = [p for m in round_matches for p in (m['participant1'], m['participant2']) if p != -1]
+        assert sorted(players) == list(range(num_prompts))
+        byes += [m['participant1'] for m in round_matches if m['participant2'] == -1]
+    assert len(byes) == len(set(byes))
+    # Prompt 0 beats everyone; without byes to tie it, it ends alone on top
+    if num_prompts == 16:
+        assert fmt.champion(bracket) == 0
+
+def test_swiss_pairs_leaders_without_rematches():
+    """Test later Swiss rounds pair equal scores and avoid rematches"""
+    fmt = get_format('swiss')
+    bracket = _play(fmt, fmt.create(16), pick=min)
+
+    meetings = [frozenset((m['participant1'], m['participant2'])) for round_matches in bracket for m in round_matches]
+    assert len(meetings) == len(set(meetings))
+    undefeated = [p for p in range(16) if all(m['winner'] == p for r in bracket[:-1] for m in r if p in (m['participant1'], m['participant2']))]
+    assert {bracket[-1][0]['participant1'], bracket[-1][0]['participant2']} == set(undefeated)
+
+@pytest.mark.parametrize('num_prompts', [2, 5, 8, 13])
+def test_double_elimination_needs_two_losses(num_prompts):
+    """Test double elimination plays 2n - 2 matches and only knocks a prompt out on its second loss"""
+    fmt = get_format('double_elimination')
+    bracket = _play(fmt, fmt.create(num_prompts), pick=lambda a, b: random.choice((a, b)))
+
+    played = [m for round_matches in bracket for m in round_matches if -1 not in (m['participant1'], m['participant2'])]
+    assert len(played) == 2 * num_prompts - 2
+    losses = {p: 0 for p in range(num_prompts)}
+    for m in played:
+        losses[m['participant2'] if m['winner'] == m['participant1'] else m['participant1']] += 1
+
+    grand_final = bracket[-1][0]
+    runner_up = grand_final['participant2'] if grand_final['winner'] == grand_final['participant1'] else grand_final['participant1']
+    assert losses.pop(fmt.champion(bracket)) <= 1
+    assert losses.pop(runner_up) in (1, 2)
+    assert set(losses.values()) <= {2}
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Unknown tournament format"):
+        get_format('ladder')
@@ -0,0 +1,298 @@
+import random
+import string
+from contextlib import contextmanager
+from datetime import timedelta
+import pytest
+from unittest.mock import patch
+from sqlalchemy import update
+from app import create_app, db
+from app.config import Config
+from app.core import results_cache
+from app.formats import get_format
+from app.models import TournamentPrompt
+from app.repositories import create_repository
+from app.services.scheduler import match_scheduler
+from app.services.tournaments import TournamentService
+
+PROMPTS = [
+    {"text": "Python is great", "model": "test-model"},
+    {"text": "JavaScript rocks", "model": "test-model"},
+    {"text": "Go is fast", "model": "other-model"},
+    {"text": "Rust is safe", "model": "other-model"},
+]
+
+@pytest.fixture(params=['postgres', 'memory'])
+def repository(request, app, db_session):
+    """Run each test against every storage backend through the service layer"""
+    previous = app.extensions['repository']
+    app.extensions['repository'] = create_repository(request.param)
+    results_cache.clear()
+    match_scheduler.clear()
+    yield app.extensions['repository']
+    app.extensions['repository'] = previous
+    results_cache.clear()
+    match_scheduler.clear()
+
+def _create_tournament(question="Best language?", prompts=PROMPTS, tournament_format='single_elimination'):
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        mock_generate.return_value = [f"Response to {p['text']}" for p in prompts]
+        return TournamentService.create_tournament(question, prompts, tournament_format)
+
+def _play(tournament, user_id, pick='participant1'):
+    """Vote through the whole bracket and return the final bracket"""
+    _, _, bracket = TournamentService.get_tournament_with_user_state(tournament.id, user_id)
+    completed = False
+    while not completed:
+        round_number, match_number = next(
+            (r, m) for r, matches in enumerate(bracket) for m, match in enumerate(matches)
+            if match['winner'] is None and None not in (match['participant1'], match['participant2'])
+        )
+        winner = bracket[round_number][match_number][pick]
+        bracket, completed, _ = TournamentService.record_vote(tournament, user_id, round_number, match_number, winner)
+    return bracket
+
+def test_create_and_get_tournament(repository):
+    """Test tournaments come back with prompts in position order"""
+    tournament = _create_tournament()
+
+    content = TournamentService.get_tournament_content(tournament.id)
+
+    assert content['question'] == "Best language?"
+    assert content['prompts'] == [p['text'] for p in PROMPTS]
+    assert content['responses'][0] == "Response to Python is great"
+    assert content['models'] == [p['model'] for p in PROMPTS]
+    assert content['bracket_template'] == tournament.bracket_template
+    assert repository.get_tournament(tournament.id + 10_000_000) is None
+
+def test_vote_through_bracket(repository):
+    """Test voting advances winners and completes the bracket"""
+    tournament = _create_tournament()
+
+    bracket = _play(tournament, "repo_player")
+
+    _, user_tournament, user_bracket = TournamentService.get_tournament_with_user_state(tournament.id, "repo_player")
+    assert user_bracket == bracket
+    assert user_tournament.completed is True
+    assert user_tournament.winner_prompt_index == bracket[-1][0]['winner']
+    assert user_tournament.get_next_votable_match() is None
+
+@pytest.mark.parametrize('tournament_format', ['double_elimination', 'round_robin', 'swiss', 'adaptive'])
+def test_vote_through_other_formats(repository, tournament_format):
+    """Test formats that add rounds or rank by wins complete with the format's champion"""
+    prompts = PROMPTS + [{"text": "Zig is simple", "model": "test-model"}]
+    tournament = _create_tournament(prompts=prompts, tournament_format=tournament_format)
+
+    bracket = _play(tournament, f"repo_{tournament_format}", 'participant2')
+
+    user_tournament = repository.get_user_tournament(tournament.id, f"repo_{tournament_format}")
+    assert tournament.format == tournament_format
+    assert user_tournament.completed is True
+    assert user_tournament.winner_prompt_index == get_format(tournament_format).champion(bracket)
+    assert user_tournament.get_bracket() == bracket
+    assert user_tournament.get_next_votable_match() is None
+
+def test_first_vote_creates_user_tournament(repository):
+    """Test a user's bracket starts from the template and exists after the first vote"""
+    tournament = _create_tournament()
+    match = tournament.bracket_template[0][0]
+
+    tournament_state, user_tournament, user_bracket = TournamentService.get_tournament_with_user_state(
+        tournament.id, "repo_first_vote"
+    )
+    assert user_tournament is None
+    assert user_bracket == tournament.bracket_template
+
+    user_bracket, completed, winner = TournamentService.record_vote(
+        tournament, "repo_first_vote", 0, 0, match['participant2']
+    )
+
+    assert completed is False and winner is None
+    assert user_bracket[0][0]['winner'] == match['participant2']
+    assert repository.get_user_tournament(tournament.id, "repo_first_vote").get_bracket() == user_bracket
+
+def test_rejected_vote_stores_nothing(repository):
+    """Test a failed first vote leaves no user tournament behind"""
+    tournament = _create_tournament()
+
+    with pytest.raises(ValueError, match="must be one of the participants"):
+        TournamentService.record_vote(tournament, "repo_rejected", 0, 0, 99)
+    # End of request: uncommitted work is discarded
+    db.session.remove()
+
+    assert repository.get_user_tournament(tournament.id, "repo_rejected") is None
+    assert repository.participation_counts(tournament.id) == (0, 0)
+
+def test_duplicate_vote(repository):
+    """Test a second vote on the same match is rejected"""
+    tournament = _create_tournament()
+    TournamentService.record_vote(tournament, "repo_duplicate", 0, 0, tournament.bracket_template[0][0]['participant1'])
+    user_tournament = repository.get_user_tournament(tournament.id, "repo_duplicate")
+
+    assert repository.has_vote(user_tournament, 0, 0)
+    assert not repository.has_vote(user_tournament, 0, 1)
+    with pytest.raises(ValueError, match="already voted"):
+        repository.save_vote(user_tournament, 0, 0, 1, user_tournament.get_bracket(), None, False)
+
+def test_adaptive_results_are_shared(repository, app, monkeypatch):
+    """Test adaptive votes reach the pairwise totals and a fresh worker's estimates"""
+    monkeypatch.setitem(app.config, 'ADAPTIVE_SYNC_INTERVAL', 0)
+    tournament = _create_tournament(tournament_format='adaptive')
+
+    bracket = _play(tournament, "repo_adaptive", 'participant1')
+
+    played = {(m['participant1'], m['participant2']): 1 for round_matches in bracket for m in round_matches}
+    rows, now = repository.pairwise_results(tournament.id, None)
+    assert {(row.winner_index, row.loser_index): row.wins for row in rows} == played
+    assert repository.pairwise_results(tournament.id, now + timedelta(seconds=1))[0] == []
+
+    scores = list(match_scheduler.estimates(tournament.id, len(PROMPTS)).scores)
+    match_scheduler.clear()
+    assert list(match_scheduler.estimates(tournament.id, len(PROMPTS)).scores) == pytest.approx(scores)
+
+    # Single votes can form a cycle, so another worker repeats one result until it must decide the order
+    winner, loser = rows[0].winner_index, rows[0].loser_index
+    repository.add_pairwise_results(tournament.id, {(winner, loser): 5})
+    match_scheduler.clear()
+    scores = match_scheduler.estimates(tournament.id, len(PROMPTS)).scores
+    assert scores[winner] > scores[loser]
+
+def test_results(repository):
+    """Test rankings, participation stats and the tournament list agree across backends"""
+    tournament = _create_tournament("Results question?")
+    first = _play(tournament, "repo_results_a", 'participant1')[-1][0]['winner']
+    second = _play(tournament, "repo_results_b", 'participant2')[-1][0]['winner']
+    TournamentService.record_vote(tournament, "repo_results_c", 0, 0, tournament.bracket_template[0][0]['participant1'])
+
+    stats = TournamentService.get_participation_stats(tournament.id)
+    assert stats == {'total_participants': 3, 'completed_participants': 2, 'completion_rate': 66.67}
+
+    rankings = TournamentService.get_prompt_rankings(tournament.id)
+    assert len(rankings) == len(PROMPTS)
+    wins = {r['prompt_index']: r['win_count'] for r in rankings}
+    assert wins[first] == 1 and wins[second] == 1
+    assert sum(wins.values()) == 2
+    assert rankings[0]['win_percentage'] == 50.0
+
+    newer = _create_tournament("Newer question?")
+    listed = [t for t in TournamentService.get_tournaments_list() if t['id'] in (tournament.id, newer.id)]
+    assert [t['id'] for t in listed] == [newer.id, tournament.id]
+    assert listed[1]['total_participants'] == 3
+    assert listed[1]['completed_participants'] == 2
+    assert listed[1]['num_prompts'] == len(PROMPTS)
+
+def test_search(repository):
+    """Test search finds question and response hits, question hits first"""
+    term = 'vacuum' + ''.join(random.choices(string.ascii_lowercase, k=8))
+    question_hit = _create_tournament(f"How should I tune {term} settings?")
+    response_hit = _create_tournament("Maintenance tips?", [
+        {"text": f"Explain {term} briefly", "model": "test-model"},
+        {"text": "Be brief", "model": "test-model"},
+    ])
+    _create_tournament("Pizza toppings?")
+
+    results = TournamentService.search_tournaments(term)
+
+    assert results['total'] == 2
+    assert [r['id'] for r in results['results']] == [question_hit.id, response_hit.id]
+    assert results['results'][1]['matches'][0]['prompt_index'] == 0
+    assert TournamentService.search_tournaments(term, page=2, per_page=1)['results'][0]['id'] == response_hit.id
+    assert TournamentService.search_tournaments(term + 'missing')['total'] == 0
+
+def test_large_bracket_generates_responses_in_waves(repository, app, monkeypatch):
+    """Test large brackets generate each response once, just ahead of the voter, and store winners compactly"""
+    monkeypatch.setitem(app.config, 'EAGER_RESPONSE_LIMIT', 4)
+    monkeypatch.setitem(app.config, 'RESPONSE_WAVE_SIZE', 4)
+    monkeypatch.setitem(app.config, 'MATCH_LOOKAHEAD', 2)
+    prompts = [{"text": f"Variant {i}", "model": "test-model"} for i in range(11)]
+
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        mock_generate.side_effect = lambda data, question, deadline=None: [f"Response to {p['text']}" for p in data]
+        tournament = TournamentService.create_tournament("Sweep?", prompts)
+        assert tournament.bracket_template is None
+        assert sum(p.response is not None for p in tournament.prompts) == 4
+
+        _, _, bracket = TournamentService.get_tournament_with_user_state(tournament.id, "repo_large")
+        completed = False
+        while not completed:
+            match = TournamentService.get_next_match_details(tournament, bracket)
+            assert match['participant2']['response'] == f"Response to {match['participant2']['prompt']}"
+            bracket, completed, _ = TournamentService.record_vote(
+                tournament, "repo_large", match['round'], match['match'], match['participant1']['index']
+            )
+
+    waves = [len(call.args[0]) for call in mock_generate.call_args_list]
+    assert sum(waves) == len(prompts) and max(waves) <= 4
+    user_tournament = repository.get_user_tournament(tournament.id, "repo_large")
+    assert user_tournament.completed is True
+    assert user_tournament.get_bracket() == bracket
+    if repository.name == 'postgres':
+        assert user_tournament.current_bracket is None
+        assert len(user_tournament.compact_winners) == 2 * 15
+
+def test_wave_lock_is_exclusive(repository):
+    """Test a second holder of a tournament's wave lock times out until the first lets go"""
+    tournament = _create_tournament()
+
+    with repository.wave_lock(tournament) as held:
+        assert held is True
+        with repository.wave_lock(tournament, timeout=0.05) as acquired:
+            assert acquired is False
+    with repository.wave_lock(tournament, timeout=0.05) as acquired:
+        assert acquired is True
+
+def test_wave_generated_while_waiting_is_not_generated_again(repository, app, monkeypatch):
+    """Test a request that waited for another's wave uses its responses instead of paying for them again"""
+    monkeypatch.setitem(app.config, 'EAGER_RESPONSE_LIMIT', 4)
+    monkeypatch.setitem(app.config, 'RESPONSE_WAVE_SIZE', 4)
+    monkeypatch.setitem(app.config, 'MATCH_LOOKAHEAD', 4)
+    prompts = [{"text": f"Variant {i}", "model": "test-model"} for i in range(11)]
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        mock_generate.side_effect = lambda data, question, deadline=None: [f"Response to {p['text']}" for p in data]
+        tournament = TournamentService.create_tournament("Sweep?", prompts)
+    _, _, bracket = TournamentService.get_tournament_with_user_state(tournament.id, "repo_waiter")
+    wave_lock = repository.wave_lock
+
+    @contextmanager
+    def lock_after_concurrent_wave(tournament, timeout=None):
+        # The request holding the lock stores every response while this one waits
+        if repository.name == 'postgres':
+            db.session.execute(update(TournamentPrompt.__table__).where(
+                TournamentPrompt.tournament_id == tournament.id, TournamentPrompt.response.is_(None)
+            ).values(response="Generated elsewhere"))
+        else:
+            repository.save_responses(tournament, {p.position: "Generated elsewhere" for p in tournament.prompts})
+        with wave_lock(tournament, timeout) as acquired:
+            yield acquired
+
+    monkeypatch.setattr(repository, 'wave_lock', lock_after_concurrent_wave)
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        upcoming = TournamentService.get_upcoming_matches(tournament, bracket, limit=4)
+
+    mock_generate.assert_not_called()
+    responses = [match[side]['response'] for match in upcoming for side in ('participant1', 'participant2')]
+    assert None not in responses and "Generated elsewhere" in responses
+
+def test_memory_backend_app(monkeypatch):
+    """Test the app serves a full tournament without a database in memory mode"""
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'memory')
+    app = create_app()
+    client = app.test_client()
+
+    assert client.get('/ready').get_json()['checks'] == {'storage': 'memory'}
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        mock_generate.return_value = ["A", "B"]
+        response = client.post('/api/tournaments', json={'question': "Embedded?", 'prompts': [
+            {**prompt, 'model': "google/gemma-2-9b-it:free"} for prompt in PROMPTS[:2]
+        ]})
+    assert response.status_code == 201
+    tournament_id = response.get_json()['id']
+
+    match = response.get_json()['bracket_template'][0][0]
+    vote = client.post(f'/api/tournaments/{tournament_id}/vote',
+                       json={'round': 0, 'match': 0, 'winner': match['participant2']})
+    assert vote.get_json()['completed'] is True
+
+    results = client.get(f'/api/tournaments/{tournament_id}?include_results=true').get_json()
+    assert results['stats']['completed_participants'] == 1
+    assert client.get('/api/tournaments').get_json()['tournaments'][0]['id'] == tournament_id
+    assert client.get('/api/exports/votes').status_code == 404
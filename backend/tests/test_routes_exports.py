@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import patch
+
+pytestmark = pytest.mark.postgres
+
+def test_export_streams_ndjson(client):
+    """Test export endpoint streams service chunks with validated filters"""
+    with patch('app.routes.exports.ExportService.stream') as mock_stream:
+        mock_stream.return_value = iter([b'{"vote_id":1}\n', b'{"vote_id":2}\n'])
+
+        response = client.get('/api/exports/votes?tournament_id=7&since=2024-01-01T00:00:00')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'votes-tournament-7.ndjson' in response.headers['Content-Disposition']
+        assert response.get_data() == b'{"vote_id":1}\n{"vote_id":2}\n'
+
+        dataset, export_format = mock_stream.call_args.args
+        assert (dataset, export_format) == ('votes', 'ndjson')
+        assert mock_stream.call_args.kwargs['tournament_id'] == 7
+        assert mock_stream.call_args.kwargs['since'].year == 2024
+        assert mock_stream.call_args.kwargs['until'] is None
+
+def test_export_csv(client, db_session, sample_user_tournament):
+    """Test CSV export of user tournaments end to end"""
+    tournament_id = sample_user_tournament.tournament_id
+
+    response = client.get(f'/api/exports/user_tournaments?format=csv&tournament_id={tournament_id}')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].startswith('user_tournament_id,tournament_id,user_id')
+    assert len(lines) == 2
+    assert 'test_user_123' in lines[1]
+
+def test_export_rejects_invalid_parameters(client):
+    """Test unknown datasets, formats and timestamps are rejected"""
+    assert client.get('/api/exports/prompts').status_code == 404
+    assert client.get('/api/exports/votes?format=xml').status_code == 400
+    assert client.get('/api/exports/votes?since=yesterday').status_code == 400
@@ -0,0 +1,34 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
+
+def test_health(client):
+    """Test liveness does not depend on the database"""
+    with patch('app.routes.health.db.session.execute') as mock_execute:
+        response = client.get('/health')
+        
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'ok'
+        mock_execute.assert_not_called()
+
+@pytest.mark.postgres
+def test_ready(client):
+    """Test readiness reports a reachable database"""
+    response = client.get('/ready')
+    
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['status'] == 'ok'
+    assert data['checks']['database'] == 'ok'
+    assert 'Checked out connections' in data['checks']['pool']
+
+@pytest.mark.postgres
+def test_ready_database_unavailable(client):
+    """Test readiness fails with 503 when the database cannot be reached"""
+    with patch('app.routes.health.db.session.execute') as mock_execute:
+        mock_execute.side_effect = OperationalError("SELECT 1", {}, Exception("connection refused"))
+        
+        response = client.get('/ready')
+        
+        assert response.status_code == 503
+        assert response.get_json()['checks']['database'] == 'unavailable'
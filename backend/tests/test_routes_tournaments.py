@@ -1,4 +1,7 @@
 from unittest.mock import patch, MagicMock
+from prometheus_client import REGISTRY
+from app.clients.fake_provider import serve_in_thread
+from app.clients.open_router import get_openrouter_client
 
 def test_create_tournament_success(client, db_session):
     """Test successful tournament creation via API"""
@@ -6,10 +9,11 @@ def test_create_tournament_success(client, db_session):
         mock_tournament = MagicMock()
         mock_tournament.id = 1
         mock_tournament.question = "What's better?"
+        mock_tournament.format = "single_elimination"
         mock_tournament.prompts = [
-            MagicMock(text="Option A", response="Response A", model="test-model"),
-            MagicMock(text="Option B", response="Response B", model="test-model"), 
-            MagicMock(text="Option C", response="Response C", model="test-model")
+            MagicMock(text="Option A", response="Response A", model="google/gemma-2-9b-it:free"),
+            MagicMock(text="Option B", response="Response B", model="google/gemma-2-9b-it:free"), 
+            MagicMock(text="Option C", response="Response C", model="google/gemma-2-9b-it:free")
         ]
         mock_tournament.bracket_template = [
             [{"participant1": 0, "participant2": 1, "winner": None}],
@@ -20,9 +24,9 @@ def test_create_tournament_success(client, db_session):
         payload = {
             "question": "What's better?",
             "prompts": [
-                {"text": "Option A", "model": "test-model"},
-                {"text": "Option B", "model": "test-model"},
-                {"text": "Option C", "model": "test-model"}
+                {"text": "Option A", "model": "google/gemma-2-9b-it:free"},
+                {"text": "Option B", "model": "google/gemma-2-9b-it:free"},
+                {"text": "Option C", "model": "google/gemma-2-9b-it:free"}
             ]
         }
         
@@ -39,8 +43,8 @@ def test_create_tournament_missing_question(client):
     """Test tournament creation with missing question"""
     payload = {
         "prompts": [
-            {"text": "Option A", "model": "test-model"},
-            {"text": "Option B", "model": "test-model"}
+            {"text": "Option A", "model": "google/gemma-2-9b-it:free"},
+            {"text": "Option B", "model": "google/gemma-2-9b-it:free"}
         ]
     }
     
@@ -53,7 +57,7 @@ def test_create_tournament_not_enough_prompts(client):
     """Test tournament creation with insufficient prompts"""
     payload = {
         "question": "What's better?",
-        "prompts": [{"text": "Only one option", "model": "test-model"}]
+        "prompts": [{"text": "Only one option", "model": "google/gemma-2-9b-it:free"}]
     }
     
     response = client.post('/api/tournaments', json=payload)
@@ -62,6 +66,22 @@ def test_create_tournament_not_enough_prompts(client):
     data = response.get_json()
     assert "error" in data
 
+def test_create_tournament_unknown_format(client):
+    """Test tournament creation rejects formats that do not exist"""
+    payload = {
+        "question": "Test?",
+        "format": "ladder",
+        "prompts": [
+            {"text": "Option A", "model": "google/gemma-2-9b-it:free"},
+            {"text": "Option B", "model": "google/gemma-2-9b-it:free"}
+        ]
+    }
+    
+    response = client.post('/api/tournaments', json=payload)
+    
+    assert response.status_code == 400
+    assert 'Unknown tournament format' in response.get_json()['error']
+
 def test_create_tournament_llm_failure(client):
     """Test tournament creation with LLM failure"""
     with patch('app.routes.tournaments.TournamentService.create_tournament') as mock_create:
@@ -70,8 +90,8 @@ def test_create_tournament_llm_failure(client):
         payload = {
             "question": "What's better?",
             "prompts": [
-                {"text": "Option A", "model": "test-model"},
-                {"text": "Option B", "model": "test-model"}
+                {"text": "Option A", "model": "google/gemma-2-9b-it:free"},
+                {"text": "Option B", "model": "google/gemma-2-9b-it:free"}
             ]
         }
         
@@ -80,15 +100,62 @@ def test_create_tournament_llm_failure(client):
         assert response.status_code == 502
         assert "Failed to generate responses" in response.get_json()['error']
 
+def test_create_tournament_past_deadline(app, client, db_session, monkeypatch):
+    """Test a creation still waiting on the upstream at its deadline is abandoned with a 504"""
+    url, stop = serve_in_thread(latency=1.0)
+    monkeypatch.setattr(get_openrouter_client(), 'base_url', url)
+    monkeypatch.setitem(app.config, 'CREATE_DEADLINE', 0.2)
+    before = REGISTRY.get_sample_value(
+        'deadlines_exceeded_total', {'endpoint': 'tournaments.handle_tournaments', 'reason': 'timeout'}
+    ) or 0
+    payload = {
+        "question": "Too slow?",
+        "prompts": [{"text": f"Option {i}", "model": "meta-llama/llama-3.1-8b-instruct:free"} for i in range(2)]
+    }
+    
+    try:
+        with patch('app.routes.tournaments.TournamentService.store_tournament') as mock_store:
+            response = client.post('/api/tournaments', json=payload)
+    finally:
+        stop()
+    
+    assert response.status_code == 504
+    assert response.get_json()['error'] == "Request deadline exceeded"
+    mock_store.assert_not_called()
+    assert REGISTRY.get_sample_value(
+        'deadlines_exceeded_total', {'endpoint': 'tournaments.handle_tournaments', 'reason': 'timeout'}
+    ) == before + 1
+
+@patch('app.routes.tournaments.get_user_id')
+def test_content_and_state_add_up_to_the_tournament(mock_get_user_id, client, db_session):
+    """Test the cached content plus the user's state carry everything GET /<id> does"""
+    mock_get_user_id.return_value = 'split_load_user'
+    prompts = [{"text": f"Option {i}", "model": "google/gemma-2-9b-it:free"} for i in range(3)]
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        mock_generate.side_effect = lambda data, question, deadline=None: [f"Response to {p['text']}" for p in data]
+        tournament_id = client.post('/api/tournaments', json={"question": "Split?", "prompts": prompts}).get_json()['id']
+    
+    full = client.get(f'/api/tournaments/{tournament_id}?include_results=true').get_json()
+    content = client.get(f'/api/tournaments/{tournament_id}/content').get_json()
+    state = client.get(f'/api/tournaments/{tournament_id}/state?include_results=true').get_json()
+    
+    assert 'user_bracket' not in content and 'prompts' not in state
+    merged = {**content, **state}
+    for key in ('question', 'prompts', 'responses', 'models', 'bracket_template', 'user_bracket', 'user_state',
+                'rankings', 'stats'):
+        assert merged[key] == full[key]
+    assert state['upcoming_matches'] is None
+
 def test_get_tournament_new_user(client):
     """Test getting tournament for new user"""
     with patch('app.routes.tournaments.TournamentService.get_tournament_with_user_state') as mock_get:
         mock_tournament = MagicMock()
         mock_tournament.id = 1
         mock_tournament.question = "Test question?"
+        mock_tournament.format = "single_elimination"
         mock_tournament.prompts = [
-            MagicMock(text="A", response="Response A", model="test-model"),
-            MagicMock(text="B", response="Response B", model="test-model")
+            MagicMock(text="A", response="Response A", model="google/gemma-2-9b-it:free"),
+            MagicMock(text="B", response="Response B", model="google/gemma-2-9b-it:free")
         ]
         mock_tournament.bracket_template = [
             [{"participant1": 0, "participant2": 1, "winner": None}]
@@ -112,9 +179,10 @@ def test_get_tournament_existing_user(client):
         mock_tournament = MagicMock()
         mock_tournament.id = 1
         mock_tournament.question = "Test question?"
+        mock_tournament.format = "single_elimination"
         mock_tournament.prompts = [
-            MagicMock(text="A", response="Response A", model="test-model"),
-            MagicMock(text="B", response="Response B", model="test-model")
+            MagicMock(text="A", response="Response A", model="google/gemma-2-9b-it:free"),
+            MagicMock(text="B", response="Response B", model="google/gemma-2-9b-it:free")
         ]
         mock_tournament.bracket_template = [
             [{"participant1": 0, "participant2": 1, "winner": None}]
@@ -148,7 +216,8 @@ def test_get_tournament_with_results(client):
                 mock_tournament = MagicMock()
                 mock_tournament.id = 1
                 mock_tournament.question = "Test question?"
-                mock_tournament.prompts = [MagicMock(text="A", response="Response A", model="test-model")]
+                mock_tournament.format = "single_elimination"
+                mock_tournament.prompts = [MagicMock(text="A", response="Response A", model="google/gemma-2-9b-it:free")]
                 mock_tournament.bracket_template = []
                 
                 mock_get.return_value = (mock_tournament, None, [])
@@ -244,6 +313,58 @@ def test_vote_tournament_completion(mock_get_user_id, client):
             assert data['completed'] is True
             assert data['winner_prompt_index'] == 1
 
+@patch('app.routes.tournaments.get_user_id')
+def test_vote_delta_response(mock_get_user_id, client):
+    """Test vote with delta=true returns bracket patch and inline next match"""
+    mock_get_user_id.return_value = 'test_user_123'
+    
+    with patch('app.routes.tournaments.TournamentService.get_tournament_with_user_state') as mock_get:
+        with patch('app.routes.tournaments.TournamentService.record_vote') as mock_vote:
+            mock_tournament = MagicMock()
+            mock_tournament.id = 1
+            mock_tournament.prompts = [
+                MagicMock(text="A", response="Response A", model="google/gemma-2-9b-it:free"),
+                MagicMock(text="B", response="Response B", model="google/gemma-2-9b-it:free"),
+                MagicMock(text="C", response="Response C", model="google/gemma-2-9b-it:free"),
+                MagicMock(text="D", response="Response D", model="google/gemma-2-9b-it:free")
+            ]
+            mock_get.return_value = (mock_tournament, None, [
+                [
+                    {"participant1": 0, "participant2": 1, "winner": None},
+                    {"participant1": 2, "participant2": 3, "winner": None}
+                ],
+                [{"participant1": None, "participant2": None, "winner": None}]
+            ])
+            
+            mock_vote.return_value = (
+                [
+                    [
+                        {"participant1": 0, "participant2": 1, "winner": 0},
+                        {"participant1": 2, "participant2": 3, "winner": None}
+                    ],
+                    [{"participant1": 0, "participant2": None, "winner": None}]
+                ],
+                False,
+                None
+            )
+            
+            payload = {"round": 0, "match": 0, "winner": 0}
+            
+            response = client.post('/api/tournaments/1/vote?delta=true', json=payload)
+            
+            assert response.status_code == 200
+            data = response.get_json()
+            assert 'user_bracket' not in data
+            assert data['patch'] == [
+                {'op': 'replace', 'path': '/0/0/winner', 'value': 0},
+                {'op': 'replace', 'path': '/1/0/participant1', 'value': 0}
+            ]
+            assert data['next_match']['round'] == 0
+            assert data['next_match']['match'] == 1
+            assert data['next_match']['participant1']['response'] == "Response C"
+            assert data['next_match']['participant2']['index'] == 3
+            assert data['completed'] is False
+
 def test_vote_missing_fields(client):
     """Test vote with missing required fields"""
     payload = {"round": 0}
@@ -386,3 +507,99 @@ def test_empty_payload(client):
     assert response.status_code == 400
     error_data = response.get_json()
     assert 'error' in error_data
+
+def test_search_tournaments(client):
+    """Test search endpoint passes validated query parameters to the service"""
+    with patch('app.routes.tournaments.TournamentService.search_tournaments') as mock_search:
+        mock_search.return_value = {
+            'results': [{
+                'id': 3,
+                'question': 'How to tune vacuum?',
+                'question_highlight': 'How to tune <mark>vacuum</mark>?',
+                'created_at': '2024-01-01T00:00:00',
+                'rank': 0.2,
+                'matches': []
+            }],
+            'total': 1,
+            'page': 2,
+            'per_page': 5
+        }
+        
+        response = client.get('/api/tournaments/search?q=vacuum&page=2&per_page=5')
+        
+        assert response.status_code == 200
+        mock_search.assert_called_once_with('vacuum', 2, 5)
+        data = response.get_json()
+        assert data['total'] == 1
+        assert data['results'][0]['question_highlight'] == 'How to tune <mark>vacuum</mark>?'
+
+def test_search_tournaments_requires_query(client):
+    """Test search endpoint rejects a missing or blank query"""
+    assert client.get('/api/tournaments/search').status_code == 400
+    assert client.get('/api/tournaments/search?q=%20%20').status_code == 400
+    assert client.get('/api/tournaments/search?q=x&per_page=500').status_code == 400
+
+@patch('app.routes.tournaments.get_user_id')
+def test_large_tournament_materializes_upcoming_matches(mock_get_user_id, client, db_session):
+    """Test large brackets ship only the next matches and answer votes with deltas"""
+    mock_get_user_id.return_value = 'large_bracket_user'
+    prompts = [{"text": f"Variant {i}", "model": "google/gemma-2-9b-it:free"} for i in range(40)]
+    
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        mock_generate.side_effect = lambda data, question, deadline=None: [f"Response to {p['text']}" for p in data]
+        created = client.post('/api/tournaments', json={"question": "Sweep?", "prompts": prompts})
+        assert created.status_code == 201
+        assert created.get_json()['bracket_template'] is None
+        assert sum(r is not None for r in created.get_json()['responses']) == 16
+        
+        tournament_id = created.get_json()['id']
+        data = client.get(f'/api/tournaments/{tournament_id}').get_json()
+        assert 'prompts' not in data and 'user_bracket' not in data
+        assert data['num_prompts'] == 40 and data['rounds'] == 6
+        assert len(data['upcoming_matches']) == 4
+        
+        match = data['upcoming_matches'][0]
+        assert data['user_state']['next_match'] == [match['round'], match['match']]
+        vote = client.post(f'/api/tournaments/{tournament_id}/vote', json={
+            'round': match['round'], 'match': match['match'], 'winner': match['participant1']['index']
+        })
+    
+    assert vote.status_code == 200
+    assert 'user_bracket' not in vote.get_json()
+    assert vote.get_json()['next_match'] == data['upcoming_matches'][1]
+    
+    state = client.get(f'/api/tournaments/{tournament_id}/state').get_json()
+    assert state['user_bracket'] is None
+    assert state['upcoming_matches'][0] == vote.get_json()['next_match']
+    
+    content = client.get(f'/api/tournaments/{tournament_id}/content').get_json()
+    assert len(content['seeding']) == 64
+    assert content['bracket_template'] is None
+
+@patch('app.routes.tournaments.get_user_id')
+def test_vote_stored_when_next_wave_fails(mock_get_user_id, client, app, db_session, monkeypatch):
+    """Test a vote whose next response wave fails is still answered as stored, with the next match pending"""
+    mock_get_user_id.return_value = 'pending_wave_user'
+    monkeypatch.setitem(app.config, 'RESPONSE_WAVE_SIZE', 8)
+    monkeypatch.setitem(app.config, 'MATCH_LOOKAHEAD', 4)
+    prompts = [{"text": f"Variant {i}", "model": "google/gemma-2-9b-it:free"} for i in range(40)]
+    
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        mock_generate.side_effect = lambda data, question, deadline=None: [f"Response to {p['text']}" for p in data]
+        tournament_id = client.post('/api/tournaments', json={"question": "Sweep?", "prompts": prompts}).get_json()['id']
+        match = client.get(f'/api/tournaments/{tournament_id}').get_json()['upcoming_matches'][0]
+        
+        mock_generate.side_effect = RuntimeError("Failed to generate one or more LLM responses")
+        payload = {'round': match['round'], 'match': match['match'], 'winner': match['participant1']['index']}
+        vote = client.post(f'/api/tournaments/{tournament_id}/vote', json=payload)
+        
+        assert vote.status_code == 200
+        assert vote.get_json()['next_match'] is None
+        assert vote.get_json()['next_match_pending'] is True
+        assert client.post(f'/api/tournaments/{tournament_id}/vote', json=payload).status_code == 400
+        
+        mock_generate.side_effect = lambda data, question, deadline=None: [f"Response to {p['text']}" for p in data]
+        data = client.get(f'/api/tournaments/{tournament_id}').get_json()
+    
+    assert len(data['upcoming_matches']) == 4
+    assert data['user_state']['next_match'] == [data['upcoming_matches'][0]['round'], data['upcoming_matches'][0]['match']]
@@ -0,0 +1,145 @@
+import json
+import pytest
+from datetime import datetime
+from sqlalchemy import text
+from app.models import UserTournament, Vote
+from app.services.archival import ArchivalService
+from app.services.exports import ExportService
+from app.services.tournaments import TournamentService
+
+pytestmark = pytest.mark.postgres
+
+class TestArchivalService:
+
+    @pytest.fixture(autouse=True)
+    def drop_partitions(self, db_session):
+        """Partition DDL is committed, so drop every range partition after each test"""
+        yield
+        db_session.rollback()
+        for name, _, _ in ArchivalService.list_partitions('vote') + ArchivalService.list_partitions('vote_archive'):
+            db_session.execute(text(f"DROP TABLE {name}"))
+        db_session.commit()
+
+    def _play(self, tournament, user_id):
+        """Vote through the whole bracket, always picking participant1"""
+        bracket = tournament.bracket_template
+        for round_number, match_number in [(0, 0), (0, 1), (1, 0)]:
+            winner = bracket[round_number][match_number]['participant1']
+            bracket, _, _ = TournamentService.record_vote(tournament, user_id, round_number, match_number, winner)
+        return UserTournament.query.filter_by(tournament_id=tournament.id, user_id=user_id).first()
+
+    def _partition_of(self, db_session, user_tournament_id):
+        return db_session.execute(text(
+            "SELECT tableoid::regclass::text FROM vote WHERE user_tournament_id = :id LIMIT 1"
+        ), {'id': user_tournament_id}).scalar()
+
+    def test_votes_land_in_default_partition(self, sample_tournament, db_session):
+        """Test votes without a matching range partition go to vote_default"""
+        user_tournament = self._play(sample_tournament, "archival_default")
+
+        assert self._partition_of(db_session, user_tournament.id) == 'vote_default'
+
+    def test_ensure_vote_partitions_moves_default_rows(self, sample_tournament, db_session):
+        """Test new range partitions take over rows from the default partition"""
+        user_tournament = self._play(sample_tournament, "archival_partitions")
+        size = user_tournament.id + 1
+
+        created = ArchivalService.ensure_vote_partitions(size, ahead=1)
+
+        assert created == ['vote_p0', 'vote_p1']
+        assert [p[1:] for p in ArchivalService.list_partitions('vote')] == [(0, size), (size, 2 * size)]
+        assert self._partition_of(db_session, user_tournament.id) == 'vote_p0'
+        assert Vote.query.filter_by(user_tournament_id=user_tournament.id).count() == 3
+        assert ArchivalService.ensure_vote_partitions(size, ahead=1) == []
+
+    def test_compact_completed_brackets(self, sample_tournament, db_session):
+        """Test old completed brackets keep only their winners and still read back in full"""
+        user_tournament = self._play(sample_tournament, "archival_compact")
+        user_tournament.completed_at = datetime(2020, 1, 1)
+        db_session.commit()
+        in_progress, _, _ = TournamentService.record_vote(sample_tournament, "archival_open", 0, 0, 0)
+        full_bracket = user_tournament.current_bracket
+
+        compacted = ArchivalService.compact_completed_brackets(datetime(2021, 1, 1))
+        db_session.expire_all()
+
+        assert compacted >= 1
+        user_tournament = db_session.get(UserTournament, user_tournament.id)
+        assert user_tournament.current_bracket is None
+        assert len(user_tournament.compact_winners) == 6
+        assert user_tournament.get_bracket() == full_bracket
+        assert user_tournament.get_next_votable_match() is None
+
+        _, _, user_bracket = TournamentService.get_tournament_with_user_state(sample_tournament.id, "archival_compact")
+        assert user_bracket == full_bracket
+        open_tournament = UserTournament.query.filter_by(user_id="archival_open").first()
+        assert open_tournament.current_bracket == in_progress
+
+    def test_compacted_bracket_rejects_new_votes(self, sample_tournament, db_session):
+        """Test an archived bracket is not reset to the template on a new vote"""
+        user_tournament = self._play(sample_tournament, "archival_revote")
+        user_tournament.completed_at = datetime(2020, 1, 1)
+        db_session.commit()
+        ArchivalService.compact_completed_brackets(datetime(2021, 1, 1))
+
+        with pytest.raises(ValueError, match="already been decided"):
+            TournamentService.record_vote(sample_tournament, "archival_revote", 0, 0, 0)
+
+    def test_archive_vote_partitions(self, sample_tournament, db_session):
+        """Test idle closed partitions move to vote_archive with only their primary key"""
+        old = self._play(sample_tournament, "archival_old")
+        recent = self._play(sample_tournament, "archival_recent")
+        db_session.execute(text("UPDATE vote SET created_at = '2020-01-01' WHERE user_tournament_id < :id"), {'id': recent.id})
+        db_session.commit()
+        ArchivalService.ensure_vote_partitions(recent.id, ahead=0)
+
+        archived = ArchivalService.archive_vote_partitions(datetime(2021, 1, 1))
+
+        assert archived == ['vote_archive_p0']
+        assert [p[0] for p in ArchivalService.list_partitions('vote')] == ['vote_p1']
+        assert Vote.query.filter_by(user_tournament_id=old.id).count() == 0
+        indexes = db_session.execute(text(
+            "SELECT count(*) FROM pg_indexes WHERE tablename = 'vote_archive_p0'"
+        )).scalar()
+        assert indexes == 1
+
+        # Exports still see archived votes, ahead of the active ones
+        body = b''.join(ExportService.stream('votes', 'ndjson', tournament_id=sample_tournament.id))
+        rows = [json.loads(line) for line in body.splitlines()]
+        assert [row['user_tournament_id'] for row in rows] == [old.id] * 3 + [recent.id] * 3
+
+    def test_archive_skips_recent_partitions(self, sample_tournament, db_session):
+        """Test partitions with recent votes stay active"""
+        first = self._play(sample_tournament, "archival_active_a")
+        second = self._play(sample_tournament, "archival_active_b")
+        ArchivalService.ensure_vote_partitions(second.id, ahead=0)
+
+        assert ArchivalService.archive_vote_partitions(datetime(2021, 1, 1)) == []
+        assert Vote.query.filter_by(user_tournament_id=first.id).count() == 3
+
+    def test_migrate_legacy_votes(self, sample_user_tournament, db_session):
+        """Test a database from before partitioning gets the new column and a partitioned vote table"""
+        user_tournament_id = sample_user_tournament.id
+        # All of this is rolled back with the test's transaction
+        db_session.execute(text("DROP TABLE vote CASCADE"))
+        db_session.execute(text("ALTER TABLE user_tournament DROP COLUMN compact_winners"))
+        db_session.execute(text(
+            "CREATE TABLE vote (id serial PRIMARY KEY, "
+            "user_tournament_id integer NOT NULL REFERENCES user_tournament (id), "
+            "round_number smallint NOT NULL, match_number smallint NOT NULL, winner_index smallint NOT NULL, "
+            "created_at timestamp, CONSTRAINT uq_vote_match UNIQUE (user_tournament_id, round_number, match_number))"
+        ))
+        db_session.execute(text("CREATE INDEX ix_vote_timeline ON vote (user_tournament_id, created_at)"))
+        db_session.execute(text(
+            "INSERT INTO vote (user_tournament_id, round_number, match_number, winner_index, created_at) "
+            "VALUES (:id, 0, 0, 0, now()), (:id, 0, 1, 2, now())"
+        ), {'id': user_tournament_id})
+
+        moved = ArchivalService.migrate_legacy_votes(user_tournament_id + 1, ahead=0)
+
+        assert moved == 2
+        assert db_session.execute(text("SELECT relkind FROM pg_class WHERE oid = 'vote'::regclass")).scalar() == 'p'
+        assert self._partition_of(db_session, user_tournament_id) == 'vote_p0'
+        assert Vote.query.filter_by(user_tournament_id=user_tournament_id).count() == 2
+        assert db_session.get(UserTournament, user_tournament_id).compact_winners is None
+        assert ArchivalService.migrate_legacy_votes(user_tournament_id + 1, ahead=0) is None
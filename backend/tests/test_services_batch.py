@@ -0,0 +1,120 @@
+import json
+import pytest
+from app.clients.fake_provider import serve_in_thread
+from app.clients.open_router import get_openrouter_client
+from app.core import results_cache
+from app.repositories import create_repository
+from app.services.batch import BatchEvaluation
+
+MODEL = "meta-llama/llama-3.1-8b-instruct:free"
+
+@pytest.fixture(params=['postgres', 'memory'])
+def repository(request, app, db_session):
+    previous = app.extensions['repository']
+    app.extensions['repository'] = create_repository(request.param)
+    results_cache.clear()
+    yield app.extensions['repository']
+    app.extensions['repository'] = previous
+    results_cache.clear()
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    url, stop = serve_in_thread()
+    monkeypatch.setattr(get_openrouter_client(), 'base_url', url)
+    yield url
+    stop()
+
+def _write_items(path, count, **extra):
+    """Items whose longest prompt, and so the fake judge's pick, is the last one"""
+    with open(path, 'w') as f:
+        for i in range(count):
+            prompts = [{"text": "x" * (length + 1), "model": MODEL} for length in range(i + 2)]
+            f.write(json.dumps({"id": f"item-{i}", "question": f"Batch question {i}?", "prompts": prompts, **extra}) + "\n")
+
+def _rows(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def test_batch_creates_and_judges_every_item(repository, fake_provider, tmp_path):
+    _write_items(tmp_path / "in.jsonl", 3)
+    output = str(tmp_path / "out.jsonl")
+
+    summary = BatchEvaluation(str(tmp_path / "in.jsonl"), output, ['m1']).run()
+
+    rows = {row['id']: row for row in _rows(output)}
+    assert set(rows) == {"item-0", "item-1", "item-2"}
+    for i in range(3):
+        assert rows[f"item-{i}"]['winner_prompt_index'] == i + 1
+    assert (summary.completed, summary.failed, summary.skipped) == (3, 0, 0)
+    # 2 + 3 + 4 generated responses, then both orders of every match
+    assert summary.judge_calls == 2 * summary.matches
+    assert summary.usage.calls == 9 + summary.judge_calls
+    assert summary.usage.prompt_tokens > 0
+    assert sum(row['usage']['calls'] for row in rows.values()) == summary.usage.calls
+
+def test_batch_resumes_from_checkpoint(repository, fake_provider, tmp_path):
+    """Test a rerun skips finished items and reuses created tournaments instead of recreating them"""
+    _write_items(tmp_path / "in.jsonl", 2)
+    output = tmp_path / "out.jsonl"
+    BatchEvaluation(str(tmp_path / "in.jsonl"), str(output), ['m1']).run()
+    first, second = _rows(output)
+    # As if the run was interrupted before the second result was written
+    output.write_text(json.dumps(first) + "\n")
+
+    summary = BatchEvaluation(str(tmp_path / "in.jsonl"), str(output), ['m1']).run()
+
+    assert (summary.completed, summary.skipped) == (1, 1)
+    rerun = _rows(output)[-1]
+    assert rerun['winner_prompt_index'] == second['winner_prompt_index']
+    if repository.name == 'postgres':
+        assert summary.usage.calls == 0
+        assert rerun['tournament_id'] == second['tournament_id']
+    else:
+        # Checkpointed ids may name another tournament after a restart, so memory runs recreate
+        assert summary.usage.calls > 0
+
+def test_batch_records_failures_and_retries_them(repository, fake_provider, tmp_path):
+    _write_items(tmp_path / "in.jsonl", 1, format="adaptive")
+    with open(tmp_path / "in.jsonl", 'a') as f:
+        prompts = [{"text": f"p{i}", "model": MODEL} for i in range(20)]
+        f.write(json.dumps({"id": "too-big", "question": "Round robin?", "prompts": prompts, "format": "round_robin"}) + "\n")
+    output = str(tmp_path / "out.jsonl")
+
+    summary = BatchEvaluation(str(tmp_path / "in.jsonl"), output, ['m1']).run()
+    rerun = BatchEvaluation(str(tmp_path / "in.jsonl"), output, ['m1']).run()
+
+    assert (summary.completed, summary.failed) == (1, 1)
+    assert (rerun.completed, rerun.failed, rerun.skipped) == (0, 1, 1)
+    assert "16" in _rows(output)[-1]['error']
+
+def test_batch_rejects_invalid_input(tmp_path):
+    (tmp_path / "in.jsonl").write_text(json.dumps({"question": "No prompts?"}) + "\n")
+
+    with pytest.raises(ValueError, match="in.jsonl:1"):
+        list(BatchEvaluation(str(tmp_path / "in.jsonl"), str(tmp_path / "out.jsonl"), ['m1']).read_items())
+
+def test_batch_memory_backend_rejects_workers(app, monkeypatch, tmp_path):
+    """Test worker processes are refused when each would number its own in-memory tournaments"""
+    monkeypatch.setitem(app.extensions, 'repository', create_repository('memory'))
+    _write_items(tmp_path / "in.jsonl", 1)
+
+    with pytest.raises(ValueError, match="--workers 0"):
+        BatchEvaluation(str(tmp_path / "in.jsonl"), str(tmp_path / "out.jsonl"), ['m1'], workers=2).run()
+
+@pytest.mark.postgres
+def test_batch_process_pool(app, db_session, monkeypatch, tmp_path):
+    """Test worker processes build their own app and share results through the database"""
+    url, stop = serve_in_thread()
+    # Worker processes read their configuration from the environment
+    monkeypatch.setenv('OPENROUTER_BASE_URL', url)
+    monkeypatch.setenv('ADMISSION_ENABLED', 'false')
+    _write_items(tmp_path / "in.jsonl", 4)
+    output = str(tmp_path / "out.jsonl")
+    try:
+        summary = BatchEvaluation(str(tmp_path / "in.jsonl"), output, ['m1'], workers=2).run()
+    finally:
+        stop()
+
+    assert (summary.completed, summary.failed) == (4, 0)
+    assert sorted(row['winner_prompt_index'] for row in _rows(output)) == [1, 2, 3, 4]
+    assert summary.usage.calls == 2 + 3 + 4 + 5 + summary.judge_calls
@@ -0,0 +1,80 @@
+import pytest
+from app.clients.fake_provider import serve_in_thread
+from app.clients.open_router import get_openrouter_client
+from app.core import results_cache
+from app.repositories import create_repository
+from app.services.evaluation_sets import EvaluationSetService
+from app.services.judging import JudgeService
+
+# The fake provider echoes the prompt and its judge prefers the longer response, so the last prompt wins
+PROMPTS = [{"text": "x" * length, "model": "meta-llama/llama-3.1-8b-instruct:free"} for length in (1, 5, 10)]
+QUESTIONS = ["First question?", "Second question?", "Third question?"]
+
+@pytest.fixture(params=['postgres', 'memory'])
+def repository(request, app, db_session):
+    previous = app.extensions['repository']
+    app.extensions['repository'] = create_repository(request.param)
+    results_cache.clear()
+    yield app.extensions['repository']
+    app.extensions['repository'] = previous
+    results_cache.clear()
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    url, stop = serve_in_thread()
+    monkeypatch.setattr(get_openrouter_client(), 'base_url', url)
+    yield url
+    stop()
+
+def test_create_evaluation_set_streams_a_tournament_per_question(repository, fake_provider):
+    progress = [
+        (p.created, p.question, p.tournament_id, p.completions)
+        for p in EvaluationSetService.create_evaluation_set("Tone", QUESTIONS, PROMPTS, 'round_robin', concurrency=4)
+    ]
+
+    assert [created for created, _, _, _ in progress] == [1, 2, 3]
+    assert sorted(question for _, question, _, _ in progress) == sorted(QUESTIONS)
+    assert progress[-1][3] == 9
+    tournament = repository.get_tournament(progress[0][2])
+    assert tournament.format == 'round_robin'
+    assert tournament.evaluation_set_id is not None
+    assert [p.response for p in tournament.prompts] == [
+        f"Fake {PROMPTS[0]['model']} response to: {prompt['text']}" for prompt in PROMPTS
+    ]
+
+def test_rankings_are_summed_across_questions(repository, fake_provider, client):
+    progress = list(EvaluationSetService.create_evaluation_set("Judged", QUESTIONS, PROMPTS))[-1]
+    for tournament_id, _ in repository.evaluation_set_questions(progress.evaluation_set_id):
+        list(JudgeService.judge_tournament(tournament_id, ['m1']))
+
+    results = EvaluationSetService.get_evaluation_set(progress.evaluation_set_id)
+
+    assert [q['question'] for q in results['questions']] == QUESTIONS
+    best = results['rankings'][0]
+    assert (best['prompt_index'], best['win_count'], best['questions_won'], best['mean_win_percentage']) == (2, 3, 3, 100.0)
+    assert [r['questions_won'] for r in results['rankings'][1:]] == [0, 0]
+
+    response = client.get(f"/api/evaluation-sets/{progress.evaluation_set_id}")
+    assert response.status_code == 200
+    assert response.get_json()['rankings'][0]['prompt_index'] == 2
+    assert client.get("/api/evaluation-sets/10000000").status_code == 404
+
+def test_questions_with_failed_completions_get_no_tournament(repository, monkeypatch):
+    url, stop = serve_in_thread(error_rate=1.0)
+    monkeypatch.setattr(get_openrouter_client(), 'base_url', url)
+    try:
+        progress = [
+            (p.evaluation_set_id, p.created, p.failed, p.tournament_id)
+            for p in EvaluationSetService.create_evaluation_set("Failing", QUESTIONS[:2], PROMPTS)
+        ]
+    finally:
+        stop()
+
+    assert [p[1:] for p in progress] == [(0, 1, None), (0, 2, None)]
+    assert repository.evaluation_set_questions(progress[-1][0]) == []
+
+def test_evaluation_sets_use_regular_brackets(repository, app):
+    prompts = [{"text": f"p{i}", "model": PROMPTS[0]['model']} for i in range(app.config['EAGER_RESPONSE_LIMIT'] + 1)]
+
+    with pytest.raises(ValueError, match="at most"):
+        list(EvaluationSetService.create_evaluation_set("Too large", QUESTIONS, prompts))
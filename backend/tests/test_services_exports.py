@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+import pytest
+from app.models import UserTournament, Vote
+from app.services.exports import ExportService, DATASET_COLUMNS
+
+pytestmark = pytest.mark.postgres
+
+class TestExportService:
+
+    @pytest.fixture
+    def voted_tournament(self, db_session, sample_tournament):
+        """Two participants with votes spread over three days"""
+        start = datetime(2024, 3, 1, 12, 0, 0)
+        for offset, user_id in enumerate(["export_user_a", "export_user_b"]):
+            user_tournament = UserTournament(
+                tournament_id=sample_tournament.id,
+                user_id=user_id,
+                completed=offset == 0,
+                winner_prompt_index=0 if offset == 0 else None,
+                started_at=start,
+                completed_at=start + timedelta(days=2) if offset == 0 else None
+            )
+            db_session.add(user_tournament)
+            db_session.flush()
+            for day, (round_number, match_number, winner) in enumerate([(0, 0, 0), (0, 1, 2), (1, 0, 0)]):
+                db_session.add(Vote(
+                    user_tournament_id=user_tournament.id,
+                    round_number=round_number,
+                    match_number=match_number,
+                    winner_index=winner,
+                    created_at=start + timedelta(days=day)
+                ))
+        db_session.commit()
+        return sample_tournament
+
+    def _ndjson(self, *args, **kwargs):
+        body = b''.join(ExportService.stream(*args, **kwargs))
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_export_votes_ndjson(self, voted_tournament, db_session):
+        """Test vote export includes tournament and user of each vote"""
+        rows = self._ndjson('votes', 'ndjson', tournament_id=voted_tournament.id)
+
+        assert len(rows) == 6
+        assert {row['user_id'] for row in rows} == {"export_user_a", "export_user_b"}
+        assert all(row['tournament_id'] == voted_tournament.id for row in rows)
+        assert rows[0]['created_at'] == '2024-03-01T12:00:00'
+
+    def test_export_votes_time_range(self, voted_tournament, db_session):
+        """Test since is inclusive and until is exclusive"""
+        rows = self._ndjson(
+            'votes', 'ndjson',
+            tournament_id=voted_tournament.id,
+            since=datetime(2024, 3, 2, 12, 0, 0),
+            until=datetime(2024, 3, 3, 12, 0, 0)
+        )
+
+        assert len(rows) == 2
+        assert all(row['round_number'] == 0 and row['match_number'] == 1 for row in rows)
+
+    def test_export_batches_are_bounded(self, voted_tournament, db_session):
+        """Test rows come back in batches no larger than the batch size"""
+        batches = list(ExportService.iter_batches('votes', tournament_id=voted_tournament.id, batch_size=4))
+
+        assert [len(batch) for batch in batches] == [4, 2]
+
+    def test_export_user_tournaments_csv(self, voted_tournament, db_session):
+        """Test CSV export has a header and one row per participant"""
+        body = b''.join(ExportService.stream('user_tournaments', 'csv', tournament_id=voted_tournament.id))
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+
+        assert len(rows) == 2
+        completed = next(row for row in rows if row['user_id'] == "export_user_a")
+        assert completed['completed'] == 'True'
+        assert completed['completed_at'] == '2024-03-03T12:00:00'
+
+    def test_export_empty_csv_has_header(self, voted_tournament, db_session):
+        """Test an export without rows still produces the header"""
+        body = b''.join(ExportService.stream(
+            'votes', 'csv', tournament_id=voted_tournament.id, since=datetime(2030, 1, 1)
+        ))
+
+        assert body.decode().strip() == ','.join(name for name, _ in DATASET_COLUMNS['votes'])
+
+    def test_export_rankings(self, voted_tournament, db_session):
+        """Test rankings count only completed brackets"""
+        rows = self._ndjson('rankings', 'ndjson', tournament_id=voted_tournament.id)
+
+        assert [row['prompt_index'] for row in rows] == [0, 1, 2, 3]
+        assert rows[0]['completed_participants'] == 1
+        assert rows[0]['win_count'] == 1
+        assert rows[0]['win_percentage'] == 100.0
+        assert rows[1]['win_percentage'] == 0.0
+
+    def test_export_rejects_unknown_format(self):
+        """Test unsupported formats raise ValueError"""
+        with pytest.raises(ValueError):
+            ExportService.stream('votes', 'xml')
@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import patch
+from app.clients.fake_provider import serve_in_thread
+from app.clients.open_router import get_openrouter_client
+from app.core import admission_controller, results_cache
+from app.core.admission import AdmissionRejected
+from app.repositories import create_repository
+from app.services.judging import JudgeService
+from app.services.tournaments import TournamentService
+
+# The fake provider's judge prefers the longer response, so prompt 3 should win
+PROMPTS = [{"text": f"Prompt {i}", "model": "test-model"} for i in range(5)]
+RESPONSES = ["Short", "A bit longer", "Longer than that one", "The longest response of them all", "Medium one"]
+
+@pytest.fixture(params=['postgres', 'memory'])
+def repository(request, app, db_session):
+    previous = app.extensions['repository']
+    app.extensions['repository'] = create_repository(request.param)
+    results_cache.clear()
+    yield app.extensions['repository']
+    app.extensions['repository'] = previous
+    results_cache.clear()
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    """Point the shared client at a fake provider running in this process"""
+    url, stop = serve_in_thread()
+    monkeypatch.setattr(get_openrouter_client(), 'base_url', url)
+    yield url
+    stop()
+
+def _create_tournament(question, tournament_format='single_elimination', num_prompts=5):
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions", return_value=RESPONSES[:num_prompts]):
+        return TournamentService.create_tournament(question, PROMPTS[:num_prompts], tournament_format)
+
+def test_judge_votes_through_tournament(repository, fake_provider):
+    """Test a judge panel completes the bracket in batches, judging each match twice per model"""
+    tournament = _create_tournament("Judged question?")
+
+    batches = [(p.matches, p.calls) for p in JudgeService.judge_tournament(tournament.id, ['m1', 'm2'], batch_size=2)]
+
+    # Five prompts in a bracket of eight: one first-round match, then two, then the final
+    assert batches[-1] == (4, 16)
+    assert len(batches) == 3
+    user_tournament = repository.get_user_tournament(tournament.id, JudgeService.judge_user_id(['m1', 'm2']))
+    assert user_tournament.completed is True
+    assert user_tournament.winner_prompt_index == 3
+    assert list(JudgeService.judge_tournament(tournament.id, ['m1', 'm2'])) == []
+
+def test_verdicts_are_cached_by_response_pair(repository, fake_provider):
+    """Test a panel reuses verdicts its models already gave on the same response pairs"""
+    tournament = _create_tournament("Cached question?")
+    list(JudgeService.judge_tournament(tournament.id, ['m1']))
+
+    progress = list(JudgeService.judge_tournament(tournament.id, ['m1', 'm2']))[-1]
+
+    assert progress.cached == 2 * progress.matches
+    assert progress.calls == 2 * progress.matches
+    assert progress.winner == 3
+
+def test_judge_through_swiss(repository, fake_provider):
+    """Test formats that pair rounds as they go are judged round by round"""
+    # Without a bye, only the best prompt can win both rounds
+    tournament = _create_tournament("Swiss judged?", 'swiss', num_prompts=4)
+
+    progress = list(JudgeService.judge_tournament(tournament.id, ['m1']))
+
+    assert progress[-1].completed is True
+    assert progress[-1].winner == 3
+
+def test_judge_waits_for_budget_for_large_bracket_waves(repository, fake_provider, app, monkeypatch):
+    """Test the response waves a large bracket generates for the judges wait for budget instead of failing"""
+    monkeypatch.setitem(app.config, 'EAGER_RESPONSE_LIMIT', 4)
+    monkeypatch.setitem(app.config, 'RESPONSE_WAVE_SIZE', 4)
+    monkeypatch.setitem(app.config, 'MATCH_LOOKAHEAD', 2)
+    prompts = [{"text": f"Prompt {i}", "model": "test-model"} for i in range(8)]
+    with patch("app.clients.open_router.OpenRouterClient.generate_completions") as mock_generate:
+        mock_generate.side_effect = lambda data, question, deadline=None: [p['text'] * 2 for p in data]
+        tournament = TournamentService.create_tournament("Large judged?", prompts)
+
+        # An interactive admission would be rejected
+        with patch.object(admission_controller, 'acquire', side_effect=AdmissionRejected('global', 5)):
+            progress = list(JudgeService.judge_tournament(tournament.id, ['m1'], batch_size=2))
+
+    assert progress[-1].completed is True
+    assert mock_generate.call_count > 1
+
+def test_unusable_verdicts_stop_the_run(repository, monkeypatch):
+    url, stop = serve_in_thread(error_rate=1.0)
+    monkeypatch.setattr(get_openrouter_client(), 'base_url', url)
+    tournament = _create_tournament("Failing judge?")
+    try:
+        with pytest.raises(RuntimeError, match="no usable verdicts"):
+            list(JudgeService.judge_tournament(tournament.id, ['m1']))
+    finally:
+        stop()
+
+def test_unknown_tournament(repository):
+    with pytest.raises(ValueError, match="not found"):
+        list(JudgeService.judge_tournament(10_000_000, ['m1']))
+
+@pytest.mark.parametrize('content, verdict', [
+    ("A", 'A'), ("b", 'B'), ("**B**", 'B'), ("Response A is better.", 'A'),
+    ("Both are fine", None), ("[Error: m1 timed out]", None), ("", None),
+])
+def test_parse_verdict(content, verdict):
+    assert JudgeService.parse_verdict(content) == verdict
@@ -0,0 +1,70 @@
+import random
+import pytest
+from unittest.mock import patch
+from app.repositories import create_repository
+from app.services.scheduler import MatchScheduler, PairwiseEstimates
+
+def test_update_moves_strengths_and_certainty():
+    """Test a result raises the winner, lowers the loser and makes both more certain"""
+    estimates = PairwiseEstimates(3)
+
+    estimates.update(2, 0)
+
+    assert estimates.scores[2] > 0 > estimates.scores[0]
+    assert estimates.scores[1] == 0
+    assert estimates.precisions[2] == estimates.precisions[0] > estimates.precisions[1]
+    assert estimates.ranking()[0] == 2
+
+def test_choose_prefers_uncertain_close_pairs():
+    """Test the least certain prompt is paired with an unseen, evenly matched opponent"""
+    estimates = PairwiseEstimates(4)
+    estimates.scores = [3.0, 0.1, 0.0, -3.0]
+    estimates.precisions = [50.0, 50.0, 1.0, 50.0]
+    rng = random.Random(0)
+
+    assert set(estimates.choose(set(), rng)) == {1, 2}
+    assert set(estimates.choose({frozenset((1, 2))}, rng)) != {1, 2}
+    every_pair = {frozenset((a, b)) for a in range(4) for b in range(a + 1, 4)}
+    assert estimates.choose(every_pair, rng) is None
+
+def test_opening_is_fixed_per_voter():
+    scheduler = MatchScheduler()
+
+    first = scheduler.opening(1, 8, "voter")
+
+    assert scheduler.opening(1, 8, "voter") == first
+    assert len(set(first)) == 2 and set(first) <= set(range(8))
+
+def test_workers_share_results_through_the_repository(app, monkeypatch):
+    """Test each worker persists its results on sync and folds in the others' exactly once"""
+    monkeypatch.setitem(app.config, 'ADAPTIVE_SYNC_INTERVAL', 3600)
+    monkeypatch.setitem(app.extensions, 'repository', create_repository('memory'))
+    first, second = MatchScheduler(), MatchScheduler()
+
+    first.record(1, 4, 0, 1)
+    first.record(1, 4, 0, 1)
+    second.record(1, 4, 2, 3)
+    assert app.extensions['repository'].pairwise_results(1, None)[0] == []
+
+    first.sync(1)
+    second.sync(1)
+    first.sync(1)
+    expected = PairwiseEstimates(4)
+    expected.update(0, 1, count=2)
+    expected.update(2, 3)
+    for scheduler in (first, second):
+        assert scheduler.estimates(1, 4).precisions == expected.precisions
+
+def test_failed_sync_keeps_results_pending(app, monkeypatch):
+    """Test results that could not be persisted are retried on the next sync"""
+    monkeypatch.setitem(app.config, 'ADAPTIVE_SYNC_INTERVAL', 3600)
+    repository = create_repository('memory')
+    monkeypatch.setitem(app.extensions, 'repository', repository)
+    scheduler = MatchScheduler()
+    scheduler.record(1, 4, 0, 1)
+
+    with patch.object(repository, 'add_pairwise_results', side_effect=RuntimeError("down")):
+        scheduler.sync(1)
+    scheduler.sync(1)
+
+    assert repository.pairwise_results(1, None)[0] == [(0, 1, 1)]
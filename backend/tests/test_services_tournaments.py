@@ -1,8 +1,29 @@
+import random
+import string
 import pytest
 from unittest.mock import patch, MagicMock
-from app.models import Tournament, TournamentPrompt, UserTournament, Vote
+from app.models import Tournament, TournamentPrompt
+from app.formats.single_elimination import SingleElimination
+from app.repositories import get_repository
 from app.services.tournaments import TournamentService
 
+def _add_tournament(question, responses, bracket_template):
+    return get_repository().add_tournament(question, bracket_template, [
+        {'position': i, 'text': f"Option {i}", 'model': "test-model", 'response': response}
+        for i, response in enumerate(responses)
+    ])
+
+def _play(tournament, user_id, winner=None):
+    """Vote through a bracket, picking winner whenever it plays and the first participant otherwise"""
+    _, _, bracket = TournamentService.get_tournament_with_user_state(tournament.id, user_id)
+    completed = False
+    while not completed:
+        match = TournamentService.get_next_match_details(tournament, bracket)
+        pick = winner if winner in (match['participant1']['index'], match['participant2']['index']) \
+            else match['participant1']['index']
+        bracket, completed, _ = TournamentService.record_vote(tournament, user_id, match['round'], match['match'], pick)
+    return bracket
+
 class TestTournamentService:
     
     @patch("app.clients.open_router.OpenRouterClient.generate_completions")
@@ -22,11 +43,11 @@ class TestTournamentService:
         assert tournament.question == question
         assert len(tournament.prompts) == 3
         
-        saved_tournament = Tournament.query.get(tournament.id)
+        saved_tournament = get_repository().get_tournament(tournament.id)
         assert saved_tournament is not None
         assert len(saved_tournament.bracket_template) == 2
         
-        tournament_prompts = TournamentPrompt.query.filter_by(tournament_id=tournament.id).all()
+        tournament_prompts = saved_tournament.prompts
         assert len(tournament_prompts) == 3
         assert tournament_prompts[0].text == "Prompt 1"
         assert tournament_prompts[0].response == "Response 1"
@@ -60,17 +81,8 @@ class TestTournamentService:
 
     def test_get_tournament_with_user_state_existing_user(self, sample_tournament, db_session):
         """Test getting tournament state for existing user"""
-        user_tournament = UserTournament(
-            tournament_id=sample_tournament.id,
-            user_id="existing_user",
-            current_bracket=[
-                [{"participant1": 0, "participant2": 1, "winner": 1}],
-                [{"participant1": None, "participant2": None, "winner": None}]
-            ],
-            completed=False
-        )
-        db_session.add(user_tournament)
-        db_session.commit()
+        TournamentService.record_vote(sample_tournament, "existing_user", 0, 0, 1)
+        user_tournament = get_repository().get_user_tournament(sample_tournament.id, "existing_user")
         
         tournament, returned_user_tournament, user_bracket = TournamentService.get_tournament_with_user_state(
             sample_tournament.id, "existing_user"
@@ -136,62 +148,32 @@ class TestTournamentService:
         assert user_bracket is not None
         assert user_bracket[0][0]['winner'] == 1
         
-        user_tournament = UserTournament.query.filter_by(
-            tournament_id=sample_tournament.id,
-            user_id="test_user_456"
-        ).first()
+        user_tournament = get_repository().get_user_tournament(sample_tournament.id, "test_user_456")
         assert user_tournament is not None
         
-        vote = Vote.query.filter_by(user_tournament_id=user_tournament.id).first()
-        assert vote is not None
-        assert vote.winner_index == 1
+        assert get_repository().has_vote(user_tournament, 0, 0)
+        assert not get_repository().has_vote(user_tournament, 0, 1)
+        assert user_tournament.get_bracket()[0][0]['winner'] == 1
 
     def test_record_vote_creates_new_user_tournament(self, sample_tournament, db_session):
         """Test that record_vote creates UserTournament for new users"""
-        existing = UserTournament.query.filter_by(
-            tournament_id=sample_tournament.id,
-            user_id="brand_new_user"
-        ).first()
+        existing = get_repository().get_user_tournament(sample_tournament.id, "brand_new_user")
         assert existing is None
         
         user_bracket, completed, winner = TournamentService.record_vote(
             sample_tournament, "brand_new_user", 0, 0, 1
         )
         
-        user_tournament = UserTournament.query.filter_by(
-            tournament_id=sample_tournament.id,
-            user_id="brand_new_user"
-        ).first()
+        user_tournament = get_repository().get_user_tournament(sample_tournament.id, "brand_new_user")
         assert user_tournament is not None
         assert user_tournament.completed is False
 
     def test_record_vote_final_match(self, db_session):
         """Test recording vote that completes tournament"""
-        final_tournament = Tournament(
-            question="Final question?",
-            bracket_template=[
-                [{"participant1": 0, "participant2": 1, "winner": None}]
-            ]
+        final_tournament = _add_tournament(
+            "Final question?", ["Response A", "Response B"],
+            [[{"participant1": 0, "participant2": 1, "winner": None}]]
         )
-        db_session.add(final_tournament)
-        db_session.flush()
-        
-        prompt_a = TournamentPrompt(
-            tournament_id=final_tournament.id,
-            position=0,
-            text="Option A",
-            response="Response A",
-            model="test-model"
-        )
-        prompt_b = TournamentPrompt(
-            tournament_id=final_tournament.id,
-            position=1,
-            text="Option B",
-            response="Response B",
-            model="test-model"
-        )
-        db_session.add_all([prompt_a, prompt_b])
-        db_session.commit()
         
         user_bracket, completed, winner = TournamentService.record_vote(
             final_tournament, "final_user", 0, 0, 1
@@ -200,14 +182,36 @@ class TestTournamentService:
         assert completed is True
         assert winner == 1
         
-        user_tournament = UserTournament.query.filter_by(
-            tournament_id=final_tournament.id,
-            user_id="final_user"
-        ).first()
+        user_tournament = get_repository().get_user_tournament(final_tournament.id, "final_user")
         assert user_tournament.completed is True
         assert user_tournament.winner_prompt_index == 1
         assert user_tournament.completed_at is not None
 
+    def test_get_next_match_details(self, sample_tournament, db_session):
+        """Test next match details include both participants inline"""
+        user_bracket, _, _ = TournamentService.record_vote(
+            sample_tournament, "next_match_user", 0, 0, 1
+        )
+        
+        next_match = TournamentService.get_next_match_details(sample_tournament, user_bracket)
+        
+        assert next_match['round'] == 0
+        assert next_match['match'] == 1
+        assert next_match['participant1'] == {
+            'index': 2, 'prompt': "Go is fast", 'response': "Go response",
+            'model': "mistralai/mistral-7b-instruct:free"
+        }
+        assert next_match['participant2']['index'] == 3
+        assert next_match['participant2']['response'] == "Rust response"
+
+    def test_get_next_match_details_completed_bracket(self, sample_tournament, db_session):
+        """Test next match details are empty once nothing is left to vote on"""
+        bracket = [
+            [{"participant1": 0, "participant2": 1, "winner": 0}]
+        ]
+        
+        assert TournamentService.get_next_match_details(sample_tournament, bracket) is None
+
     def test_record_vote_duplicate_vote(self, sample_tournament, db_session):
         """Test that duplicate votes are prevented"""
         # First vote
@@ -219,27 +223,9 @@ class TestTournamentService:
 
     def test_get_prompt_rankings(self, sample_tournament_with_prompts, db_session):
         """Test getting tournament results"""
-        user_tournament1 = UserTournament(
-            tournament_id=sample_tournament_with_prompts.id,
-            user_id="user1",
-            completed=True,
-            winner_prompt_index=0
-        )
-        user_tournament2 = UserTournament(
-            tournament_id=sample_tournament_with_prompts.id,
-            user_id="user2",
-            completed=True,
-            winner_prompt_index=1
-        )
-        user_tournament3 = UserTournament(
-            tournament_id=sample_tournament_with_prompts.id,
-            user_id="user3",
-            completed=True,
-            winner_prompt_index=0
-        )
-        
-        db_session.add_all([user_tournament1, user_tournament2, user_tournament3])
-        db_session.commit()
+        _play(sample_tournament_with_prompts, "user1", winner=0)
+        _play(sample_tournament_with_prompts, "user2", winner=1)
+        _play(sample_tournament_with_prompts, "user3", winner=0)
         
         results = TournamentService.get_prompt_rankings(sample_tournament_with_prompts.id)
         
@@ -251,16 +237,9 @@ class TestTournamentService:
 
     def test_get_participation_stats(self, sample_tournament, db_session):
         """Test getting tournament statistics"""
-        users = ["user1", "user2", "user3"]
-        for i, user_id in enumerate(users):
-            user_tournament = UserTournament(
-                tournament_id=sample_tournament.id,
-                user_id=user_id,
-                completed=(i < 2)
-            )
-            db_session.add(user_tournament)
-        
-        db_session.commit()
+        _play(sample_tournament, "user1")
+        _play(sample_tournament, "user2")
+        TournamentService.record_vote(sample_tournament, "user3", 0, 0, 0)
         
         stats = TournamentService.get_participation_stats(sample_tournament.id)
         
@@ -270,33 +249,11 @@ class TestTournamentService:
 
     def test_get_tournaments_list(self, db_session):
         """Test getting tournaments list"""
-        tournament1 = Tournament(
-            question="Question 1?",
-            bracket_template=[[{"participant1": 0, "participant2": 1, "winner": None}]]
-        )
-        tournament2 = Tournament(
-            question="Very long question " + "x" * 100,
-            bracket_template=[[{"participant1": 0, "participant2": 1, "winner": None}]]
-        )
-        
-        db_session.add_all([tournament1, tournament2])
-        db_session.flush()
-        
-        prompt1a = TournamentPrompt(tournament_id=tournament1.id, position=0, text="A", response="RA", model="test-model")
-        prompt1b = TournamentPrompt(tournament_id=tournament1.id, position=1, text="B", response="RB", model="test-model")
-        prompt2a = TournamentPrompt(tournament_id=tournament2.id, position=0, text="X", response="RX", model="test-model")
-        prompt2b = TournamentPrompt(tournament_id=tournament2.id, position=1, text="Y", response="RY", model="test-model")
-        prompt2c = TournamentPrompt(tournament_id=tournament2.id, position=2, text="Z", response="RZ", model="test-model")
+        bracket_template = [[{"participant1": 0, "participant2": 1, "winner": None}]]
+        tournament1 = _add_tournament("Question 1?", ["RA", "RB"], bracket_template)
+        tournament2 = _add_tournament("Very long question " + "x" * 100, ["RX", "RY", "RZ"], bracket_template)
         
-        db_session.add_all([prompt1a, prompt1b, prompt2a, prompt2b, prompt2c])
-        
-        user_tournament = UserTournament(
-            tournament_id=tournament1.id,
-            user_id="user1",
-            completed=True
-        )
-        db_session.add(user_tournament)
-        db_session.commit()
+        _play(tournament1, "user1")
         
         results = TournamentService.get_tournaments_list()
         
@@ -323,10 +280,10 @@ class TestTournamentService:
             ]
         ]
         
-        TournamentService._advance_winner_in_bracket(bracket, 0, 0, 1)
+        SingleElimination.advance_winner(bracket, 0, 0, 1)
         assert bracket[1][0]['participant1'] == 1
         
-        TournamentService._advance_winner_in_bracket(bracket, 0, 1, 3)
+        SingleElimination.advance_winner(bracket, 0, 1, 3)
         assert bracket[1][0]['participant2'] == 3
 
     def test_advance_winner_final_round(self):
@@ -338,4 +295,64 @@ class TestTournamentService:
         ]
         
         # Should not raise exception
-        TournamentService._advance_winner_in_bracket(bracket, 0, 0, 1)
+        SingleElimination.advance_winner(bracket, 0, 0, 1)
+
+@pytest.mark.postgres
+class TestTournamentSearch:
+    
+    @pytest.fixture
+    def search_term(self):
+        """Made-up word so matches from other tests' data cannot interfere"""
+        return 'vacuum' + ''.join(random.choices(string.ascii_lowercase, k=8))
+
+    @pytest.fixture
+    def searchable_tournaments(self, db_session, search_term):
+        """Tournaments with the search term in a question, a response and nowhere"""
+        question_hit = Tournament(question=f"How should I tune PostgreSQL {search_term} settings?", bracket_template=[])
+        response_hit = Tournament(question="Best database maintenance tips?", bracket_template=[])
+        unrelated = Tournament(question="What is the best pizza topping?", bracket_template=[])
+        db_session.add_all([question_hit, response_hit, unrelated])
+        db_session.flush()
+        
+        db_session.add_all([
+            TournamentPrompt(tournament_id=question_hit.id, position=0, text="Be concise", model="test-model",
+                             response="Lower autovacuum thresholds on busy tables."),
+            TournamentPrompt(tournament_id=response_hit.id, position=0, text="Act as a DBA", model="test-model",
+                             response=f"Schedule {search_term} during quiet hours and watch bloat."),
+            TournamentPrompt(tournament_id=response_hit.id, position=1, text="Be brief", model="other-model",
+                             response="Reindex occasionally."),
+            TournamentPrompt(tournament_id=unrelated.id, position=0, text="Be fun", model="test-model",
+                             response="Pineapple, obviously.")
+        ])
+        db_session.commit()
+        return question_hit, response_hit, unrelated
+
+    def test_search_ranks_question_matches_first(self, searchable_tournaments, search_term, db_session):
+        """Test search finds questions and responses, ranking question hits higher"""
+        question_hit, response_hit, _ = searchable_tournaments
+        
+        results = TournamentService.search_tournaments(search_term)
+        
+        assert results['total'] == 2
+        assert [r['id'] for r in results['results']] == [question_hit.id, response_hit.id]
+        assert f'<mark>{search_term}</mark>' in results['results'][0]['question_highlight']
+        
+        response_matches = results['results'][1]['matches']
+        assert len(response_matches) == 1
+        assert response_matches[0]['prompt_index'] == 0
+        assert f'<mark>{search_term}</mark>' in response_matches[0]['response']
+
+    def test_search_paginates(self, searchable_tournaments, search_term, db_session):
+        """Test search pagination keeps the total across pages"""
+        _, response_hit, _ = searchable_tournaments
+        
+        results = TournamentService.search_tournaments(search_term, page=2, per_page=1)
+        
+        assert results['total'] == 2
+        assert [r['id'] for r in results['results']] == [response_hit.id]
+
+    def test_search_without_matches(self, searchable_tournaments, search_term, db_session):
+        """Test search with no hits returns an empty page"""
+        results = TournamentService.search_tournaments(search_term[::-1])
+        
+        assert results == {'results': [], 'total': 0, 'page': 1, 'per_page': 20}
@@ -1,3 +1,4 @@
+import pytest
 from app import utils
 
 def test_create_bracket_basic():
@@ -171,4 +172,102 @@ def test_bracket_structure_consistency():
         # Verify correct number of byes
         bye_count = all_participants.count(-1)
         expected_byes = bracket_size - num_prompts
-        assert bye_count == expected_byes
\ No newline at end of file
+        assert bye_count == expected_byes
+
+def test_find_next_votable_match():
+    """Test next votable match skips decided and incomplete matches"""
+    bracket = [
+        [
+            {"participant1": 0, "participant2": 1, "winner": 1},
+            {"participant1": 2, "participant2": 3, "winner": None}
+        ],
+        [
+            {"participant1": 1, "participant2": None, "winner": None}
+        ]
+    ]
+    
+    assert utils.find_next_votable_match(bracket) == (0, 1)
+    
+    bracket[0][1]['winner'] = 3
+    bracket[1][0]['participant2'] = 3
+    assert utils.find_next_votable_match(bracket) == (1, 0)
+    
+    bracket[1][0]['winner'] = 1
+    assert utils.find_next_votable_match(bracket) is None
+
+def test_diff_brackets_only_reports_changed_fields():
+    """Test bracket diff produces replace operations for changed fields only"""
+    old_bracket = [
+        [
+            {"participant1": 0, "participant2": 1, "winner": None},
+            {"participant1": 2, "participant2": 3, "winner": None}
+        ],
+        [
+            {"participant1": None, "participant2": None, "winner": None}
+        ]
+    ]
+    new_bracket = [
+        [
+            {"participant1": 0, "participant2": 1, "winner": 1},
+            {"participant1": 2, "participant2": 3, "winner": None}
+        ],
+        [
+            {"participant1": 1, "participant2": None, "winner": None}
+        ]
+    ]
+    
+    patch = utils.diff_brackets(old_bracket, new_bracket)
+    
+    assert patch == [
+        {'op': 'replace', 'path': '/0/0/winner', 'value': 1},
+        {'op': 'replace', 'path': '/1/0/participant1', 'value': 1}
+    ]
+    assert utils.diff_brackets(new_bracket, new_bracket) == []
+
+def test_bracket_winners_round_trip():
+    """Test a decided bracket survives the compact winners encoding"""
+    for num_prompts in (2, 3, 5, 8, 13):
+        bracket = utils.create_bracket(list(range(num_prompts)))
+        template = [[dict(match) for match in round_matches] for round_matches in bracket]
+        while (next_match := utils.find_next_votable_match(bracket)) is not None:
+            round_num, match_num = next_match
+            match = bracket[round_num][match_num]
+            match['winner'] = match['participant2']
+            if round_num + 1 < len(bracket):
+                slot = 'participant1' if match_num % 2 == 0 else 'participant2'
+                bracket[round_num + 1][match_num // 2][slot] = match['winner']
+
+        encoded = utils.encode_bracket_winners(bracket)
+
+        assert len(encoded) == 2 * sum(len(round_matches) for round_matches in bracket)
+        assert utils.decode_bracket_winners(template, encoded) == bracket
+
+def test_encode_bracket_winners_requires_decided_bracket():
+    """Test undecided brackets are rejected"""
+    bracket = [[{'participant1': 0, 'participant2': 1, 'winner': None}]]
+    with pytest.raises(ValueError, match="fully decided"):
+        utils.encode_bracket_winners(bracket)
+
+def test_bracket_from_seeding():
+    """Test the compact seeding rebuilds the bracket it came from"""
+    seeding = utils.create_seeding(13)
+    bracket = utils.bracket_from_seeding(seeding)
+
+    assert utils.decode_seeding(utils.encode_seeding(seeding)) == seeding
+    assert [p for match in bracket[0] for p in (match['participant1'], match['participant2'])] == seeding
+    assert len(bracket) == 4
+
+def test_partial_bracket_winners_round_trip():
+    """Test a bracket in progress survives the compact winners encoding"""
+    template = utils.bracket_from_seeding(utils.create_seeding(100))
+    bracket = [[dict(match) for match in round_matches] for round_matches in template]
+    for round_num, match_num in list(utils.iter_votable_matches(bracket))[:40]:
+        match = bracket[round_num][match_num]
+        match['winner'] = match['participant1']
+        slot = 'participant1' if match_num % 2 == 0 else 'participant2'
+        bracket[round_num + 1][match_num // 2][slot] = match['winner']
+
+    encoded = utils.encode_bracket_winners(bracket, partial=True)
+
+    assert utils.decode_bracket_winners(template, encoded) == bracket
+    assert next(utils.iter_votable_matches(bracket)) == utils.find_next_votable_match(bracket)
@@ -0,0 +1,59 @@
+import { memo } from 'react';
+import { Link } from 'react-router-dom';
+import { TournamentSearchResult } from '../types';
+import * as Styled from '../styles';
+
+interface HighlightedTextProps {
+  text: string;
+}
+
+// Render server-side <mark> markers as elements without injecting HTML
+const HighlightedText = ({ text }: HighlightedTextProps) => (
+  <>
+    {text
+      .split(/(<mark>.*?<\/mark>)/g)
+      .map((part, index) =>
+        part.startsWith('<mark>') ? (
+          <mark key={index}>{part.slice(6, -7)}</mark>
+        ) : (
+          part
+        )
+      )}
+  </>
+);
+
+interface SearchResultCardProps {
+  result: TournamentSearchResult;
+}
+
+export const SearchResultCard = memo<SearchResultCardProps>(({ result }) => (
+  <Styled.HistoryCard>
+    <Styled.HistoryInfo>
+      <Styled.HistoryQuestion>
+        <HighlightedText text={result.question_highlight} />
+      </Styled.HistoryQuestion>
+      {result.matches.map((match) => (
+        <Styled.SearchSnippet key={match.prompt_index}>
+          <Styled.HistoryChip>{match.model}</Styled.HistoryChip>{' '}
+          <HighlightedText text={match.text} />
+          {match.response.includes('<mark>') && (
+            <>
+              {' — '}
+              <HighlightedText text={match.response} />
+            </>
+          )}
+        </Styled.SearchSnippet>
+      ))}
+      <Styled.HistoryDate>
+        Created: {new Date(result.created_at).toLocaleDateString()}
+      </Styled.HistoryDate>
+    </Styled.HistoryInfo>
+    <Styled.HistoryActions>
+      <Link to={`${result.id}`}>
+        <Styled.SmallButton>View</Styled.SmallButton>
+      </Link>
+    </Styled.HistoryActions>
+  </Styled.HistoryCard>
+));
+
+SearchResultCard.displayName = 'SearchResultCard';
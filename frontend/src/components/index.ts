@@ -6,5 +6,6 @@ export { MatchParticipant } from './MatchParticipant';
 export { BracketMatch } from './BracketMatch';
 export { TournamentResultsSection } from './TournamentResultsSection';
 export { TournamentCard } from './TournamentCard';
+export { SearchResultCard } from './SearchResultCard';
 export { EmptyState } from './EmptyState';
 export { MultiModelSelector } from './MultiModelSelector';
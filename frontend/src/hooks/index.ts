@@ -1,5 +1,7 @@
 export * from './useTournaments';
+export * from './useTournamentSearch';
 export * from './useTournament';
+export * from './useTournamentResultsStream';
 export * from './useCreateTournament';
 export * from './useRecordVote';
 export * from './useAvailableModels';
@@ -1,16 +1,42 @@
 import { useMutation, useQueryClient } from '@tanstack/react-query';
-import { VoteRequest, VoteResponse } from '../types';
+import { Tournament, VoteDeltaResponse, VoteRequest } from '../types';
 import { tournamentApi } from '../services';
+import { applyBracketPatch } from '../utils';
 
 export const useRecordVote = (tournamentId: number) => {
   const queryClient = useQueryClient();
 
-  return useMutation<VoteResponse, Error, VoteRequest>({
+  return useMutation<VoteDeltaResponse, Error, VoteRequest>({
     mutationFn: (voteRequest) =>
       tournamentApi.recordVote(tournamentId, voteRequest),
-    onSuccess: () => {
-      // Invalidate tournament data to get fresh bracket state
-      queryClient.invalidateQueries({ queryKey: ['tournament', tournamentId] });
+    onSuccess: (data) => {
+      // Apply the bracket delta locally instead of refetching the tournament
+      queryClient.setQueriesData<Tournament>(
+        { queryKey: ['tournament', tournamentId] },
+        (tournament) =>
+          tournament && {
+            ...tournament,
+            user_bracket: applyBracketPatch(
+              tournament.user_bracket,
+              data.patch
+            ),
+            user_state: {
+              completed: data.completed,
+              winner_prompt_index: data.winner_prompt_index,
+              next_match: data.next_match
+                ? [data.next_match.round, data.next_match.match]
+                : null,
+            },
+          }
+      );
+
+      // Rankings only change once a bracket is completed, and a pending next
+      // match is fetched with the tournament once its responses exist
+      if (data.completed || data.next_match_pending) {
+        queryClient.invalidateQueries({
+          queryKey: ['tournament', tournamentId],
+        });
+      }
       queryClient.invalidateQueries({ queryKey: ['tournaments'] });
     },
   });
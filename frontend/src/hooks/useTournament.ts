@@ -9,8 +9,10 @@ export const useTournament = (
   return useQuery<Tournament>({
     queryKey: ['tournament', tournamentId, includeResults],
     queryFn: () => tournamentApi.loadTournament(tournamentId, includeResults),
-    staleTime: 0, // Always fetch fresh data for voting updates
-    refetchOnWindowFocus: true,
+    // Results are pushed by useTournamentResultsStream and votes patch the
+    // cache, so results views don't need to refetch on focus
+    staleTime: includeResults ? Infinity : 0,
+    refetchOnWindowFocus: !includeResults,
     enabled: !!tournamentId,
   });
 };
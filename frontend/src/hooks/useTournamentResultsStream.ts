@@ -0,0 +1,52 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { tournamentApi } from '../services';
+import { ResultsUpdate, Tournament } from '../types';
+
+const RESULTS_POLL_INTERVAL_MS = 15000;
+
+export const useTournamentResultsStream = (tournamentId: number) => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!tournamentId) return;
+
+    const source = new EventSource(
+      tournamentApi.resultsStreamUrl(tournamentId),
+      { withCredentials: true }
+    );
+
+    source.addEventListener('results', (event) => {
+      const update: ResultsUpdate = JSON.parse((event as MessageEvent).data);
+      queryClient.setQueryData<Tournament>(
+        ['tournament', tournamentId, true],
+        (tournament) =>
+          tournament && {
+            ...tournament,
+            rankings: update.rankings,
+            stats: update.stats,
+          }
+      );
+      queryClient.invalidateQueries({ queryKey: ['tournaments'] });
+    });
+
+    // A server at its stream limit refuses the connection, which closes the
+    // source for good, so fall back to refetching the results periodically
+    let pollTimer: ReturnType<typeof setInterval> | undefined;
+    source.addEventListener('error', () => {
+      if (source.readyState !== EventSource.CLOSED || pollTimer) return;
+      pollTimer = setInterval(
+        () =>
+          queryClient.invalidateQueries({
+            queryKey: ['tournament', tournamentId, true],
+          }),
+        RESULTS_POLL_INTERVAL_MS
+      );
+    });
+
+    return () => {
+      source.close();
+      clearInterval(pollTimer);
+    };
+  }, [tournamentId, queryClient]);
+};
@@ -0,0 +1,16 @@
+import { keepPreviousData, useQuery } from '@tanstack/react-query';
+import { TournamentSearchResponse } from '../types';
+import { tournamentApi } from '../services';
+
+export const useTournamentSearch = (query: string, page: number = 1) => {
+  const trimmedQuery = query.trim();
+
+  return useQuery<TournamentSearchResponse, Error>({
+    queryKey: ['tournamentSearch', trimmedQuery, page],
+    queryFn: () => tournamentApi.searchTournaments(trimmedQuery, page),
+    enabled: trimmedQuery.length > 0,
+    staleTime: 30 * 1000, // 30 seconds
+    placeholderData: keepPreviousData,
+    refetchOnWindowFocus: false,
+  });
+};
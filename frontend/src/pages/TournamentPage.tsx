@@ -1,5 +1,5 @@
 import { useCallback, useEffect, useState, useMemo } from 'react';
-import { VoteRequest } from '../types';
+import { NextMatch, VoteRequest } from '../types';
 import { findNextVotableMatch, getCurrentMatchFromState } from '../utils';
 import { useParams } from 'react-router-dom';
 import {
@@ -10,7 +10,11 @@ import {
   TournamentHeader,
   EmptyState,
 } from '../components';
-import { useTournament, useRecordVote } from '../hooks';
+import {
+  useTournament,
+  useRecordVote,
+  useTournamentResultsStream,
+} from '../hooks';
 
 export const TournamentPage = () => {
   const { id } = useParams<{ id: string }>();
@@ -18,20 +22,29 @@ export const TournamentPage = () => {
 
   const [isVotingModalOpen, setIsVotingModalOpen] = useState(false);
   const [userWantsToVote, setUserWantsToVote] = useState(false);
+  const [inlineNextMatch, setInlineNextMatch] = useState<NextMatch | null>(
+    null
+  );
 
   const {
     data: tournament,
     isLoading,
     isError,
-    refetch: refetchTournament,
   } = useTournament(tournamentId, true);
 
+  useTournamentResultsStream(tournamentId);
+
   const { mutate: recordVote, isPending: isVoting } =
     useRecordVote(tournamentId);
 
   const currentMatch = useMemo(() => {
     if (!tournament) return null;
 
+    // The vote response already carries the next match with its responses
+    if (inlineNextMatch) {
+      return inlineNextMatch;
+    }
+
     if (tournament.user_state.next_match) {
       const match = getCurrentMatchFromState(
         tournament.user_state.next_match,
@@ -61,7 +74,7 @@ export const TournamentPage = () => {
     }
 
     return null;
-  }, [tournament]);
+  }, [tournament, inlineNextMatch]);
 
   useEffect(() => {
     if (
@@ -107,8 +120,8 @@ export const TournamentPage = () => {
       };
 
       recordVote(voteRequest, {
-        onSuccess: () => {
-          refetchTournament();
+        onSuccess: (data) => {
+          setInlineNextMatch(data.next_match);
           setIsVotingModalOpen(false);
         },
         onError: (error) => {
@@ -117,7 +130,7 @@ export const TournamentPage = () => {
         },
       });
     },
-    [tournament, recordVote, isVoting, currentMatch, refetchTournament]
+    [tournament, recordVote, isVoting, currentMatch]
   );
 
   if (isLoading) {
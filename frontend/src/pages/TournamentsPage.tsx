@@ -1,11 +1,39 @@
+import { useEffect, useState } from 'react';
 import * as Styled from '../styles';
-import { useTournaments } from '../hooks';
-import { EmptyState, Loader, TournamentCard } from '../components';
+import { useTournaments, useTournamentSearch } from '../hooks';
+import {
+  EmptyState,
+  Loader,
+  SearchResultCard,
+  TournamentCard,
+} from '../components';
+
+const SEARCH_DEBOUNCE_MS = 300;
 
 export const TournamentsPage = () => {
   const { data, isLoading, error } = useTournaments();
   const tournaments = data?.tournaments ?? [];
 
+  const [searchInput, setSearchInput] = useState('');
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchPage, setSearchPage] = useState(1);
+
+  useEffect(() => {
+    const timeout = setTimeout(() => {
+      setSearchQuery(searchInput.trim());
+      setSearchPage(1);
+    }, SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timeout);
+  }, [searchInput]);
+
+  const { data: searchData, isFetching: isSearching } = useTournamentSearch(
+    searchQuery,
+    searchPage
+  );
+  const totalPages = searchData
+    ? Math.ceil(searchData.total / searchData.per_page)
+    : 0;
+
   if (isLoading) {
     return <Loader text="Loading tournaments..." />;
   }
@@ -28,7 +56,47 @@ export const TournamentsPage = () => {
         </Styled.PrimaryLinkButton>
       </Styled.PageHeader>
 
-      {tournaments.length === 0 ? (
+      <Styled.SearchInput
+        type="search"
+        placeholder="Search questions, prompts and responses..."
+        value={searchInput}
+        onChange={(event) => setSearchInput(event.target.value)}
+      />
+
+      {searchQuery ? (
+        !searchData ? (
+          <Loader text="Searching..." />
+        ) : searchData.results.length === 0 ? (
+          <EmptyState
+            title="No matches"
+            description={`No tournaments match "${searchQuery}".`}
+          />
+        ) : (
+          <>
+            <Styled.TournamentGrid>
+              {searchData.results.map((result) => (
+                <SearchResultCard key={result.id} result={result} />
+              ))}
+            </Styled.TournamentGrid>
+            {totalPages > 1 && (
+              <Styled.ButtonGroup>
+                <Styled.SecondaryButton
+                  disabled={searchPage <= 1 || isSearching}
+                  onClick={() => setSearchPage((page) => page - 1)}
+                >
+                  Previous
+                </Styled.SecondaryButton>
+                <Styled.SecondaryButton
+                  disabled={searchPage >= totalPages || isSearching}
+                  onClick={() => setSearchPage((page) => page + 1)}
+                >
+                  Next
+                </Styled.SecondaryButton>
+              </Styled.ButtonGroup>
+            )}
+          </>
+        )
+      ) : tournaments.length === 0 ? (
         <EmptyState
           title="No tournaments yet"
           description="Create your first tournament to get started with prompt competitions!"
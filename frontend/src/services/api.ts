@@ -1,9 +1,12 @@
 import {
   Tournament,
+  TournamentContent,
+  TournamentState,
   TournamentSummary,
+  TournamentSearchResponse,
   CreateTournamentRequest,
   VoteRequest,
-  VoteResponse,
+  VoteDeltaResponse,
   AvailableModels,
 } from '../types';
 
@@ -32,22 +35,42 @@ class TournamentApi {
     this.request<AvailableModels>('/tournaments/models');
   fetchTournaments = () => this.request<TournamentSummary[]>('/tournaments');
 
+  searchTournaments = (query: string, page = 1) => {
+    const params = new URLSearchParams({ q: query, page: String(page) });
+    return this.request<TournamentSearchResponse>(
+      `/tournaments/search?${params}`
+    );
+  };
+
   createTournament = (request: CreateTournamentRequest) =>
     this.request<Tournament>('/tournaments', {
       method: 'POST',
       body: JSON.stringify(request),
     });
 
-  loadTournament = (tournamentId: number, includeResults = false) =>
-    this.request<Tournament>(
-      `/tournaments/${tournamentId}${includeResults ? '?include_results=true' : ''}`
-    );
+  // The content is the same for every user, so it is served precompressed and
+  // cached by the browser; only the small per-user state is fetched each time
+  loadTournament = async (tournamentId: number, includeResults = false) => {
+    const [content, state] = await Promise.all([
+      this.request<TournamentContent>(`/tournaments/${tournamentId}/content`),
+      this.request<TournamentState>(
+        `/tournaments/${tournamentId}/state${includeResults ? '?include_results=true' : ''}`
+      ),
+    ]);
+    return { ...content, ...state } as Tournament;
+  };
+
+  resultsStreamUrl = (tournamentId: number) =>
+    `${API_BASE}/tournaments/${tournamentId}/results/stream`;
 
   recordVote = (tournamentId: number, voteRequest: VoteRequest) =>
-    this.request<VoteResponse>(`/tournaments/${tournamentId}/vote`, {
-      method: 'POST',
-      body: JSON.stringify(voteRequest),
-    });
+    this.request<VoteDeltaResponse>(
+      `/tournaments/${tournamentId}/vote?delta=true`,
+      {
+        method: 'POST',
+        body: JSON.stringify(voteRequest),
+      }
+    );
 }
 
 export const tournamentApi = new TournamentApi();
@@ -647,6 +647,42 @@ export const HistoryDate = styled.div`
   margin-top: 8px;
 `;
 
+export const SearchInput = styled.input`
+  width: 100%;
+  padding: 12px 16px;
+  margin-bottom: 24px;
+  border: 2px solid ${colors.gray200};
+  border-radius: 8px;
+  font-size: 16px;
+  font-family: inherit;
+  transition: ${baseTransition};
+  background: ${colors.card};
+  color: ${colors.textPrimary};
+
+  &:focus {
+    outline: none;
+    border-color: ${colors.primaryLight};
+    box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.1);
+  }
+
+  &::placeholder {
+    color: ${colors.textMuted};
+  }
+`;
+
+export const SearchSnippet = styled.p`
+  margin: 4px 0;
+  font-size: 14px;
+  color: ${colors.textSecondary};
+  line-height: 1.5;
+
+  mark {
+    background: ${colors.warningLight};
+    color: ${colors.textPrimary};
+    border-radius: 2px;
+  }
+`;
+
 // Modal Components
 export const ModalOverlay = styled.div`
   position: fixed;
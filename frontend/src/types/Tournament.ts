@@ -11,6 +11,16 @@ export interface Tournament {
   stats?: TournamentStats;
 }
 
+export type TournamentContent = Pick<
+  Tournament,
+  'id' | 'question' | 'prompts' | 'responses' | 'models' | 'bracket_template'
+>;
+
+export type TournamentState = Pick<
+  Tournament,
+  'id' | 'user_bracket' | 'user_state' | 'rankings' | 'stats'
+>;
+
 export interface UserTournamentState {
   completed: boolean;
   winner_prompt_index: number | null;
@@ -36,11 +46,39 @@ export interface TournamentSummary {
   completion_rate: number;
 }
 
+export interface SearchMatch {
+  prompt_index: number;
+  model: string;
+  text: string;
+  response: string;
+}
+
+export interface TournamentSearchResult {
+  id: number;
+  question: string;
+  question_highlight: string;
+  created_at: string;
+  rank: number;
+  matches: SearchMatch[];
+}
+
+export interface TournamentSearchResponse {
+  results: TournamentSearchResult[];
+  total: number;
+  page: number;
+  per_page: number;
+}
+
 export interface TournamentResults {
   rankings: PromptRankings[];
   stats: TournamentStats;
 }
 
+export interface ResultsUpdate {
+  rankings: PromptRankings[];
+  stats: TournamentStats;
+}
+
 export interface PromptRankings {
   prompt: string;
   prompt_index: number;
@@ -74,6 +112,21 @@ export interface VoteResponse {
   user_id: string;
 }
 
+export interface BracketPatchOperation {
+  op: 'add' | 'replace';
+  path: string;
+  value: unknown;
+}
+
+export interface VoteDeltaResponse {
+  patch: BracketPatchOperation[];
+  next_match: NextMatch | null;
+  next_match_pending: boolean;
+  completed: boolean;
+  winner_prompt_index: number | null;
+  user_id: string;
+}
+
 export interface AvailableModels {
   models: Record<string, string>;
 }
@@ -1,4 +1,9 @@
-import { Match, MatchParticipant, NextMatch } from '../types';
+import {
+  BracketPatchOperation,
+  Match,
+  MatchParticipant,
+  NextMatch,
+} from '../types';
 
 export const calculateTournamentProgress = (
   userBracket: Match[][],
@@ -126,3 +131,33 @@ export const getCurrentMatchFromState = (
     participant2: participants.participant2,
   };
 };
+
+export const applyBracketPatch = (
+  userBracket: Match[][],
+  patch: BracketPatchOperation[]
+): Match[][] => {
+  const bracket = userBracket.map((round) =>
+    round.map((match) => ({ ...match }))
+  );
+
+  patch.forEach(({ path, value }) => {
+    const [round, match, field] = path.split('/').slice(1);
+    const roundIndex = Number(round);
+    const matchIndex = Number(match);
+
+    if (!bracket[roundIndex]) {
+      bracket[roundIndex] = [];
+    }
+
+    if (field === undefined) {
+      bracket[roundIndex][matchIndex] = value as Match;
+    } else {
+      bracket[roundIndex][matchIndex] = {
+        ...bracket[roundIndex][matchIndex],
+        [field]: value,
+      };
+    }
+  });
+
+  return bracket;
+};